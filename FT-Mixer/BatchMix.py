@@ -0,0 +1,368 @@
+"""Apply one mix recipe to many sets of input images, without the GUI.
+
+The recipe is a JSON file:
+
+    {
+        "weights": [0.7, 0.3, 1.0, 1.0],
+        "components": ["magnitude", "phase", "magnitude", "phase"],
+        "mode": "Magnitude/Phase",
+        "region": {"inner": true, "left": 0.25, "top": 0.25, "right": 0.75, "bottom": 0.75},
+        "filters": [{"kind": "gaussian", "band": "low", "cutoff": 0.3}, null, null, null],
+        "size": [600, 600]
+    }
+
+Components and mode take the GUI's names or their short forms; region is in
+fractions of the centred spectrum and defaults to all of it; filters give
+an optional radial filter per input (the FilterSpec fields of
+RadialFilter.py, null for none); without size, each set is unified to its
+smallest image as in native-resolution mode.
+
+Input sets come from a manifest, one "name,path1,path2,..." row per set
+(paths relative to the manifest), or from a glob of directories whose
+images, sorted by name, form one set each.
+
+Sets are mixed in a process pool with a fixed number of sets in flight.
+Each worker keeps an estimated memory budget and mixes sets too large for
+it out of core. Every finished set appends a row to timings.csv in the
+output directory; a rerun skips the sets already written. A worker process
+that dies (e.g. out of memory) ends the run with the sets it had in flight
+recorded as failed, so a rerun picks up from there.
+
+Usage: python BatchMix.py recipe.json --manifest sets.csv --output-dir mixed
+       python BatchMix.py recipe.json --glob "quads/*/" --output-dir mixed --workers 8 --max-memory-mb 1024
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+import FFTBackend
+from ImageSizing import read_grayscale, resize_to, unified_shape
+from MixEngine import (MixEngine, RegionSpec, MAGNITUDE, PHASE, REAL, IMAGINARY,
+                       MAGNITUDE_PHASE, REAL_IMAGINARY)
+from OutOfCore import OutOfCoreMixer
+from RadialFilter import FilterSpec
+from Spectrum import COMPLEX_DTYPES, get_precision, set_memory_budget, transform
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+TIMINGS_FILE = "timings.csv"
+TIMING_FIELDS = ["name", "status", "inputs", "rows", "cols", "out_of_core", "decode_ms", "transform_ms",
+                 "mix_ms", "write_ms", "total_ms", "worker", "error"]
+DEFAULT_MAX_MEMORY_MB = 1024
+
+_COMPONENTS = {
+    "magnitude": MAGNITUDE, "phase": PHASE, "real": REAL, "imaginary": IMAGINARY,
+}
+_MODES = {
+    "magnitudephase": MAGNITUDE_PHASE, "realimaginary": REAL_IMAGINARY,
+}
+
+
+def _short_name(name: str) -> str:
+    # "FT Magnitude" -> "magnitude", "Magnitude/Phase" -> "magnitudephase"
+    letters = re.sub(r"[^a-z]", "", name.lower())
+    return letters[2:] if letters.startswith("ft") else letters
+
+
+@dataclass
+class Recipe:
+    """Mix settings applied to every input set."""
+    weights: List[float]
+    components: List[str]
+    mode: str = MAGNITUDE_PHASE
+    region: RegionSpec = field(default_factory=RegionSpec)
+    # Radial filter per input, empty when none is filtered
+    filters: List[FilterSpec] = field(default_factory=list)
+    # (rows, cols) every set is resized to; None unifies each set to its smallest image
+    size: Optional[Tuple[int, int]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Recipe':
+        try:
+            weights = [float(weight) for weight in data["weights"]]
+            components = [_COMPONENTS[_short_name(name)] for name in data["components"]]
+            mode = _MODES[_short_name(data.get("mode", MAGNITUDE_PHASE))]
+        except KeyError as e:
+            raise ValueError(f"Invalid recipe: missing or unknown {e}") from None
+        if len(weights) != len(components):
+            raise ValueError("Invalid recipe: weights and components must have the same length")
+        try:
+            region = RegionSpec(**data.get("region", {}))
+        except TypeError as e:
+            raise ValueError(f"Invalid recipe region: {e}") from None
+        if not (0 <= region.left < region.right <= 1 and 0 <= region.top < region.bottom <= 1):
+            raise ValueError(f"Invalid recipe: region fractions out of order or range: {region}")
+        try:
+            filters = [FilterSpec(**spec) if spec else FilterSpec() for spec in data.get("filters", [])]
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid recipe filters: {e}") from None
+        if filters and len(filters) != len(weights):
+            raise ValueError("Invalid recipe: one filter (or null) per input expected")
+        size = tuple(int(n) for n in data["size"]) if data.get("size") else None
+        return cls(weights, components, mode, region, filters, size)
+
+    @classmethod
+    def load(cls, path: str) -> 'Recipe':
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+@dataclass
+class InputSet:
+    name: str
+    paths: List[str]
+
+
+def read_manifest(path: str) -> List[InputSet]:
+    """Input sets of a CSV manifest ("name,path1,path2,..." rows, # comments) or a JSON list of
+    {"name": ..., "inputs": [...]}; relative paths are resolved against the manifest's directory."""
+    base = os.path.dirname(os.path.abspath(path))
+    resolve = lambda p: p if os.path.isabs(p) else os.path.join(base, p)
+    if path.endswith(".json"):
+        with open(path) as f:
+            return [InputSet(entry["name"], [resolve(p) for p in entry["inputs"]]) for entry in json.load(f)]
+    sets = []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            row = [cell.strip() for cell in row if cell.strip()]
+            if not row or row[0].startswith("#"):
+                continue
+            sets.append(InputSet(row[0], [resolve(p) for p in row[1:]]))
+    return sets
+
+
+def glob_sets(patterns: Sequence[str]) -> List[InputSet]:
+    """One input set per matching directory: its images sorted by file name."""
+    sets = []
+    for pattern in patterns:
+        for directory in sorted(glob.glob(pattern)):
+            if not os.path.isdir(directory):
+                continue
+            paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                           if name.lower().endswith(IMAGE_EXTENSIONS))
+            if paths:
+                sets.append(InputSet(os.path.basename(os.path.normpath(directory)), paths))
+    return sets
+
+
+def estimated_bytes(count: int, shape: Tuple[int, int], precision: str) -> int:
+    """Rough peak memory of mixing count images of this shape in memory."""
+    itemsize = COMPLEX_DTYPES[precision].itemsize
+    pixels = shape[0] * shape[1]
+    # Per input: the uint8 image, its real copy, the FFT output and the centred spectrum,
+    # memoized magnitude and phase; plus the engine's workspace
+    return pixels * (count * (1 + 3.5 * itemsize) + 3 * itemsize)
+
+
+# Set in each worker process by _init_worker
+_recipe: Optional[Recipe] = None
+_output_dir = ""
+_extension = ".png"
+_max_bytes = DEFAULT_MAX_MEMORY_MB * 2 ** 20
+_engine: Optional[MixEngine] = None
+
+
+def _init_worker(recipe: Recipe, output_dir: str, extension: str, max_bytes: int, fft_workers: int):
+    global _recipe, _output_dir, _extension, _max_bytes, _engine
+    _recipe, _output_dir, _extension, _max_bytes = recipe, output_dir, extension, max_bytes
+    # Processes already run side by side; threads inside each one would only contend
+    FFTBackend.set_backend(FFTBackend.get_backend().name, fft_workers)
+    set_memory_budget(max_bytes // 4)
+    # Kept across sets, so same-sized sets reuse its workspace buffers
+    _engine = MixEngine()
+
+
+def output_path(output_dir: str, name: str, extension: str) -> str:
+    return os.path.join(output_dir, re.sub(r"[\\/:]", "_", name) + extension)
+
+
+def crashed_row(item: InputSet, error: BaseException) -> Dict:
+    """Timing row of a set whose worker process died while mixing it."""
+    return {"name": item.name, "status": "failed", "inputs": len(item.paths), "out_of_core": 0,
+            "error": f"worker process died: {error}"}
+
+
+def mix_set(item: InputSet) -> Dict:
+    """Decode, mix and write one input set in a worker; returns its timing row."""
+    row = {"name": item.name, "status": "ok", "inputs": len(item.paths), "out_of_core": 0,
+           "worker": os.getpid(), "error": ""}
+    start = time.perf_counter()
+    stage = start
+
+    def lap(key):
+        nonlocal stage
+        now = time.perf_counter()
+        row[key] = round((now - stage) * 1000, 2)
+        stage = now
+
+    try:
+        recipe = _recipe
+        if len(item.paths) != len(recipe.weights):
+            raise ValueError(f"{len(item.paths)} inputs for a recipe of {len(recipe.weights)}")
+        images = [read_grayscale(path) for path in item.paths]
+        shape = recipe.size or unified_shape(image.shape for image in images)
+        images = [resize_to(image, shape) for image in images]
+        row["rows"], row["cols"] = shape
+        lap("decode_ms")
+        if estimated_bytes(len(images), shape, get_precision()) <= _max_bytes:
+            spectra = transform(np.stack(images))
+            del images
+            lap("transform_ms")
+            mixed = _engine.mix(spectra, recipe.weights, recipe.components, recipe.mode, recipe.region,
+                                filters=recipe.filters)
+            del spectra
+        else:
+            # Spectra stay on disk; half the budget per block leaves room for the decoded images
+            row["out_of_core"], row["transform_ms"] = 1, 0.0
+            with tempfile.TemporaryDirectory(dir=_output_dir, prefix=".scratch_") as scratch:
+                with OutOfCoreMixer(scratch, block_bytes=_max_bytes // 2) as mixer:
+                    result = mixer.mix(images, recipe.weights, recipe.components, recipe.mode, recipe.region,
+                                       output_path=os.path.join(scratch, "mixed.npy"), filters=recipe.filters)
+                    mixed = np.array(result)
+                    del result
+        lap("mix_ms")
+        path = output_path(_output_dir, item.name, _extension)
+        # Written under a temporary name first, so an interrupted run never leaves a partial output
+        partial = path[:-len(_extension)] + ".partial" + _extension
+        if not cv2.imwrite(partial, mixed):
+            raise OSError(f"Cannot write {partial}")
+        os.replace(partial, path)
+        lap("write_ms")
+    except Exception as e:
+        row["status"], row["error"] = "failed", str(e)
+    finally:
+        # Only the workspace buffers are worth keeping for the next set: the engine's cached stack
+        # and contributions belong to this one and are not counted by estimated_bytes()
+        _engine.invalidate()
+    row["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return row
+
+
+def completed_names(output_dir: str, extension: str) -> set:
+    """Sets a previous run finished: an ok row in the timings file and the output on disk."""
+    path = os.path.join(output_dir, TIMINGS_FILE)
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline="") as f:
+        return {row["name"] for row in csv.DictReader(f)
+                if row.get("status") == "ok" and os.path.exists(output_path(output_dir, row["name"], extension))}
+
+
+def run(recipe: Recipe, sets: List[InputSet], output_dir: str, workers: int, max_bytes: int,
+        extension: str = ".png", fft_workers: int = 1, max_tasks_per_child: Optional[int] = None) -> Dict[str, int]:
+    """Mix every set not finished yet and append their timing rows; returns counts by status.
+
+    max_tasks_per_child needs Python 3.11 or newer.
+    """
+    pool_options = {}
+    if max_tasks_per_child is not None:
+        if sys.version_info < (3, 11):
+            raise ValueError("Restarting workers after max_tasks_per_child sets needs Python 3.11 or newer")
+        pool_options["max_tasks_per_child"] = max_tasks_per_child
+    os.makedirs(output_dir, exist_ok=True)
+    done = completed_names(output_dir, extension)
+    todo = [item for item in sets if item.name not in done]
+    counts = {"ok": 0, "failed": 0, "skipped": len(sets) - len(todo)}
+    print(f"{len(sets)} sets, {counts['skipped']} already done, {len(todo)} to mix with {workers} workers")
+    if not todo:
+        return counts
+
+    timings_path = os.path.join(output_dir, TIMINGS_FILE)
+    new_file = not os.path.exists(timings_path)
+    with open(timings_path, "a", newline="") as timings, ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn"), initializer=_init_worker,
+            initargs=(recipe, output_dir, extension, max_bytes, fft_workers), **pool_options) as pool:
+        writer = csv.DictWriter(timings, fieldnames=TIMING_FIELDS)
+        if new_file:
+            writer.writeheader()
+        # Sets in flight, by their future
+        pending = {}
+        queue = iter(todo)
+        finished = 0
+
+        def record(row: Dict):
+            nonlocal finished
+            writer.writerow(row)
+            counts[row["status"]] += 1
+            finished += 1
+            message = f"{row['total_ms']:.0f} ms" if row["status"] == "ok" else row["error"]
+            print(f"[{finished}/{len(todo)}] {row['name']}: {row['status']} ({message})")
+
+        try:
+            while True:
+                # A couple of sets per worker in flight: enough to keep them busy, never the whole list
+                for item in queue:
+                    pending[pool.submit(mix_set, item)] = item
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    break
+                completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    record(future.result())
+                    del pending[future]
+                timings.flush()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed for running out of memory) and took the pool with it: the sets in
+            # flight are recorded as failed, so a rerun retries them along with the ones never started
+            wait(pending)
+            for future, item in pending.items():
+                if future.exception() is None:
+                    record(future.result())
+                else:
+                    record(crashed_row(item, e))
+            timings.flush()
+            print(f"Worker pool broken, {len(todo) - finished} sets not started; rerun the same command to resume")
+        except KeyboardInterrupt:
+            print("Interrupted, finished sets are kept; rerun the same command to resume")
+            for future in pending:
+                future.cancel()
+            raise
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mix many image sets with one recipe, without the GUI")
+    parser.add_argument("recipe", help="JSON mix recipe")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--manifest", help="CSV (name,path1,path2,...) or JSON list of input sets")
+    source.add_argument("--glob", nargs="+", help="Directories holding one input set each")
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--format", default="png", help="Output image format (file extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--fft-workers", type=int, default=1, help="FFT threads inside each worker")
+    parser.add_argument("--max-memory-mb", type=float, default=DEFAULT_MAX_MEMORY_MB,
+                        help="Memory budget per worker; larger sets are mixed out of core")
+    parser.add_argument("--max-tasks-per-child", type=int, default=None,
+                        help="Restart each worker after this many sets (Python 3.11+)")
+    args = parser.parse_args()
+    if args.max_tasks_per_child is not None and sys.version_info < (3, 11):
+        parser.error("--max-tasks-per-child needs Python 3.11 or newer")
+
+    try:
+        recipe = Recipe.load(args.recipe)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    sets = read_manifest(args.manifest) if args.manifest else glob_sets(args.glob)
+    names = [item.name for item in sets]
+    if len(set(names)) != len(names):
+        parser.error("Input set names must be unique")
+    counts = run(recipe, sets, args.output_dir, max(1, args.workers), int(args.max_memory_mb * 2 ** 20),
+                 "." + args.format.lstrip("."), args.fft_workers, args.max_tasks_per_child)
+    print(f"Done: {counts['ok']} mixed, {counts['failed']} failed, {counts['skipped']} skipped")
+    sys.exit(1 if counts["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
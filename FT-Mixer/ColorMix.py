@@ -0,0 +1,149 @@
+"""Colour mixing: every channel of every input in one batched FFT, mixed channel by channel.
+
+Colour modes, chosen with FT_MIXER_COLOR:
+
+    off        grayscale images, as always
+    rgb        the R, G and B planes are mixed
+    ycbcr      the Y, Cb and Cr planes are mixed
+    luminance  only Y goes through the Fourier mix; the chroma is the weighted
+               average of the inputs' chroma, which skips two thirds of the
+               transforms and mixing
+
+Each channel is mixed with the usual magnitude/phase or real/imaginary rules
+and the same weights, components, region and filters. The channels of a colour output
+are stretched to 0..255 together, so their balance survives normalization.
+"""
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from MixEngine import MixEngine, RegionSpec, MAGNITUDE_PHASE
+from RadialFilter import FilterSpec
+from Spectrum import Spectrum, transform
+
+COLOR_ENV = "FT_MIXER_COLOR"
+OFF = "off"
+RGB = "rgb"
+YCBCR = "ycbcr"
+LUMINANCE = "luminance"
+COLOR_MODES = (OFF, RGB, YCBCR, LUMINANCE)
+
+_color_mode: Optional[str] = None
+
+
+def set_color_mode(mode: str):
+    global _color_mode
+    mode = mode.lower()
+    if mode not in COLOR_MODES:
+        raise ValueError(f"Unknown colour mode {mode!r}, expected one of {', '.join(COLOR_MODES)}")
+    _color_mode = mode
+
+
+def get_color_mode() -> str:
+    """The colour mode, read from FT_MIXER_COLOR on first use."""
+    if _color_mode is None:
+        set_color_mode(os.environ.get(COLOR_ENV, OFF))
+    return _color_mode
+
+
+def use_color() -> bool:
+    return get_color_mode() != OFF
+
+
+def read_color(path: str) -> np.ndarray:
+    """Decode an image file to (H, W, 3) RGB."""
+    image = cv2.imread(path, cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError(f"Cannot read image: {os.path.basename(path)}")
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def split_planes(images: np.ndarray, mode: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Split (N, H, W, 3) RGB images into the (N, C, H, W) planes to mix, and the (N, 2, H, W) chroma
+    passed through in luminance mode."""
+    if mode == RGB:
+        return images.transpose(0, 3, 1, 2), None
+    if mode not in (YCBCR, LUMINANCE):
+        raise ValueError(f"Not a colour mode: {mode}")
+    # OpenCV orders the planes Y, Cr, Cb
+    planes = np.stack([cv2.cvtColor(image, cv2.COLOR_RGB2YCrCb) for image in images]).transpose(0, 3, 1, 2)
+    if mode == LUMINANCE:
+        return planes[:, :1], planes[:, 1:]
+    return planes, None
+
+
+def merge_planes(planes: np.ndarray, mode: str) -> np.ndarray:
+    """Turn (3, H, W) uint8 planes of a colour mode back into an (H, W, 3) RGB image."""
+    image = np.ascontiguousarray(planes.transpose(1, 2, 0))
+    if mode == RGB:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_YCrCb2RGB)
+
+
+@dataclass
+class ColorStack:
+    """Spectra of every mixed channel of a set of colour images."""
+    mode: str
+    # (N, C, H, W), from one batched FFT
+    spectrum: Spectrum
+    # A view of spectrum per channel, the (N, H, W) stack the engine mixes
+    channels: List[Spectrum]
+    # (N, 2, H, W) Cr/Cb planes kept out of the mix in luminance mode
+    chroma: Optional[np.ndarray] = None
+
+
+def transform_colors(images: Sequence[np.ndarray], mode: str) -> ColorStack:
+    """Transform all channels of equally sized RGB images in one batched FFT."""
+    planes, chroma = split_planes(np.stack(images), mode)
+    spectrum = transform(planes)
+    channels = [Spectrum(spectrum.data[:, channel], width=spectrum.width) for channel in range(planes.shape[1])]
+    return ColorStack(mode, spectrum, channels, chroma)
+
+
+class ColorMixer:
+    """Mixes colour images channel by channel with a MixEngine.
+
+    The channels are mixed into the slots of the engine's batch workspace,
+    like the outputs of MixEngine.mix_batch, and reconstructed by one batched
+    inverse FFT.
+    """
+
+    def __init__(self, engine: Optional[MixEngine] = None):
+        self.engine = engine or MixEngine()
+        self._stack: Optional[Tuple[tuple, ColorStack]] = None
+
+    def stack(self, images: Sequence[np.ndarray], mode: str) -> ColorStack:
+        """Return the inputs' ColorStack, transforming again only when an image (by identity) or the mode changed."""
+        cache = self._stack
+        if (cache is None or cache[1].mode != mode or len(cache[0]) != len(images)
+                or not all(a is b for a, b in zip(images, cache[0]))):
+            cache = (tuple(images), transform_colors(images, mode))
+            self._stack = cache
+        return cache[1]
+
+    def mix(self, images: Sequence[np.ndarray], weights: Sequence[float], components: Sequence[str],
+            mode: str = MAGNITUDE_PHASE, region: Optional[RegionSpec] = None, color_mode: str = RGB,
+            cancelled=None, filters: Optional[Sequence[FilterSpec]] = None) -> np.ndarray:
+        """Mix (H, W, 3) RGB images and return the (H, W, 3) uint8 RGB result."""
+        stack = self.stack(images, color_mode)
+        engine = self.engine
+        first = stack.channels[0]
+        workspace = engine.batch_workspace(len(stack.channels), first.shape, first.dtype, first.width)
+        log_scale = False
+        for index, channel in enumerate(stack.channels):
+            _, log_scale = engine.mix_spectrum(channel, weights, components, mode, region, cancelled,
+                                               workspace.output(index), filters)
+        planes = engine.reconstruct_channels(workspace, log_scale, first.width)
+        if stack.chroma is not None:
+            planes = np.concatenate([planes, self.blend_chroma(stack.chroma, weights)])
+        return merge_planes(planes, stack.mode)
+
+    @staticmethod
+    def blend_chroma(chroma: np.ndarray, weights: Sequence[float]) -> np.ndarray:
+        """Average the inputs' (N, 2, H, W) chroma planes by weight (evenly when the weights are all zero)."""
+        weights = np.asarray(weights, dtype=np.float32)
+        total = weights.sum()
+        weights = weights / total if total > 0 else np.full(len(weights), 1 / len(weights), dtype=np.float32)
+        blended = np.tensordot(weights, chroma, axes=1)
+        return np.clip(np.rint(blended), 0, 255).astype(np.uint8)
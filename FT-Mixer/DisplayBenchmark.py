@@ -0,0 +1,49 @@
+"""Time the per-frame cost of turning a uint8 array into something a QLabel can show.
+
+Usage: python DisplayBenchmark.py [--sizes 300 600 601 2048] [--repeat 200]
+"""
+import argparse
+import sys
+import time
+import numpy as np
+from PyQt5.QtGui import QGuiApplication, QImage, QPixmap
+from ImageBridge import array_to_qimage, is_wrappable
+
+
+def copied_qimage(array: np.ndarray) -> QImage:
+    # The previous display path: serialise the array and let Qt copy it once more
+    height, width = array.shape
+    qimage = QImage(array.tobytes(), width, height, width, QImage.Format_Grayscale8)
+    return qimage.copy()
+
+
+def mean_time(function, array: np.ndarray, repeat: int) -> float:
+    function(array)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(array)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy to QImage conversion")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[300, 600, 601, 2048])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    # QPixmap needs a GUI application; run with QT_QPA_PLATFORM=offscreen when headless
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+    rng = np.random.default_rng(0)
+    print(f"{'size':>10s} {'copy QImage':>12s} {'zero-copy':>12s} {'+ QPixmap':>12s}  wrapped")
+    for size in args.sizes:
+        frame = rng.integers(0, 256, (size, size), dtype=np.uint8)
+        copied = mean_time(copied_qimage, frame, args.repeat)
+        wrapped = mean_time(array_to_qimage, frame, args.repeat)
+        pixmap = mean_time(lambda array: QPixmap.fromImage(array_to_qimage(array)), frame, args.repeat)
+        print(f"{size:>5d}x{size:<4d} {copied * 1e3:9.3f} ms {wrapped * 1e3:9.3f} ms {pixmap * 1e3:9.3f} ms  "
+              f"{'yes' if is_wrappable(frame) else 'no (row padding copy)'}")
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import os
+import pickle
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+
+NUMPY = "numpy"
+SCIPY = "scipy"
+PYFFTW = "pyfftw"
+
+# Startup selection, e.g. FT_MIXER_FFT=pyfftw FT_MIXER_FFT_WORKERS=8 python MainClasses.py
+BACKEND_ENV = "FT_MIXER_FFT"
+WORKERS_ENV = "FT_MIXER_FFT_WORKERS"
+DEFAULT_WISDOM_PATH = os.path.join(os.path.expanduser("~"), ".ft_mixer", "fftw_wisdom.pickle")
+
+Axes = Tuple[int, ...]
+
+
+class FFTBackend:
+    """2-D FFTs over the last two axes of an image or an (N, H, W) stack, and 1-D FFTs along one axis."""
+    name = ""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+
+    def fft(self, x: np.ndarray, axis: int = -1) -> np.ndarray:
+        raise NotImplementedError
+
+    def ifft(self, x: np.ndarray, axis: int = -1, overwrite_x: bool = False) -> np.ndarray:
+        """Inverse 1-D FFT; with overwrite_x the result may share memory with x."""
+        raise NotImplementedError
+
+    def fft2(self, x: np.ndarray, axes: Axes = (-2, -1)) -> np.ndarray:
+        raise NotImplementedError
+
+    def ifft2(self, x: np.ndarray, axes: Axes = (-2, -1), overwrite_x: bool = False) -> np.ndarray:
+        """Inverse FFT; with overwrite_x the result may share memory with x."""
+        raise NotImplementedError
+
+    def rfft2(self, x: np.ndarray, axes: Axes = (-2, -1)) -> np.ndarray:
+        """FFT of a real input, keeping only the non-negative frequencies of the last axis."""
+        raise NotImplementedError
+
+    def irfft2(self, x: np.ndarray, s: Tuple[int, ...], axes: Axes = (-2, -1),
+               overwrite_x: bool = False) -> np.ndarray:
+        """Real inverse of rfft2; s is the shape of the real output along axes."""
+        raise NotImplementedError
+
+
+class NumpyBackend(FFTBackend):
+    """Single-threaded numpy.fft, always available."""
+    name = NUMPY
+
+    def __init__(self, workers: Optional[int] = None):
+        super().__init__(1)
+
+    def fft(self, x, axis=-1):
+        return np.fft.fft(x, axis=axis)
+
+    def ifft(self, x, axis=-1, overwrite_x=False):
+        return np.fft.ifft(x, axis=axis)
+
+    def fft2(self, x, axes=(-2, -1)):
+        return np.fft.fft2(x, axes=axes)
+
+    def ifft2(self, x, axes=(-2, -1), overwrite_x=False):
+        return np.fft.ifft2(x, axes=axes)
+
+    def rfft2(self, x, axes=(-2, -1)):
+        return np.fft.rfft2(x, axes=axes)
+
+    def irfft2(self, x, s, axes=(-2, -1), overwrite_x=False):
+        return np.fft.irfft2(x, s=s, axes=axes)
+
+
+class ScipyBackend(FFTBackend):
+    """scipy.fft split over worker threads; pocketfft keeps its own plan cache per shape and dtype."""
+    name = SCIPY
+
+    def __init__(self, workers: Optional[int] = None):
+        super().__init__(workers)
+        import scipy.fft
+        self._fft = scipy.fft
+
+    def fft(self, x, axis=-1):
+        return self._fft.fft(x, axis=axis, workers=self.workers)
+
+    def ifft(self, x, axis=-1, overwrite_x=False):
+        return self._fft.ifft(x, axis=axis, overwrite_x=overwrite_x, workers=self.workers)
+
+    def fft2(self, x, axes=(-2, -1)):
+        return self._fft.fft2(x, axes=axes, workers=self.workers)
+
+    def ifft2(self, x, axes=(-2, -1), overwrite_x=False):
+        return self._fft.ifft2(x, axes=axes, overwrite_x=overwrite_x, workers=self.workers)
+
+    def rfft2(self, x, axes=(-2, -1)):
+        return self._fft.rfft2(x, axes=axes, workers=self.workers)
+
+    def irfft2(self, x, s, axes=(-2, -1), overwrite_x=False):
+        return self._fft.irfft2(x, s=s, axes=axes, overwrite_x=overwrite_x, workers=self.workers)
+
+
+class PyFFTWBackend(FFTBackend):
+    """FFTW plans cached per (transform, shape, dtype, axes), with wisdom persisted across runs.
+
+    Planning with FFTW_MEASURE is slow the first time a shape is seen; the
+    accumulated wisdom is saved to disk so later sessions plan instantly.
+    """
+    name = PYFFTW
+
+    def __init__(self, workers: Optional[int] = None, wisdom_path: Optional[str] = DEFAULT_WISDOM_PATH,
+                 planner_effort: str = "FFTW_MEASURE"):
+        super().__init__(workers)
+        import pyfftw
+        import pyfftw.builders
+        self._pyfftw = pyfftw
+        self.wisdom_path = wisdom_path
+        self.planner_effort = planner_effort
+        self._plans: Dict[tuple, object] = {}
+        # A plan owns its internal arrays, so it must not run on two threads at once
+        self._lock = threading.Lock()
+        self.load_wisdom()
+
+    def fft(self, x, axis=-1):
+        return self._execute(self._pyfftw.builders.fft, x, (axis,))
+
+    def ifft(self, x, axis=-1, overwrite_x=False):
+        return self._execute(self._pyfftw.builders.ifft, x, (axis,))
+
+    def fft2(self, x, axes=(-2, -1)):
+        return self._execute(self._pyfftw.builders.fft2, x, axes)
+
+    def ifft2(self, x, axes=(-2, -1), overwrite_x=False):
+        return self._execute(self._pyfftw.builders.ifft2, x, axes)
+
+    def rfft2(self, x, axes=(-2, -1)):
+        return self._execute(self._pyfftw.builders.rfft2, x, axes)
+
+    def irfft2(self, x, s, axes=(-2, -1), overwrite_x=False):
+        return self._execute(self._pyfftw.builders.irfft2, x, axes, tuple(s))
+
+    def _execute(self, builder, x: np.ndarray, axes: Axes, s: Optional[Tuple[int, ...]] = None) -> np.ndarray:
+        with self._lock:
+            plan = self._plan(builder, x.shape, x.dtype, tuple(axes), s)
+            # Give every call its own output array, the caller keeps the result
+            output = self._pyfftw.empty_aligned(plan.output_shape, plan.output_dtype)
+            return plan(x, output_array=output)
+
+    def _plan(self, builder, shape: Tuple[int, ...], dtype: np.dtype, axes: Axes,
+              s: Optional[Tuple[int, ...]] = None):
+        key = (builder.__name__, shape, np.dtype(dtype), axes, s)
+        plan = self._plans.get(key)
+        if plan is None:
+            # The 1-D builders take one axis, the 2-D ones axes and an output shape
+            if builder in (self._pyfftw.builders.fft, self._pyfftw.builders.ifft):
+                layout = {"axis": axes[0]}
+            else:
+                layout = {"s": s, "axes": axes}
+            plan = builder(self._pyfftw.empty_aligned(shape, dtype), threads=self.workers,
+                           planner_effort=self.planner_effort, **layout)
+            self._plans[key] = plan
+            self.save_wisdom()
+        return plan
+
+    def load_wisdom(self):
+        if self.wisdom_path and os.path.exists(self.wisdom_path):
+            try:
+                with open(self.wisdom_path, "rb") as f:
+                    self._pyfftw.import_wisdom(pickle.load(f))
+            except Exception as e:
+                print(f"Ignoring unreadable FFTW wisdom: {e}")
+
+    def save_wisdom(self):
+        if not self.wisdom_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.wisdom_path), exist_ok=True)
+            with open(self.wisdom_path, "wb") as f:
+                pickle.dump(self._pyfftw.export_wisdom(), f)
+        except OSError as e:
+            print(f"Could not save FFTW wisdom: {e}")
+
+
+BACKENDS = {
+    NUMPY: NumpyBackend,
+    SCIPY: ScipyBackend,
+    PYFFTW: PyFFTWBackend,
+}
+
+_backend: Optional[FFTBackend] = None
+
+
+def available_backends() -> Sequence[str]:
+    """Names of the backends whose libraries can be imported."""
+    names = [NUMPY]
+    for name, module in ((SCIPY, "scipy.fft"), (PYFFTW, "pyfftw")):
+        try:
+            __import__(module)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+def set_backend(name: str, workers: Optional[int] = None, **options) -> FFTBackend:
+    """Select the backend used by every FFT in the application."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown FFT backend: {name} (choose from {', '.join(BACKENDS)})")
+    _backend = BACKENDS[name](workers, **options)
+    return _backend
+
+
+def get_backend() -> FFTBackend:
+    """Return the current backend, choosing one from the environment on first use.
+
+    Defaults to scipy.fft and falls back to numpy when the requested library
+    is missing.
+    """
+    if _backend is None:
+        workers = int(os.environ[WORKERS_ENV]) if os.environ.get(WORKERS_ENV) else None
+        try:
+            set_backend(os.environ.get(BACKEND_ENV, SCIPY), workers)
+        except ImportError as e:
+            print(f"FFT backend unavailable ({e}), using numpy")
+            set_backend(NUMPY)
+    return _backend
+
+
+def fft(x: np.ndarray, axis: int = -1) -> np.ndarray:
+    return get_backend().fft(x, axis)
+
+
+def ifft(x: np.ndarray, axis: int = -1, overwrite_x: bool = False) -> np.ndarray:
+    return get_backend().ifft(x, axis, overwrite_x)
+
+
+def fft2(x: np.ndarray, axes: Axes = (-2, -1)) -> np.ndarray:
+    return get_backend().fft2(x, axes)
+
+
+def ifft2(x: np.ndarray, axes: Axes = (-2, -1), overwrite_x: bool = False) -> np.ndarray:
+    return get_backend().ifft2(x, axes, overwrite_x)
+
+
+def rfft2(x: np.ndarray, axes: Axes = (-2, -1)) -> np.ndarray:
+    return get_backend().rfft2(x, axes)
+
+
+def irfft2(x: np.ndarray, s: Tuple[int, ...], axes: Axes = (-2, -1), overwrite_x: bool = False) -> np.ndarray:
+    return get_backend().irfft2(x, s, axes, overwrite_x)
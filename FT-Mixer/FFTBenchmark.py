@@ -0,0 +1,53 @@
+"""Compare the FFT backends on the transforms the mixer runs.
+
+Usage: python FFTBenchmark.py [--sizes 600 2048 4096] [--repeat 5] [--workers N]
+"""
+import argparse
+import time
+import numpy as np
+import FFTBackend
+
+
+def best_time(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the FFT backends")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[600, 2048, 4096])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None, help="Threads for scipy/pyfftw (default: all cores)")
+    args = parser.parse_args()
+
+    backends = FFTBackend.available_backends()
+    print(f"Backends: {', '.join(backends)}")
+    rng = np.random.default_rng(0)
+    for size in args.sizes:
+        image = rng.integers(0, 256, (size, size), dtype=np.uint8)
+        # The inverse timings' input, from the plain numpy backend: a timed backend must not have planned
+        # this size before its first call
+        spectrum = FFTBackend.NumpyBackend().fft2(image)
+        baseline = None
+        for name in backends:
+            backend = FFTBackend.set_backend(name, args.workers)
+            # The first call plans (pyfftw) or fills the plan cache, time it separately
+            start = time.perf_counter()
+            backend.fft2(image)
+            backend.ifft2(spectrum)
+            first = time.perf_counter() - start
+            forward = best_time(lambda: backend.fft2(image), args.repeat)
+            inverse = best_time(lambda: backend.ifft2(spectrum), args.repeat)
+            if baseline is None:
+                baseline = forward + inverse
+            print(f"{size:5d}x{size:<5d} {name:7s} workers {backend.workers:2d}  first {first * 1000:8.1f} ms  "
+                  f"fft2 {forward * 1000:8.1f} ms  ifft2 {inverse * 1000:8.1f} ms  "
+                  f"speedup {baseline / (forward + inverse):5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Zero-copy views of uint8 NumPy arrays as QImages.
+
+QImage can paint straight from a caller's buffer; ArrayImage keeps that
+buffer referenced for as long as the image exists, so no bytes are copied
+between the mixer's arrays and the screen other than by QPixmap itself.
+"""
+import numpy as np
+from PyQt5 import sip
+from PyQt5.QtGui import QGuiApplication, QImage, QPixmap
+
+# Channels per pixel -> QImage format
+FORMATS = {
+    1: QImage.Format_Grayscale8,
+    3: QImage.Format_RGB888,
+    4: QImage.Format_RGBA8888,
+}
+# Assumed when the screen does not report its refresh rate
+DEFAULT_REFRESH_HZ = 60
+# Qt expects the buffer, and rows it lays out itself, on 32-bit boundaries
+ALIGNMENT = 4
+
+
+def _channels(array: np.ndarray) -> int:
+    if array.ndim == 2:
+        return 1
+    if array.ndim == 3 and array.shape[2] in FORMATS:
+        return array.shape[2]
+    raise ValueError(f"Cannot show an array of shape {array.shape} as an image")
+
+
+def is_wrappable(array: np.ndarray) -> bool:
+    """Whether QImage can address the array's rows directly: packed pixels, aligned start and row stride."""
+    channels = _channels(array)
+    pixel_strides = (1,) if channels == 1 else (channels, 1)
+    return (array.dtype == np.uint8
+            and tuple(array.strides[1:]) == pixel_strides
+            and array.strides[0] >= array.shape[1] * channels
+            and array.strides[0] % ALIGNMENT == 0
+            and array.ctypes.data % ALIGNMENT == 0)
+
+
+def aligned_array(array: np.ndarray) -> np.ndarray:
+    """The array itself if QImage can wrap it, else a copy whose rows are padded to 32 bits."""
+    array = np.asarray(array)
+    if array.dtype != np.uint8:
+        raise TypeError(f"Expected a uint8 array, got {array.dtype}")
+    if is_wrappable(array):
+        return array
+    height, width = array.shape[:2]
+    row_bytes = width * _channels(array)
+    stride = -(-row_bytes // ALIGNMENT) * ALIGNMENT
+    padded = np.empty((height, stride), dtype=np.uint8)[:, :row_bytes].reshape(array.shape)
+    padded[...] = array
+    return padded
+
+
+class ArrayImage(QImage):
+    """A QImage painting from a NumPy array's memory, which it keeps alive.
+
+    Copies Qt makes of this image (QImage(image), signals, caches) share the
+    buffer without holding the array, so hand those a QPixmap or copy().
+    """
+
+    def __init__(self, array: np.ndarray):
+        self.array = aligned_array(array)
+        height, width = self.array.shape[:2]
+        # By address: a padded array is not one contiguous buffer Python would hand over
+        super().__init__(sip.voidptr(self.array.ctypes.data), width, height, self.array.strides[0],
+                         FORMATS[_channels(self.array)])
+
+
+def array_to_qimage(array: np.ndarray) -> ArrayImage:
+    """Wrap a uint8 (H, W), (H, W, 3) or (H, W, 4) array as a QImage, copying only unaligned rows."""
+    return ArrayImage(array)
+
+
+def array_to_pixmap(array: np.ndarray) -> QPixmap:
+    """Upload a uint8 array to a QPixmap; the pixmap owns its pixels, the array can change afterwards."""
+    return QPixmap.fromImage(ArrayImage(array))
+
+
+def refresh_interval_ms(widget=None) -> int:
+    """Milliseconds between frames of the widget's screen (or the primary screen)."""
+    screen = widget.screen() if widget is not None and hasattr(widget, "screen") else None
+    screen = screen or QGuiApplication.primaryScreen()
+    rate = screen.refreshRate() if screen is not None else 0
+    return max(1, round(1000 / (rate if rate > 0 else DEFAULT_REFRESH_HZ)))
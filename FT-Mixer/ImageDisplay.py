@@ -42,6 +42,8 @@ COLORS.update({
 class ImageDisplay(QLabel):
     # Add custom signal
     dragComplete = pyqtSignal()
+    # Local paths of every file dropped at once
+    filesDropped = pyqtSignal(list)
     
     def __init__(self):
         super().__init__()
@@ -93,8 +95,12 @@ class ImageDisplay(QLabel):
         if event.mimeData().hasImage():
             self.setPixmap(QPixmap.fromImage(event.mimeData().imageData()))
         elif event.mimeData().hasUrls():
-            file_path = event.mimeData().urls()[0].toLocalFile()
-            self.setPixmap(QPixmap(file_path))
+            paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+            if self.receivers(self.filesDropped) > 0:
+                # The owning viewer loads the files into its inputs
+                self.filesDropped.emit(paths)
+            elif paths:
+                self.setPixmap(QPixmap(paths[0]))
     
     def _setup_loading_spinner(self):
         self.loading_spinner = QProgressIndicator(self)
@@ -0,0 +1,169 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+from Spectrum import Spectrum, resample_spectrum
+from SpectrumCache import cached_transform, file_digest
+from ImageSizing import read_grayscale, resize_to, use_spectral_resampling
+from ColorMix import read_color, use_color
+
+
+@dataclass
+class LoadedImage:
+    """A file as far as it has been loaded: decoded, and once resized, transformed."""
+    path: Optional[str]
+    digest: Optional[str]
+    native: Optional[np.ndarray] = None
+    image: Optional[np.ndarray] = None
+    spectrum: Optional[Spectrum] = None
+    # Spectrum of native, kept so the image can be resampled in the frequency domain
+    native_spectrum: Optional[Spectrum] = None
+    # In colour mode, the (H, W, 3) RGB pixels of native and of image
+    native_color: Optional[np.ndarray] = None
+    color: Optional[np.ndarray] = None
+
+
+def decode_file(path: str) -> LoadedImage:
+    """Hash and decode an image file to grayscale (and in colour mode RGB), at its own resolution."""
+    return LoadedImage(path, file_digest(path), read_grayscale(path),
+                       native_color=read_color(path) if use_color() else None)
+
+
+def load_file(path: str, shape: Tuple[int, int]) -> LoadedImage:
+    """Hash a file and return it resized to shape with its spectrum; decoding is skipped on a cache hit."""
+    # resize_to like resample(), as both store their result under the same cache key
+    decode = lambda: resize_to(read_grayscale(path), shape)
+    loaded = LoadedImage(path, file_digest(path))
+    loaded.image, loaded.spectrum = cached_transform(loaded.digest, shape, decode)
+    loaded.native = loaded.image
+    loaded.native_spectrum = loaded.spectrum
+    if use_color():
+        # Colour pixels are not in the spectrum cache, they are always decoded
+        loaded.color = loaded.native_color = resize_to(read_color(path), shape)
+    return loaded
+
+
+def resample(loaded: LoadedImage, shape: Tuple[int, int]) -> LoadedImage:
+    """Bring an already decoded image and its spectrum to shape.
+
+    By default the image is resized and transformed again. With spectral
+    resampling the full-size spectrum is computed once and then cropped or
+    padded to every new size, only the displayed image is resized.
+    """
+    color = resize_to(loaded.native_color, shape) if loaded.native_color is not None else None
+    if not use_spectral_resampling():
+        image, spectrum = cached_transform(loaded.digest, shape, lambda: resize_to(loaded.native, shape))
+        return LoadedImage(loaded.path, loaded.digest, loaded.native, image, spectrum, loaded.native_spectrum,
+                           loaded.native_color, color)
+    native_spectrum = loaded.native_spectrum
+    if native_spectrum is None:
+        _, native_spectrum = cached_transform(loaded.digest, loaded.native.shape, lambda: loaded.native)
+    return LoadedImage(loaded.path, loaded.digest, loaded.native, resize_to(loaded.native, shape),
+                       resample_spectrum(native_spectrum, shape), native_spectrum, loaded.native_color, color)
+
+
+def resample_all(images: Dict[int, LoadedImage], shape: Tuple[int, int]) -> Dict[int, LoadedImage]:
+    """Resample several decoded images concurrently and wait for all of them."""
+    if len(images) <= 1:
+        return {index: resample(loaded, shape) for index, loaded in images.items()}
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+        futures = {index: pool.submit(resample, loaded, shape) for index, loaded in images.items()}
+        return {index: future.result() for index, future in futures.items()}
+
+
+def pending_resamples(viewers, shape: Tuple[int, int]) -> Dict[int, LoadedImage]:
+    """Decoded images of the viewers, by index, that are not at shape yet."""
+    return {index: LoadedImage(None, viewer.sourceDigest, viewer.nativeData,
+                               native_spectrum=getattr(viewer, 'nativeSpectrum', None),
+                               native_color=getattr(viewer, 'nativeColor', None))
+            for index, viewer in enumerate(viewers)
+            if getattr(viewer, 'nativeData', None) is not None
+            and (viewer.imageData is None or viewer.imageData.shape != tuple(shape))}
+
+
+class _JobSignals(QObject):
+    # job, LoadedImage (None on failure), error message
+    done = pyqtSignal(object, object, str)
+
+
+class LoadJob(QRunnable):
+    """Runs one load step on a pool thread; cv2 and the FFT release the GIL while they work."""
+
+    def __init__(self, index: int, work: Callable[[], LoadedImage], decode_only: bool = False):
+        super().__init__()
+        self.index = index
+        self.work = work
+        self.decode_only = decode_only
+        self.signals = _JobSignals()
+
+    def run(self):
+        loaded, error = None, ""
+        try:
+            loaded = self.work()
+        except Exception as e:
+            error = str(e)
+        self.signals.done.emit(self, loaded, error)
+
+
+class ImageSetLoader(QObject):
+    """Loads several images concurrently, reporting each one as it finishes.
+
+    At the legacy fixed size a file is decoded, resized and transformed in a
+    single job. At native resolution the unified size depends on every
+    input, so files are only decoded first (one decoded signal each), then
+    the window calls resample() for the viewers whose size changed.
+    finished() fires whenever the last outstanding job is done.
+    """
+    decoded = pyqtSignal(int, object)  # viewer index, LoadedImage with native set
+    loaded = pyqtSignal(int, object)  # viewer index, LoadedImage with image and spectrum set
+    loadFailed = pyqtSignal(int, str)
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(os.cpu_count() or 1)
+        self._outstanding = 0
+        # Jobs must outlive their run() until their signal is delivered
+        self._jobs = set()
+
+    def load(self, paths: Dict[int, str], shape: Tuple[int, int]):
+        for index, path in paths.items():
+            self._start(LoadJob(index, lambda path=path: load_file(path, shape)))
+
+    def decode(self, paths: Dict[int, str]):
+        for index, path in paths.items():
+            self._start(LoadJob(index, lambda path=path: decode_file(path), decode_only=True))
+
+    def resample(self, images: Dict[int, LoadedImage], shape: Tuple[int, int]):
+        for index, loaded in images.items():
+            self._start(LoadJob(index, lambda loaded=loaded: resample(loaded, shape)))
+
+    def is_busy(self) -> bool:
+        return self._outstanding > 0
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self.pool.waitForDone(msecs)
+
+    def _start(self, job: LoadJob):
+        # Delivered on this object's (GUI) thread
+        job.signals.done.connect(self._on_job_done)
+        self._jobs.add(job)
+        self._outstanding += 1
+        self.pool.start(job)
+
+    @pyqtSlot(object, object, str)
+    def _on_job_done(self, job, loaded, error):
+        self._jobs.discard(job)
+        # Still counted as busy while its own signal is handled
+        if error:
+            self.loadFailed.emit(job.index, error)
+        elif job.decode_only:
+            self.decoded.emit(job.index, loaded)
+        else:
+            self.loaded.emit(job.index, loaded)
+        self._outstanding -= 1
+        if self._outstanding == 0:
+            self.finished.emit()
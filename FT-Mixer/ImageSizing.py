@@ -0,0 +1,98 @@
+import os
+from typing import Iterable, Optional, Tuple
+import cv2
+import numpy as np
+
+# Size every image was forced to before native-resolution mode existed
+LEGACY_SIZE = (600, 600)
+# Size of the viewer labels; display paths never need more pixels than this
+DISPLAY_SIZE = (300, 300)
+
+# Keep images at their own resolution, e.g. FT_MIXER_NATIVE_RESOLUTION=1 python MainClasses.py
+NATIVE_RESOLUTION_ENV = "FT_MIXER_NATIVE_RESOLUTION"
+# Unify native-resolution images by cropping/padding their spectra instead of resizing and re-transforming
+SPECTRAL_RESAMPLING_ENV = "FT_MIXER_SPECTRAL_RESAMPLING"
+
+_native_resolution: Optional[bool] = None
+_spectral_resampling: Optional[bool] = None
+
+
+def set_native_resolution(enabled: bool):
+    global _native_resolution
+    _native_resolution = bool(enabled)
+
+
+def use_native_resolution() -> bool:
+    """Whether loaded images keep their resolution, read from FT_MIXER_NATIVE_RESOLUTION on first use."""
+    if _native_resolution is None:
+        set_native_resolution(os.environ.get(NATIVE_RESOLUTION_ENV, "0").lower() in ("1", "true", "yes"))
+    return _native_resolution
+
+
+def set_spectral_resampling(enabled: bool):
+    global _spectral_resampling
+    _spectral_resampling = bool(enabled)
+
+
+def use_spectral_resampling() -> bool:
+    """Whether unified sizes come from the full-size spectra, read from FT_MIXER_SPECTRAL_RESAMPLING on first use."""
+    if _spectral_resampling is None:
+        set_spectral_resampling(os.environ.get(SPECTRAL_RESAMPLING_ENV, "0").lower() in ("1", "true", "yes"))
+    return _spectral_resampling
+
+
+def read_grayscale(path: str) -> np.ndarray:
+    image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise ValueError(f"Cannot read image: {os.path.basename(path)}")
+    return image
+
+
+def next_smooth_length(n: int) -> int:
+    """Smallest length >= n with no prime factor above 5, which every FFT backend handles fastest."""
+    n = max(1, int(n))
+    best = None
+    power5 = 1
+    while power5 < 2 * n:
+        power35 = power5
+        while power35 < 2 * n:
+            # Smallest power of two lifting power35 to at least n
+            length = power35
+            while length < n:
+                length *= 2
+            if best is None or length < best:
+                best = length
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+def unified_shape(shapes: Iterable[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+    """Common (rows, cols) for a set of images: the smallest dimensions, rounded up to FFT-friendly lengths."""
+    shapes = [tuple(shape[:2]) for shape in shapes]
+    if not shapes:
+        return None
+    rows = min(shape[0] for shape in shapes)
+    cols = min(shape[1] for shape in shapes)
+    return next_smooth_length(rows), next_smooth_length(cols)
+
+
+def resize_to(image: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    """Resize an image to (rows, cols), averaging pixels when shrinking."""
+    if image.shape[:2] == tuple(shape):
+        return image
+    shrinking = shape[0] < image.shape[0] and shape[1] < image.shape[1]
+    interpolation = cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+    return cv2.resize(image, (shape[1], shape[0]), interpolation=interpolation)
+
+
+def downsample_for_display(image: np.ndarray, size: Tuple[int, int] = DISPLAY_SIZE) -> np.ndarray:
+    """Shrink an array to at most the (width, height) of the screen label; never enlarges.
+
+    Only display paths use this, the mixing math keeps the full-resolution arrays.
+    """
+    width, height = size
+    if image.shape[0] <= height and image.shape[1] <= width:
+        return image
+    shape = (min(image.shape[0], height), min(image.shape[1], width))
+    return cv2.resize(image, (shape[1], shape[0]), interpolation=cv2.INTER_AREA)
@@ -14,6 +14,7 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5 import QtCore, QtGui, QtWidgets
 from ImageDisplay import ImageDisplay
+from FFTBackend import fft2
 import logging
 from MixerUI import ModernWindow
 from PIL import Image, ImageQt
@@ -437,7 +438,7 @@ class ImageViewerWidget(ModernWindow):
         newImageData = np.frombuffer(ptr , np.uint8).reshape((height, width))
         print(newImageData)
 
-        fftComponents = np.fft.fft2(imageData)
+        fftComponents = fft2(imageData)
         fftComponentsShifted = np.fft.fftshift(fftComponents)
         self.fftComponents= fftComponents
         # Get Magnitude and Phase
@@ -11,6 +11,16 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5 import QtGui
 from ImageDisplay import ImageDisplay
+from MixEngine import MixConfig, MixEngine, RegionSpec
+from MixWorker import MixRequest, MixScheduler
+from RadialFilter import FILTER_PRESETS, FilterSpec
+from Spectrum import stack_spectra, transform
+from ImageLoader import ImageSetLoader, decode_file, load_file, pending_resamples, resample_all
+from ImageSizing import LEGACY_SIZE, downsample_for_display, unified_shape, use_native_resolution
+from ImageBridge import array_to_pixmap, array_to_qimage, refresh_interval_ms
+from BrightnessContrast import apply_tone
+from SweepDialog import SweepDialog
+from ColorMix import get_color_mode, use_color
 from PIL import Image
 import logging
 
@@ -63,25 +73,49 @@ class ModernWindow(QMainWindow):
         self._setup_shortcuts()
         self.undo_stack = []
         self.redo_stack = []
-        self.is_mixing = False
+        self.mix_engine = MixEngine()
+        # Viewers reuse this class for its helpers, only the main window owns a mixing worker
+        self.mix_scheduler = None
+        if not skip_setup_ui:
+            self.mix_scheduler = MixScheduler(self.mix_engine, self)
+            self.mix_scheduler.mixReady.connect(self._on_mix_ready)
+            self.mix_scheduler.mixFailed.connect(self._on_mix_failed)
+        self.image_loader = None
+        # Set while a native-resolution image set is decoding, before it is resampled
+        self._decoding_image_set = False
+        if not skip_setup_ui:
+            self.image_loader = ImageSetLoader(self)
+            self.image_loader.decoded.connect(self._on_image_decoded)
+            self.image_loader.loaded.connect(self._on_image_loaded)
+            self.image_loader.loadFailed.connect(self._on_image_load_failed)
+            self.image_loader.finished.connect(self._on_image_set_finished)
+            QShortcut(QKeySequence("Ctrl+O"), self, self.load_image_set_dialog)
         self.mix_timer = QTimer()
         self.mix_timer.setSingleShot(True)
         self.mix_timer.timeout.connect(self._perform_real_time_mix)
+        # Restarted by every interactive change, fires the full-resolution mix once input settles
+        self.settle_timer = QTimer()
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.timeout.connect(self.real_time_mix)
+        # Settings each output was last mixed with, over all input viewers, by output index
+        self.output_configs = {}
 
     def _perform_real_time_mix(self):
-        if self.is_mixing:
-            return 
-        try:
-            self.is_mixing = True
-            QApplication.processEvents()  # Force UI update
-            self.real_time_mix()
-        finally:
-            QTimer.singleShot(500, lambda: self._finish_mixing())  # Delay hiding
+        # Large inputs get a quick preview now and the full mix when the interaction settles
+        if self.real_time_mix(preview=True):
+            self.settle_timer.start(250)
 
     def schedule_real_time_mix(self):
-        if not self.is_mixing:
+        # Coalesce bursts of slider/rectangle events into at most one request per frame
+        if not self.mix_timer.isActive():
+            self.mix_timer.start(16)
+
+    def finish_interactive_mix(self):
+        # A drag ended: run the pending full-resolution mix right away
+        if self.mix_timer.isActive() or self.settle_timer.isActive():
             self.mix_timer.stop()
-            self.mix_timer.start(600)  # 200ms debounce
+            self.settle_timer.stop()
+            self.real_time_mix()
 
     def _setup_theme(self):
         self.setStyleSheet(f"""
@@ -174,181 +208,123 @@ class ModernWindow(QMainWindow):
     def _setup_connection(self):
         print("Setting up connections")
 
-    def _finish_mixing(self):
-        self.is_mixing = False
-
-    def real_time_mix(self):
-        try:
-            # Show progress bar at start
-            QApplication.processEvents()
-            print("Real Time Mixing")
-            print(f"Self: {self}")
-            # Collect components
-            components = []
-            print(f"Viewers: {self.viewers}")
-            for i, viewer in enumerate(self.viewers):
-                print("I Have viewers")
-                if viewer and hasattr(viewer, 'fftComponents') and viewer.fftComponents is not None:
-                    print("They have fftComponents")
-                    ftComponents = []
-                    if True:
-                        if self.inner_region.isChecked():
-                            ftComponents = np.zeros_like(viewer.fftComponents)
-                            center_x = viewer.fftComponents.shape[0] // 2
-                            center_y = viewer.fftComponents.shape[1] // 2 
-                            start_x, end_x = center_x , center_x
-                            start_y, end_y = center_y , center_y
-                            if self.region_size.isChecked():
-                                start_x = int(( (150 - self.topLeft.x()) / 150 ) * center_x)  
-                                end_x = int(( (self.bottomRight.x() - 150) / 150 ) * center_x)  
-                                start_y = int(( (150 - self.topLeft.y()) / 150 ) * center_x)  
-                                end_y = int(( (self.bottomRight.y() - 150) / 150 ) * center_x)  
-
-                            ftComponents[
-                                max(0, center_x - start_x) : min(center_x + end_x , viewer.fftComponents.shape[0]),
-                                max(0,center_y - start_y) : min(center_y + end_y , viewer.fftComponents.shape[1]) 
-                            ] = viewer.fftComponents[
-                                max(0, center_x - start_x) : min(center_x + end_x , viewer.fftComponents.shape[0]),
-                                max(0,center_y - start_y) : min(center_y + end_y , viewer.fftComponents.shape[1]) 
-                            ]
-
-                        else:
-                            ftComponents = np.copy(viewer.fftComponents) 
-                            center_x = viewer.fftComponents.shape[0] // 2
-                            center_y = viewer.fftComponents.shape[1] // 2
-                            start_x, end_x = center_x , center_x
-                            start_y, end_y = center_y , center_y
-                            if self.region_size.isChecked():
-                                start_x = int(( (150 - self.topLeft.x()) / 150 ) * center_x)  
-                                end_x = int(( (self.bottomRight.x() - 150) / 150 ) * center_x)  
-                                start_y = int(( (150 - self.topLeft.y()) / 150 ) * center_x)  
-                                end_y = int(( (self.bottomRight.y() - 150) / 150 ) * center_x)  
-                            # Zero out the desired region using slicing
-                            ftComponents[center_x - start_x: center_x + end_x, 
-                                         center_y - start_y: center_y + end_y] = 0
-
-                    weight = viewer.weight1_slider.value() / 100.0
-                    print(f"My Weight: {weight}")
-                    components.append({
-                        'ft': ftComponents.copy(),
-                        'weight': weight,
-                        'type': viewer.component_selector.currentText() # To Just access the component data chosen by the Combo Box
-                    })
-                    #self.mix_progress.setValue(20 + (i * 15))
-                    QApplication.processEvents()
-
-            if not components:
-                return
-            QApplication.processEvents()
-            mix_type = self.mix_type.currentText()
-            if mix_type == "Magnitude/Phase":
-                result, zeroPhase = self.mix_magnitude_phase(components)
-            else:
-                result, zeroPhase = self.mix_real_imaginary(components)
-            QApplication.processEvents()
-            # Process result
-
-      
-            mixed_image = np.fft.ifftshift(result)
-            mixed_image = np.fft.ifft2(mixed_image)
-            mixed_image = np.abs(mixed_image)
-            if zeroPhase:
-                mixed_image = np.log1p(mixed_image)
-            mixed_image = ((mixed_image - mixed_image.min()) * 255 / (mixed_image.max() - mixed_image.min()))
-            mixed_image = mixed_image.astype(np.uint8)
-            output_index = self.output_selector.currentIndex()
-            output_viewer = self.outputViewers[output_index]
-            if not output_viewer or not output_viewer.originalImageLabel:
-                return
-            QApplication.processEvents()
-            # Update display
-            for viewer in self.viewers:
-                pixmap = viewer.array_to_pixmap(mixed_image)
-                break
-            if pixmap and output_viewer and output_viewer.originalImageLabel:
-                output_viewer.originalImageLabel.setPixmap(pixmap.scaled(300, 300, Qt.IgnoreAspectRatio))
-
-            QApplication.processEvents()
-        except Exception as e:
-            print(f"Error during real-time mixing: {str(e)}")
-            if hasattr(self, 'show_error'):
-                self.show_error(f"Mixing failed: {str(e)}")
-        finally:
-            # Don't hide immediately to show completion
-            QTimer.singleShot(500, lambda: self._finish_mixing())
-            
-    def mix_magnitude_phase(self, components):
-        try:
-            first_ft = components[0]['ft']
-            result = np.zeros_like(first_ft, dtype=complex)
-            print(1)
-            # Mix magnitudes
-            total_magnitude = np.zeros_like(np.abs(first_ft))
-            for comp in components:
-                weight = comp['weight']
-                type = comp['type']
-                if type == "FT Magnitude":
-                    magnitude = np.abs(comp['ft'])
-                else:
-                    magnitude = 0
-                magnitude = np.abs(comp['ft'])
-                print(f"Weight: {weight}")
-                total_magnitude += weight * magnitude
-            print("Magnitude Done")
-            
-            total_phase = np.zeros_like(np.angle(first_ft))
-            for comp in components:
-                weight = comp['weight']
-                type = comp['type']
-                phase = np.angle(comp['ft'])
-                if type == "FT Phase":
-                    phase = np.angle(comp['ft'])
-                else:
-                    phase = 0
-                total_phase += weight * phase
-            print(f" Total: {total_magnitude}")
-                
-            result = total_magnitude * np.exp(1j * total_phase)
-            
-            if np.sum(total_phase) < 1:
-                return result , True
-            
-            return result , False
-            
-        except Exception as e:
-            print(f"Error in magnitude/phase mixing: {str(e)}")
-            raise
+    def real_time_mix(self, preview=False):
+        # Returns whether a low-resolution preview was requested
+        if self.mix_scheduler is None:
+            return False
+        if self.image_loader is not None and self.image_loader.is_busy():
+            # An image set is loading, it is mixed once its last image is in
+            return False
+        spectra, weights, components = self.collect_mix_inputs()
+        if not spectra:
+            return False
+        colors = self.collect_color_inputs()
+        # Colour mixes always run at full resolution
+        preview = preview and not colors and self.mix_engine.preview_shape(spectra[0].full_shape) is not None
+        request = MixRequest(
+            spectra=spectra,
+            weights=weights,
+            components=components,
+            mode=self.mix_type.currentText(),
+            region=self.current_region(),
+            filters=self.collect_mix_filters(),
+            output_index=self.output_selector.currentIndex(),
+            preview=preview,
+        )
+        self.output_configs[request.output_index] = self.current_output_config()
+        if colors:
+            # Colour images are mixed channel by channel into the selected output
+            request.colors, request.color_mode = colors, get_color_mode()
+        elif self.mix_both_outputs.isChecked():
+            # The selected output follows the controls, the others keep their last settings; one pass mixes all
+            request.outputs = self.batch_outputs()
+        self.mix_scheduler.submit(request)
+        return preview
+
+    def current_output_config(self):
+        # Every input viewer's weight, component and filter, loaded or not, so the config outlives image changes
+        return MixConfig(
+            weights=[viewer.weight1_slider.value() / 100.0 for viewer in self.viewers],
+            components=[viewer.component_selector.currentText() for viewer in self.viewers],
+            mode=self.mix_type.currentText(),
+            region=self.current_region(),
+            filters=[viewer.current_filter() for viewer in self.viewers],
+        )
+
+    def batch_outputs(self):
+        # The remembered configs of all outputs, restricted to the viewers collect_mix_inputs takes
+        loaded = [i for i, viewer in enumerate(self.viewers)
+                  if viewer and getattr(viewer, 'spectrum', None) is not None]
+        return [(index, MixConfig([config.weights[i] for i in loaded], [config.components[i] for i in loaded],
+                                  config.mode, config.region, [config.filters[i] for i in loaded]))
+                for index, config in sorted(self.output_configs.items())]
+
+    def _on_mix_ready(self, generation, request, mixed_image):
+        if request.outputs:
+            for (index, _), image in zip(request.outputs, mixed_image):
+                output_viewer = self.outputViewers[index]
+                if output_viewer and output_viewer.originalImageLabel:
+                    self.show_mixed_image(output_viewer, image)
+            return
+        output_viewer = self.outputViewers[request.output_index]
+        if not output_viewer or not output_viewer.originalImageLabel:
+            return
+        self.show_mixed_image(output_viewer, mixed_image)
+
+    def _on_mix_failed(self, generation, message):
+        print(f"Error during real-time mixing: {message}")
+        if hasattr(self, 'show_error'):
+            self.show_error(f"Mixing failed: {message}")
+
+
+    def collect_mix_inputs(self):
+        # Snapshot the loaded spectra with their slider weights and selected components
+        spectra, weights, components = [], [], []
+        for viewer in self.viewers:
+            if viewer and getattr(viewer, 'toneAdjustmentPending', False):
+                # Mid-drag brightness/contrast reaches the mix at full resolution
+                viewer.applyToneAdjustment()
+            if viewer and getattr(viewer, 'spectrum', None) is not None:
+                spectra.append(viewer.spectrum)
+                weights.append(viewer.weight1_slider.value() / 100.0)
+                components.append(viewer.component_selector.currentText()) # To Just access the component data chosen by the Combo Box
+        return spectra, weights, components
+
+    def open_weight_sweep(self):
+        spectra, weights, components = self.collect_mix_inputs()
+        if not spectra:
+            self.show_error("Load at least one image to sweep its weights.")
+            return
+        self.sweep_dialog = SweepDialog(spectra, weights, components, self.mix_type.currentText(),
+                                        self.current_region(), self, filters=self.collect_mix_filters())
+        self.sweep_dialog.setAttribute(Qt.WA_DeleteOnClose)
+        self.sweep_dialog.show()
+
+    def collect_mix_filters(self):
+        # The radial filters of the viewers collect_mix_inputs takes
+        return [viewer.current_filter() for viewer in self.viewers
+                if viewer and getattr(viewer, 'spectrum', None) is not None]
+
+    def collect_color_inputs(self):
+        # In colour mode, the colour pixels of the viewers collect_mix_inputs takes; empty unless all have them
+        if not use_color():
+            return []
+        colors = [viewer.mixColorData for viewer in self.viewers
+                  if viewer and getattr(viewer, 'spectrum', None) is not None]
+        return colors if all(color is not None for color in colors) else []
+
+    def current_region(self):
+        inner = self.inner_region.isChecked()
+        if not self.region_size.isChecked():
+            return RegionSpec(inner=inner)
+        return RegionSpec.from_points(inner,
+                                      (self.topLeft.x(), self.topLeft.y()),
+                                      (self.bottomRight.x(), self.bottomRight.y()))
 
-    def mix_real_imaginary(self, components):
-        try:
-            first_ft = components[0]['ft']
-            result = np.zeros_like(first_ft, dtype=complex)
-            for comp in components:
-                weight = comp['weight']
-                type = comp['type']
-                if type == "FT Real":
-                    real = np.real(comp['ft'])
-                else:
-                    real = 0
-                result.real += weight * real
-            
-            for comp in components:
-                weight = comp['weight']
-                type = comp['type']
-                if type == "FT Imaginary":
-                    imag = np.imag(comp['ft'])
-                else:
-                    imag = 0
-                result.imag += weight * imag
-            
-            result = result.real + 1j * result.imag
-            
-            
-            return result , False
-            
-        except Exception as e:
-            print(f"Error in real/imaginary mixing: {str(e)}")
-            raise
+    def show_mixed_image(self, output_viewer, mixed_image):
+        pixmap = output_viewer.array_to_pixmap(downsample_for_display(mixed_image))
+        if pixmap and output_viewer.originalImageLabel:
+            output_viewer.originalImageLabel.setPixmap(pixmap.scaled(300, 300, Qt.IgnoreAspectRatio))
 
 
     def buildUI(self):
@@ -426,6 +402,10 @@ class ModernWindow(QMainWindow):
             viewers_grid.addWidget(viewer, i // 2, i % 2)
 
         left_layout.addLayout(viewers_grid)
+        self.load_set_button = QPushButton("Load Image Set")
+        self.load_set_button.setToolTip("Open several images at once, filling the input viewers in order (Ctrl+O)")
+        self.load_set_button.clicked.connect(self.load_image_set_dialog)
+        left_layout.addWidget(self.load_set_button)
         # Right panel for output and controls
         right_panel = QWidget()
         right_layout = QVBoxLayout(right_panel)
@@ -484,11 +464,19 @@ class ModernWindow(QMainWindow):
         self.output_selector = QComboBox()
         self.output_selector.addItems(["Output 1", "Output 2"])
         self.output_selector.currentIndexChanged.connect(self.real_time_mix)
+        self.mix_both_outputs = QCheckBox("Both")
+        self.mix_both_outputs.setToolTip("Keep the other output live with its last settings, mixed in the same pass")
+        self.mix_both_outputs.toggled.connect(lambda: self.real_time_mix())
         output_selector_layout.addWidget(output_label)
         output_selector_layout.addWidget(self.output_selector)
+        output_selector_layout.addWidget(self.mix_both_outputs)
         # Add widgets to layout
         mixing_type_layout.addWidget(self.mix_type)
         mixing_type_layout.addLayout(output_selector_layout)
+        self.sweep_button = QPushButton("Weight Sweep")
+        self.sweep_button.setToolTip("Mix a sequence of frames from the current weights to chosen end weights")
+        self.sweep_button.clicked.connect(self.open_weight_sweep)
+        mixing_type_layout.addWidget(self.sweep_button)
         right_layout.addWidget(mixing_type_group)
         # Mixing controls
         # Add mix button and progress bar
@@ -530,15 +518,19 @@ class ModernWindow(QMainWindow):
         self.setCentralWidget(self.container)
         self._setup_connection()
 
-    def unify_images(self, minimumSize):
-        for viewer in self.viewers:
-            imageData = viewer.get_image_data()
-            if viewer.imageData is not None:
-                # Resize the image using cv2.resize
-                target_row, target_column = minimumSize  # Assuming square resizing
-                viewer.imageData = cv2.resize(viewer.imageData, (target_column, target_row))
-                print(f"Image resized to: {viewer.imageData.shape}")
-                self.imageFourierTransform(viewer.imageData)
+    def unify_images(self, minimumSize=None):
+        # Resample every loaded image to one FFT-friendly size (from the smallest dimensions by default)
+        loaded = [viewer for viewer in self.viewers if getattr(viewer, 'nativeData', None) is not None]
+        target = tuple(minimumSize or unified_shape(viewer.nativeData.shape for viewer in loaded) or ())
+        pending = pending_resamples(self.viewers, target)
+        # Resize and transform every stale viewer concurrently
+        for index, resampled in resample_all(pending, target).items():
+            viewer = self.viewers[index]
+            reloaded = viewer.imageData is not None
+            viewer.setLoadedImage(resampled)
+            print(f"Image resized to: {viewer.imageData.shape}")
+            if reloaded:
+                viewer.displayFrequencyComponent(viewer.component_selector.currentText())
 
     def start_loading(self):
         self.timer.start(100)  # Set timer interval in milliseconds (e.g., 100 ms)
@@ -557,6 +549,74 @@ class ModernWindow(QMainWindow):
         logging.info("Exiting Application.")
         self.close()
 
+    def load_image_set_dialog(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Load Image Set", "", "Image Files (*.png *.jpg *.jpeg *.bmp)")
+        if paths:
+            self.load_image_set(paths)
+
+    def load_image_set(self, paths, first_viewer=0):
+        # Fill the input viewers from first_viewer on; every file is decoded, resized and transformed concurrently
+        paths = dict(zip(range(first_viewer, len(self.viewers)), paths))
+        if not paths or self.image_loader is None:
+            return
+        logging.info(f"Loading {len(paths)} images.")
+        for index in paths:
+            self.viewers[index].originalImageLabel.showLoadingSpinner()
+        if use_native_resolution():
+            # The unified size depends on every image, resampling waits until all are decoded
+            self._decoding_image_set = True
+            self.image_loader.decode(paths)
+        else:
+            self.image_loader.load(paths, LEGACY_SIZE)
+
+    def _on_image_decoded(self, index, loaded):
+        self.viewers[index].setDecodedImage(loaded)
+
+    def _on_image_loaded(self, index, loaded):
+        viewer = self.viewers[index]
+        viewer.setLoadedImage(loaded)
+        viewer.originalImageLabel.hideLoadingSpinner()
+        viewer.displayOriginalImage()
+        viewer.displayFrequencyComponent(viewer.component_selector.currentText())
+
+    def _on_image_load_failed(self, index, message):
+        self.viewers[index].originalImageLabel.hideLoadingSpinner()
+        print(f"Error loading image: {message}")
+        if hasattr(self, 'show_error'):
+            self.show_error(message)
+
+    def _on_image_set_finished(self):
+        if self._decoding_image_set:
+            self._decoding_image_set = False
+            loaded = [viewer for viewer in self.viewers if viewer.nativeData is not None]
+            target = unified_shape(viewer.nativeData.shape for viewer in loaded)
+            pending = pending_resamples(self.viewers, target) if target else {}
+            if pending:
+                for index in pending:
+                    self.viewers[index].originalImageLabel.showLoadingSpinner()
+                self.image_loader.resample(pending, target)
+                return
+        self.share_viewer_spectra()
+        # One mix once every viewer is ready, replacing any scheduled while loading
+        self.mix_timer.stop()
+        self.settle_timer.stop()
+        self.real_time_mix()
+
+    def share_viewer_spectra(self):
+        # One (N, H, W) stack backs the viewers' spectra, so their displays and the mix derive components once
+        spectra = [viewer.spectrum for viewer in self.viewers
+                   if viewer and getattr(viewer, 'spectrum', None) is not None]
+        if spectra and len({(spectrum.shape, spectrum.width, spectrum.dtype) for spectrum in spectra}) == 1:
+            stack_spectra(spectra)
+
+    def closeEvent(self, event):
+        self.settle_timer.stop()
+        if self.mix_scheduler is not None:
+            self.mix_scheduler.shutdown()
+        if self.image_loader is not None:
+            self.image_loader.wait()
+        super().closeEvent(event)
+
     def reset_rectangle(self, viewers):
         self.topLeft = QPoint(75, 75)
         self.topRight = QPoint(225, 75)
@@ -800,6 +860,13 @@ class MainController:
 
 class ImageViewerWidget(ModernWindow):
     weightChanged = pyqtSignal(float, str)
+    # Where the last pixmap shown for each component is kept for the ROI drawing
+    componentPixmapAttributes = {
+        "FT Magnitude": "magnitudeImage",
+        "FT Phase": "phaseImage",
+        "FT Real": "realImage",
+        "FT Imaginary": "imaginaryImage",
+    }
     def __init__(self, title, window=None, is_output=False):  
         # Initialize ModernWindow with skip_setup_ui=True
         super().__init__(self, skip_setup_ui=True)
@@ -814,13 +881,30 @@ class ImageViewerWidget(ModernWindow):
         self.phaseImage = None
         self.realImage = None
         self.imaginaryImage = None
-        self._ft_components = None
-        self._ft_magnitude = None
-        self._ft_phase = None
-        self._ft_real = None
-        self._ft_imaginary = None
+        # Display-ready (uint8 buffer, pixmap) per component, for the spectrum in componentDisplaysSpectrum
+        self.componentDisplays = {}
+        self.componentDisplaysSpectrum = None
+        self.spectrum = None
+        # The image as read from disk; imageData is its copy resampled to the unified size
+        self.nativeData = None
+        # Content hash of the loaded file, keys its spectra in the on-disk cache
+        self.sourceDigest = None
+        # Spectrum of nativeData, cropped or padded to the unified size with spectral resampling
+        self.nativeSpectrum = None
+        # Colour mode only: RGB pixels of nativeData and imageData, and of imageData with brightness/contrast
+        self.nativeColor = None
+        self.colorData = None
+        self.mixColorData = None
         self.brightness = 0 
         self.contrast = 1 
+        # Set while dragging; imageData is only adjusted at full resolution once the drag ends or a mix needs it
+        self.toneAdjustmentPending = False
+        self.toneTimer = QTimer(self)
+        self.toneTimer.setSingleShot(True)
+        self.toneTimer.timeout.connect(self.redrawTonePreview)
+        # Screen-sized copy of displayDataSource (an imageData or colorData array)
+        self.displayData = None
+        self.displayDataSource = None
         self.dragging = False
         self.last_mouse_pos = None
         self.last_pos = None
@@ -876,6 +960,7 @@ class ImageViewerWidget(ModernWindow):
                 }
             """)
             self.originalImageLabel.on_double_click = self.apply_effect  # Connect double-click event
+            self.originalImageLabel.filesDropped.connect(self.load_dropped_files)
             original_section.addWidget(original_label)
             original_section.addWidget(self.originalImageLabel)
             displays_layout.addLayout(original_section)
@@ -917,9 +1002,27 @@ class ImageViewerWidget(ModernWindow):
             self.weight1_slider.setValue(100)
 
             self.weight1_slider.valueChanged.connect(lambda: self.find_parent_window().schedule_real_time_mix())
+            self.weight1_slider.sliderReleased.connect(lambda: self.find_parent_window().finish_interactive_mix())
             weight_layout.addWidget(self.weight1_slider)
 
             weights_layout.addWidget(weight_widget)
+            # Radial filter applied to this input's spectrum before mixing
+            filter_widget = QWidget()
+            filter_layout = QHBoxLayout(filter_widget)
+            self.filter_selector = QComboBox()
+            self.filter_selector.addItems(list(FILTER_PRESETS))
+            self.filter_selector.setToolTip("Frequency filter applied to this image before mixing")
+            self.filter_selector.currentIndexChanged.connect(lambda: self.find_parent_window().real_time_mix())
+            filter_layout.addWidget(self.filter_selector)
+            self.filter_cutoff = QSlider(Qt.Horizontal)
+            self.filter_cutoff.setRange(1, 100)
+            self.filter_cutoff.setValue(50)
+            self.filter_cutoff.setToolTip("Filter cutoff radius, as a fraction of the spectrum's half size; "
+                                          "band-passes keep the octave below it")
+            self.filter_cutoff.valueChanged.connect(self._on_filter_cutoff_changed)
+            self.filter_cutoff.sliderReleased.connect(lambda: self.find_parent_window().finish_interactive_mix())
+            filter_layout.addWidget(self.filter_cutoff)
+            weights_layout.addWidget(filter_widget)
             layout.addWidget(self.weights_group)
 
         # Progress bar
@@ -932,6 +1035,14 @@ class ImageViewerWidget(ModernWindow):
         layout.addWidget(self.progress)
 
 
+    def current_filter(self):
+        return FilterSpec.from_preset(self.filter_selector.currentText(), self.filter_cutoff.value() / 100.0)
+
+    def _on_filter_cutoff_changed(self):
+        # Only a selected filter depends on the cutoff
+        if self.filter_selector.currentIndex() > 0:
+            self.find_parent_window().schedule_real_time_mix()
+
     def _on_slider_changed(self):
         # Find the parent ModernWindow instance
         parent = self
@@ -979,13 +1090,10 @@ class ImageViewerWidget(ModernWindow):
                     self.last_pos = event.pos()
                 delta_x = event.pos().x() - self.last_pos.x()
                 delta_y = event.pos().y() - self.last_pos.y()
-                # Adjust brightness and contrast based on mouse movement
-                newImageData = self.adjust_brightness_contrast(delta_x / 10, delta_y / 10)
+                # Adjust brightness and contrast based on mouse movement, only the preview follows the drag
+                self.adjust_brightness_contrast(delta_x / 10, delta_y / 10)
                 # Update last position for the next event
                 self.last_pos = event.pos()
-                # Process the adjusted image
-                self.imageFourierTransform(newImageData)
-                self.displayFrequencyComponent(self.component_selector.currentText())
 
             elif self.ftComponentLabel.underMouse():
                 parent = self.find_parent_window()
@@ -994,6 +1102,12 @@ class ImageViewerWidget(ModernWindow):
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton:
+            if self.resizing_edge is not None:
+                self.find_parent_window().finish_interactive_mix()
+            if self.toneAdjustmentPending:
+                # The brightness/contrast drag ended, mix the full-resolution result
+                self.applyToneAdjustment()
+                self.displayFrequencyComponent(self.component_selector.currentText())
             self.dragging = False
             self.resizing_edge = None
 
@@ -1005,20 +1119,26 @@ class ImageViewerWidget(ModernWindow):
         self.contrast = np.clip(self.contrast + delta_x * contrast_step, 0.5, 2)
         print(f"Brightness: {self.brightness}, Contrast: {self.contrast}")
         if self.imageData is not None:
-            print("Adjusting image brightness and contrast...")
-            # Apply contrast and brightness adjustments
-            adjusted_image = cv2.convertScaleAbs(self.imageData, alpha=self.contrast, beta=self.brightness)
-            adjusted_image = np.clip(adjusted_image, 0, 255).astype(np.uint8)
-            # Convert NumPy array back to QImage
-            height, width = adjusted_image.shape
-            bytes_per_line = 3 * width
-            q_image = QImage(adjusted_image.data, width, height, QImage.Format_Grayscale8)
-            # Convert to grayscale if needed (optional step, remove if not desired)
-            # Update QLabel display
-            pixmap_image = QPixmap.fromImage(q_image)
-            pixmap_image = pixmap_image.scaled(300, 300, Qt.IgnoreAspectRatio)
-            self.originalImageLabel.setPixmap(pixmap_image)
-            return adjusted_image
+            self.toneAdjustmentPending = True
+            # Coalesce mouse moves into at most one redraw per screen refresh
+            if not self.toneTimer.isActive():
+                self.toneTimer.start(refresh_interval_ms(self))
+
+    def redrawTonePreview(self):
+        # The LUT on the cached screen-sized copy costs a fraction of a millisecond at any image size
+        if self.imageData is None:
+            return
+        pixmap_image = array_to_pixmap(apply_tone(self.displayImage(), self.contrast, self.brightness))
+        self.originalImageLabel.setPixmap(pixmap_image.scaled(300, 300, Qt.IgnoreAspectRatio))
+
+    def applyToneAdjustment(self):
+        # Transform the full-resolution adjusted image; a no-op unless a drag left it pending
+        if not self.toneAdjustmentPending or self.imageData is None:
+            return
+        self.toneAdjustmentPending = False
+        self.imageFourierTransform(apply_tone(self.imageData, self.contrast, self.brightness))
+        if self.colorData is not None:
+            self.mixColorData = apply_tone(self.colorData, self.contrast, self.brightness)
 
     def resizeRectangle(self):
         if self.resizing_edge is not None:
@@ -1062,10 +1182,13 @@ class ImageViewerWidget(ModernWindow):
         try:
             filePath, _ = QFileDialog.getOpenFileName(None, "Open Image", "", "Image Files (*.png *.jpg *.jpeg *.bmp)")
             if filePath:
-                # Load the image
-                self.imageData = cv2.imread(filePath, cv2.IMREAD_GRAYSCALE)
-                self.imageData = cv2.resize(self.imageData, (600,600))
-                self.imageFourierTransform(self.imageData)
+                if use_native_resolution():
+                    # The unified size follows the loaded images, so every viewer may need resampling
+                    self.setDecodedImage(decode_file(filePath))
+                    parent.unify_images()
+                else:
+                    # Decoding and resizing only happen on a spectrum cache miss
+                    self.setLoadedImage(load_file(filePath, LEGACY_SIZE))
                 
                 return self.imageData
             return 
@@ -1074,64 +1197,41 @@ class ImageViewerWidget(ModernWindow):
 
     # ------------------------------------------------------------- Getters and Setters ------------------------------------------------------------ #
     def imageFourierTransform(self, imageData):
-        fftComponents = np.fft.fft2(imageData)
-        fftComponentsShifted = np.fft.fftshift(fftComponents)
-        self.fftComponents= fftComponentsShifted
-        ftMagnitudes_Spectrum = np.abs(self.fftComponents)
-        
-        self.set_component_data("magnitude", ftMagnitudes_Spectrum)
-        
-        
-        self.set_component_data("phase" , np.angle(self.fftComponents))
-        self.set_component_data("real", np.real(self.fftComponents))
-        self.set_component_data("imaginary", np.imag(self.fftComponents))
+        # Magnitude/phase are derived lazily and shared with the mixer
+        self.spectrum = transform(imageData)
+
+    @property
+    def fftComponents(self):
+        # Read through the spectrum, which becomes a view of the viewers' shared stack once a set is loaded
+        return None if self.spectrum is None else self.spectrum.data
+
+    def setDecodedImage(self, loaded):
+        # A freshly decoded file, waiting to be resampled to the unified size
+        self.nativeData = loaded.native
+        self.sourceDigest = loaded.digest
+        self.nativeSpectrum = None
+        self.imageData = None
+        self.nativeColor = loaded.native_color
+        self.colorData = self.mixColorData = None
+        self.toneAdjustmentPending = False
+
+    def setLoadedImage(self, loaded):
+        self.nativeData = loaded.native
+        self.sourceDigest = loaded.digest
+        self.nativeSpectrum = loaded.native_spectrum
+        self.imageData = loaded.image
+        self.spectrum = loaded.spectrum
+        self.nativeColor = loaded.native_color
+        self.colorData = self.mixColorData = loaded.color
+        self.toneAdjustmentPending = False
 
     def array_to_pixmap(self, array):
-        height, width = array.shape
-        bytes_per_line = width
-        image_data = array.tobytes()
-        qimage = QImage(image_data, width, height, bytes_per_line, QImage.Format_Grayscale8)
-        return QPixmap.fromImage(qimage)
+        return array_to_pixmap(array)
 
-    def displayFrequencyComponent(self, PlottedComponent):    
-        if PlottedComponent == "FT Magnitude":
-            # Take the Magnitude as log scale
-            #ftMagnitudes = np.fft.fftshift(self.ftMagnitudes)
-            ftMagnitudes = self.get_component_data("magnitude")
-            ftLog = np.log1p(ftMagnitudes)
-            ftNormalized = (255 * (ftLog - ftLog.min()) / (ftLog.max() - ftLog.min())).astype(np.uint8)
-            pixmap = self.array_to_pixmap(ftNormalized)
-            pixmap = pixmap.scaled(300, 300, Qt.IgnoreAspectRatio)
-            self.magnitudeImage = pixmap
-            self.ftComponentLabel.setPixmap(pixmap)
-
-        elif PlottedComponent == "FT Phase":
-            # Ensure phase is within -pi to pi range and Ajdust for visualization (between 0 - 255)
-            #ftPhases = np.fft.fftshift(self.ftPhase)
-            ftPhases = self.get_component_data("phase")
-            f_normalized =  (255 * (ftPhases - ftPhases.min()) / (ftPhases.max() - ftPhases.min())).astype(np.uint8)
-            pixmap = self.array_to_pixmap(f_normalized)
-            pixmap = pixmap.scaled(300, 300, Qt.IgnoreAspectRatio)
-            self.phaseImage = pixmap
-            self.ftComponentLabel.setPixmap(pixmap)
-
-        elif PlottedComponent == "FT Real":
-            # Normalization and Adjustment for visualization
-            #ftReals = np.fft.fftshift(self.ftReal)
-            ftReals = self.get_component_data("real")
-            f_normalized = (255 * (ftReals - ftReals.min()) / (ftReals.max() - ftReals.min())).astype(np.uint8)
-            pixmap = self.array_to_pixmap(f_normalized)
-            pixmap = pixmap.scaled(300, 300, Qt.IgnoreAspectRatio)
-            self.realImage = pixmap
-            self.ftComponentLabel.setPixmap(pixmap)
-
-        elif PlottedComponent == "FT Imaginary":
-            #ftImaginaries = np.fft.fftshift(self.ftImaginary)
-            ftImaginaries = self.get_component_data("imaginary")
-            ftNormalized =  (255 * (ftImaginaries - ftImaginaries.min()) / (ftImaginaries.max() - ftImaginaries.min())).astype(np.uint8)
-            pixmap = self.array_to_pixmap(ftNormalized)
-            pixmap = pixmap.scaled(300, 300, Qt.IgnoreAspectRatio)
-            self.imaginaryImage = pixmap
+    def displayFrequencyComponent(self, PlottedComponent):
+        pixmap = self.componentPixmap(PlottedComponent)
+        if pixmap is not None:
+            setattr(self, self.componentPixmapAttributes[PlottedComponent], pixmap)
             self.ftComponentLabel.setPixmap(pixmap)
 
         parent = self.find_parent_window()
@@ -1139,27 +1239,43 @@ class ImageViewerWidget(ModernWindow):
         if parent.region_size.isChecked():
             parent.draw_rectangle( parent.viewers ,parent.region)
 
+    def componentPixmap(self, PlottedComponent):
+        # Rendered once per component and spectrum, switching components afterwards is a lookup
+        if self.componentDisplaysSpectrum is not self.spectrum:
+            self.componentDisplays = {}
+            self.componentDisplaysSpectrum = self.spectrum
+        if self.spectrum is None or PlottedComponent not in self.componentPixmapAttributes:
+            return None
+        if PlottedComponent not in self.componentDisplays:
+            buffer = np.ascontiguousarray(self.renderComponent(PlottedComponent))
+            pixmap = self.array_to_pixmap(buffer).scaled(300, 300, Qt.IgnoreAspectRatio)
+            self.componentDisplays[PlottedComponent] = (buffer, pixmap)
+        return self.componentDisplays[PlottedComponent][1]
+
+    def renderComponent(self, PlottedComponent):
+        # uint8 picture of a component at display size
+        if PlottedComponent == "FT Magnitude":
+            # Take the Magnitude as log scale
+            ftLog = np.log1p(self.get_display_component("magnitude"))
+            return (255 * (ftLog - ftLog.min()) / (ftLog.max() - ftLog.min())).astype(np.uint8)
+        if PlottedComponent == "FT Phase":
+            ftPhases = self.get_display_component("phase")
+            return (255 * (ftPhases - ftPhases.min()) / (ftPhases.max() - ftPhases.min())).astype(np.uint8)
+        if PlottedComponent == "FT Real":
+            ftReals = self.get_display_component("real")
+            return (255 * (ftReals - ftReals.min()) / (ftReals.max() - ftReals.min())).astype(np.uint8)
+        ftImaginaries = self.get_display_component("imaginary")
+        return (255 * (ftImaginaries - ftImaginaries.min()) / (ftImaginaries.max() - ftImaginaries.min())).astype(np.uint8)
+
 
     #-------------------------------------------------------------------------------------------------------------------------------------- #
     def get_component_data(self, component):
-        if component == "magnitude":
-            return self.ftMagnitudes
-        elif component == "phase":
-            return self.ftPhase
-        elif component == "real":
-            return self.ftReal
-        else:
-            return self.ftImaginary
-        
-    def set_component_data(self, component, value):
-        if component == "magnitude":
-            self.ftMagnitudes = value
-        elif component == "phase":
-            self.ftPhase = value
-        elif component == "real":
-            self.ftReal = value
-        else:
-            self.ftImaginary = value
+        # Half spectra get their missing half mirrored back for display
+        return self.spectrum.full_component(component)
+
+    def get_display_component(self, component):
+        # The labels are tiny next to native-resolution spectra, only shrink for the screen
+        return downsample_for_display(self.get_component_data(component))
 
     def find_parent_window(self):
         # Get the top-level window
@@ -1182,12 +1298,38 @@ class ImageViewerWidget(ModernWindow):
 
     def convert_data_to_image(self, imageData):
         try:
-            height, width = imageData.shape
-            qImg = QtGui.QImage(imageData.data, width, height, QtGui.QImage.Format_Grayscale8)
-            return qImg
+            # Wraps the array without copying and keeps it alive with the image
+            return array_to_qimage(imageData)
         except Exception as e:
             print(e)
 
+    def load_dropped_files(self, paths):
+        # Several files dropped at once fill this viewer and the ones after it
+        parent = self.find_parent_window()
+        if parent is not None and self in parent.viewers:
+            parent.load_image_set(paths, parent.viewers.index(self))
+
+    def displayImage(self):
+        # imageData (its colour pixels in colour mode) shrunk for the label, computed once per image
+        source = self.colorData if self.colorData is not None else self.imageData
+        if self.displayDataSource is not source:
+            self.displayData = downsample_for_display(source) if source is not None else None
+            self.displayDataSource = source
+        return self.displayData
+
+    def displayOriginalImage(self):
+        self.qImage = self.convert_data_to_image(self.displayImage())
+        if self.qImage is None or self.imageData is None:
+            raise Exception("Failed to load image")
+        pixmapImage = QPixmap.fromImage(self.qImage)
+        label_height = int(self.originalImageLabel.height())
+        label_width = int(self.originalImageLabel.width())
+        pixmapImage = pixmapImage.scaled(
+            label_width, label_height,
+            aspectRatioMode=Qt.AspectRatioMode.IgnoreAspectRatio
+        )
+        self.originalImageLabel.setPixmap(pixmapImage)
+
     def apply_effect(self):
         try:            
             self.originalImageLabel.showLoadingSpinner()
@@ -1197,22 +1339,9 @@ class ImageViewerWidget(ModernWindow):
             self.imageData = self.loadImage(parent)
             
             
-            self.qImage = self.convert_data_to_image(self.imageData)
-            print(self.qImage)
-            if self.qImage is None or self.imageData is None:
-                raise Exception("Failed to load image")
+            self.displayOriginalImage()
             print("Image Loaded")
             logging.info("Loading an Image.")
-            # Display original image
-            pixmapImage = QPixmap.fromImage(self.qImage)
-            label_height = int(self.originalImageLabel.height())
-            label_width = int(self.originalImageLabel.width())
-            print(label_height, label_width)
-            pixmapImage = pixmapImage.scaled(
-                label_width, label_height,
-                aspectRatioMode=Qt.AspectRatioMode.IgnoreAspectRatio
-            )
-            self.originalImageLabel.setPixmap(pixmapImage)
 
             print("Image Displayed")
             self.displayFrequencyComponent("FT Magnitude")
@@ -0,0 +1,241 @@
+"""Time the mix path and report its peak memory.
+
+Usage: python MixBenchmark.py [--size 600] [--inputs 4] [--repeat 20] [--precision single] [--half-spectrum]
+       python MixBenchmark.py --outputs 2 [--size 600] [--inputs 4]
+       python MixBenchmark.py --sweep 30 [--size 600] [--inputs 4]
+       python MixBenchmark.py --color [--size 600] [--inputs 4]
+       python MixBenchmark.py --filters [--size 600] [--inputs 4]
+       python MixBenchmark.py --check-precision [--tolerance 2]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+import numpy as np
+from ColorMix import ColorMixer, RGB, YCBCR, LUMINANCE, transform_colors
+from MixEngine import (MixConfig, MixEngine, RegionSpec, MAGNITUDE, PHASE, REAL, IMAGINARY,
+                       MAGNITUDE_PHASE, REAL_IMAGINARY)
+from RadialFilter import FilterCache, FilterSpec, GAUSSIAN, LOW_PASS
+from Spectrum import transform, SINGLE, DOUBLE, COMPLEX_DTYPES
+
+MODES = {
+    MAGNITUDE_PHASE: (MAGNITUDE, PHASE),
+    REAL_IMAGINARY: (REAL, IMAGINARY),
+}
+
+
+REGIONS = [
+    RegionSpec(inner=True),
+    RegionSpec(inner=True, left=0.4, top=0.4, right=0.6, bottom=0.6),
+    RegionSpec(inner=False, left=0.3, top=0.2, right=0.7, bottom=0.9),
+]
+
+
+def random_images(size: int, count: int, seed: int = 0) -> np.ndarray:
+    # 8-bit like the grayscale images the viewers load
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (count, size, size), dtype=np.uint8)
+
+
+def random_spectra(size: int, count: int, seed: int = 0, precision: str = DOUBLE, half: bool = False):
+    return [transform(image, precision=precision, half=half) for image in random_images(size, count, seed)]
+
+
+def precision_error(size: int, count: int) -> int:
+    """Largest output pixel difference between single and double precision mixes."""
+    images = random_images(size, count)
+    single = [transform(image, precision=SINGLE) for image in images]
+    double = [transform(image, precision=DOUBLE) for image in images]
+    single_engine, double_engine = MixEngine(), MixEngine()
+    weights = list(np.linspace(0.2, 1.0, count))
+    worst = 0
+    for mode, selection in MODES.items():
+        for components in ([selection[i % 2] for i in range(count)], [selection[0]] * count):
+            for region in REGIONS:
+                expected = double_engine.mix(double, weights, components, mode, region).astype(int)
+                actual = single_engine.mix(single, weights, components, mode, region).astype(int)
+                worst = max(worst, int(np.abs(actual - expected).max()))
+    return worst
+
+
+def benchmark_mode(engine: MixEngine, spectra, mode: str, region: RegionSpec, repeat: int):
+    """Return (cold seconds, mean steady-state seconds, steady-state peak bytes)."""
+    selection = MODES[mode]
+    components = [selection[i % 2] for i in range(len(spectra))]
+    weights = np.linspace(0.2, 1.0, len(spectra))
+
+    start = time.perf_counter()
+    engine.mix(spectra, list(weights), components, mode, region)
+    cold = time.perf_counter() - start
+
+    # Steady state: only the weights move, like a slider drag
+    timings = []
+    tracemalloc.start()
+    for step in range(repeat):
+        weights = np.roll(weights, 1)
+        start = time.perf_counter()
+        engine.mix(spectra, list(weights), components, mode, region)
+        timings.append(time.perf_counter() - start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cold, float(np.mean(timings)), peak
+
+
+def benchmark_batch(spectra, mode: str, outputs: int, repeat: int):
+    """Return (mean seconds for separate mixes, mean seconds for one mix_batch) of outputs configs."""
+    selection = MODES[mode]
+    components = [selection[i % 2] for i in range(len(spectra))]
+    configs = [MixConfig(np.roll(np.linspace(0.2, 1.0, len(spectra)), k), components, mode, REGIONS[k % len(REGIONS)])
+               for k in range(outputs)]
+    separate_engine, batch_engine = MixEngine(), MixEngine()
+    timings = {"separate": [], "batch": []}
+    for step in range(repeat + 1):
+        start = time.perf_counter()
+        for config in configs:
+            separate_engine.mix(spectra, list(config.weights), config.components, config.mode, config.region)
+        separate = time.perf_counter() - start
+        start = time.perf_counter()
+        batch_engine.mix_batch(spectra, configs)
+        batch = time.perf_counter() - start
+        if step:
+            # The first round allocates buffers and fills caches
+            timings["separate"].append(separate)
+            timings["batch"].append(batch)
+    return float(np.mean(timings["separate"])), float(np.mean(timings["batch"]))
+
+
+def benchmark_sweep(spectra, mode: str, steps: int):
+    """Return (seconds for steps separate mixes, seconds for one mix_sweep) of a weight sweep."""
+    selection = MODES[mode]
+    components = [selection[i % 2] for i in range(len(spectra))]
+    start_weights = np.linspace(0.2, 1.0, len(spectra))
+    end_weights = start_weights[::-1]
+    separate_engine, sweep_engine = MixEngine(), MixEngine()
+    # Warm both engines' stacks, magnitudes/phases and caches first
+    separate_engine.mix(spectra, list(start_weights), components, mode)
+    sweep_engine.mix_sweep(spectra, start_weights, end_weights, 1, components, mode)
+    start = time.perf_counter()
+    for weights in np.linspace(start_weights, end_weights, steps):
+        separate_engine.mix(spectra, list(weights), components, mode)
+    separate = time.perf_counter() - start
+    start = time.perf_counter()
+    sweep_engine.mix_sweep(spectra, start_weights, end_weights, steps, components, mode)
+    return separate, time.perf_counter() - start
+
+
+def benchmark_color(size: int, count: int, mode: str, repeat: int):
+    """Return (seconds to transform every channel, mean steady-state seconds per colour mix) per colour mode."""
+    images = list(random_images(size, 3 * count).reshape(count, 3, size, size).transpose(0, 2, 3, 1))
+    selection = MODES[mode]
+    components = [selection[i % 2] for i in range(count)]
+    weights = np.linspace(0.2, 1.0, count)
+    results = {}
+    for color_mode in (RGB, YCBCR, LUMINANCE):
+        start = time.perf_counter()
+        transform_colors(images, color_mode)
+        transform_time = time.perf_counter() - start
+        mixer = ColorMixer()
+        mixer.mix(images, list(weights), components, mode, color_mode=color_mode)
+        start = time.perf_counter()
+        for step in range(repeat):
+            mixer.mix(images, list(np.roll(weights, step + 1)), components, mode, color_mode=color_mode)
+        results[color_mode] = (transform_time, (time.perf_counter() - start) / repeat)
+    return results
+
+
+def benchmark_filters(spectra, mode: str, repeat: int):
+    """Return (seconds to build the radius index, mean seconds per unfiltered mix, mean seconds per mix
+    with every input filtered and the cutoff changed each time)."""
+    full_shape = (spectra[0].shape[-2], spectra[0].full_shape[-1])
+    start = time.perf_counter()
+    FilterCache().radius_index(full_shape, half=spectra[0].half)
+    index_time = time.perf_counter() - start
+    selection = MODES[mode]
+    components = [selection[i % 2] for i in range(len(spectra))]
+    weights = [1.0] * len(spectra)
+    engine = MixEngine()
+    engine.mix(spectra, weights, components, mode)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        engine.mix(spectra, weights, components, mode)
+    plain = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for step in range(repeat):
+        # A new cutoff every mix, as when dragging the cutoff slider: each one is a table lookup
+        spec = FilterSpec(GAUSSIAN, LOW_PASS, 0.1 + 0.8 * step / repeat)
+        engine.mix(spectra, weights, components, mode, filters=[spec] * len(spectra))
+    filtered = (time.perf_counter() - start) / repeat
+    return index_time, plain, filtered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Fourier mix path")
+    parser.add_argument("--size", type=int, default=600, help="Side length of the square test images")
+    parser.add_argument("--inputs", type=int, default=4, help="Number of input spectra")
+    parser.add_argument("--repeat", type=int, default=20, help="Steady-state mixes per mode")
+    parser.add_argument("--precision", choices=list(COMPLEX_DTYPES), default=DOUBLE)
+    parser.add_argument("--half-spectrum", action="store_true", help="Store rfft2 half spectra")
+    parser.add_argument("--check-precision", action="store_true",
+                        help="Compare single against double precision output and fail above --tolerance")
+    parser.add_argument("--tolerance", type=int, default=2, help="Allowed max pixel difference (0..255)")
+    parser.add_argument("--outputs", type=int, default=0,
+                        help="Compare this many separate mixes against one batched mix")
+    parser.add_argument("--color", action="store_true",
+                        help="Time the colour modes: transforming every channel and steady-state mixes")
+    parser.add_argument("--sweep", type=int, default=0,
+                        help="Compare a weight sweep of this many steps against one mix per step")
+    parser.add_argument("--filters", action="store_true",
+                        help="Time mixes with radial filters whose cutoff changes every mix")
+    args = parser.parse_args()
+
+    if args.check_precision:
+        worst = precision_error(args.size, args.inputs)
+        print(f"Max pixel difference single vs double: {worst} (tolerance {args.tolerance})")
+        sys.exit(0 if worst <= args.tolerance else 1)
+
+    if args.color:
+        print(f"{args.inputs} colour inputs of {args.size}x{args.size}")
+        for mode in MODES:
+            for color_mode, (transform_time, mix_time) in benchmark_color(args.size, args.inputs, mode,
+                                                                          args.repeat).items():
+                print(f"{mode:16s} {color_mode:10s} transform {transform_time * 1000:8.1f} ms  "
+                      f"mix {mix_time * 1000:8.1f} ms")
+        return
+
+    spectra = random_spectra(args.size, args.inputs, precision=args.precision, half=args.half_spectrum)
+    if args.sweep:
+        print(f"{args.sweep}-step weight sweep over {args.inputs} inputs of {args.size}x{args.size}")
+        for mode in MODES:
+            separate, sweep = benchmark_sweep(spectra, mode, args.sweep)
+            print(f"{mode:16s} separate {separate * 1000:8.1f} ms  sweep {sweep * 1000:8.1f} ms")
+        return
+    if args.filters:
+        print(f"Radial filters on {args.inputs} inputs of {args.size}x{args.size}")
+        for mode in MODES:
+            index_time, plain, filtered = benchmark_filters(spectra, mode, args.repeat)
+            print(f"{mode:16s} radius index {index_time * 1000:8.1f} ms  unfiltered {plain * 1000:8.1f} ms  "
+                  f"new cutoff {filtered * 1000:8.1f} ms")
+        return
+    if args.outputs:
+        print(f"{args.outputs} outputs from {args.inputs} inputs of {args.size}x{args.size}")
+        for mode in MODES:
+            separate, batch = benchmark_batch(spectra, mode, args.outputs, args.repeat)
+            print(f"{mode:16s} separate {separate * 1000:8.1f} ms  batched {batch * 1000:8.1f} ms")
+        return
+
+    region = RegionSpec(inner=True, left=0.25, top=0.25, right=0.75, bottom=0.75)
+    engine = MixEngine()
+    spectrum_mib = spectra[0].data.nbytes / 2 ** 20
+
+    print(f"{args.inputs} inputs of {args.size}x{args.size}, {args.precision} precision "
+          f"{'half' if args.half_spectrum else 'full'} spectra "
+          f"(one spectrum = {spectrum_mib:.1f} MiB)")
+    for mode in MODES:
+        cold, steady, peak = benchmark_mode(engine, spectra, mode, region, args.repeat)
+        print(f"{mode:16s} cold {cold * 1000:8.1f} ms  steady {steady * 1000:8.1f} ms  "
+              f"steady peak {peak / 2 ** 20:8.2f} MiB")
+    print(f"Workspace buffers: {engine.workspace(spectra[0].shape, spectra[0].dtype, spectra[0].width).nbytes / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
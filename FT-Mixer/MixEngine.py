@@ -0,0 +1,823 @@
+import copy
+from dataclasses import dataclass, field, replace
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from FFTBackend import ifft2, irfft2
+from RadialFilter import FilterCache, FilterSpec
+from RegionMask import RegionMaskCache
+from Spectrum import Spectrum, as_spectrum, real_dtype_of, stack_spectra
+
+SpectrumLike = Union[Spectrum, np.ndarray]
+# A list of (H, W) spectra, or one (N, H, W) stacked spectrum
+SpectraLike = Union[Sequence[SpectrumLike], Spectrum, np.ndarray]
+
+# Component names as shown in the viewers' combo boxes
+MAGNITUDE = "FT Magnitude"
+PHASE = "FT Phase"
+REAL = "FT Real"
+IMAGINARY = "FT Imaginary"
+
+# Mixing modes as shown in the mix type combo box
+MAGNITUDE_PHASE = "Magnitude/Phase"
+REAL_IMAGINARY = "Real/Imaginary"
+
+PREVIEW_SIZE = 256  # longest side, in pixels, of the low-resolution previews shown while dragging
+SWEEP_MAX_BYTES = 256 * 2 ** 20  # mixed spectra reconstructed by one batched inverse FFT of a weight sweep
+
+
+class MixCancelled(Exception):
+    """Raised when a mix is abandoned between two stages."""
+
+
+@dataclass
+class RegionSpec:
+    """Rectangular frequency region in normalized (0..1) spectrum coordinates.
+
+    The rectangle is expressed over the centred (fftshifted) spectrum, so the
+    default full rectangle selects every frequency.
+    """
+    inner: bool = True
+    left: float = 0.0
+    top: float = 0.0
+    right: float = 1.0
+    bottom: float = 1.0
+
+    @classmethod
+    def from_points(cls, inner: bool, top_left: Tuple[int, int], bottom_right: Tuple[int, int],
+                    frame_size: int = 300) -> 'RegionSpec':
+        """Build a region from rectangle corners drawn on a square display frame."""
+        return cls(
+            inner=inner,
+            left=top_left[0] / frame_size,
+            top=top_left[1] / frame_size,
+            right=bottom_right[0] / frame_size,
+            bottom=bottom_right[1] / frame_size,
+        )
+
+    def bounds(self, shape: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        """Return (row_start, row_end, col_start, col_end) for a centred spectrum of this shape."""
+        rows, cols = shape[-2], shape[-1]
+        center_row, center_col = rows // 2, cols // 2
+        # Both edges are inclusive frequency offsets from the centre, so a centred rectangle keeps
+        # frequencies -a..+a and is point-symmetric, which half spectra rely on. The full fractions
+        # reach offset rows // 2 on both sides, every frequency of an odd or even length.
+        row_start = center_row - int((0.5 - self.top) * 2 * center_row)
+        row_end = center_row + int((self.bottom - 0.5) * 2 * center_row) + 1
+        col_start = center_col - int((0.5 - self.left) * 2 * center_col)
+        col_end = center_col + int((self.right - 0.5) * 2 * center_col) + 1
+        return (max(0, row_start), min(rows, row_end),
+                max(0, col_start), min(cols, col_end))
+
+    def rescaled(self, full_shape: Tuple[int, int], shape: Tuple[int, int]) -> 'RegionSpec':
+        """The same frequencies expressed on the central shape-sized window of a full_shape spectrum."""
+        row_scale = full_shape[-2] / shape[-2]
+        col_scale = full_shape[-1] / shape[-1]
+        return RegionSpec(
+            inner=self.inner,
+            left=0.5 - (0.5 - self.left) * col_scale,
+            top=0.5 - (0.5 - self.top) * row_scale,
+            right=0.5 + (self.right - 0.5) * col_scale,
+            bottom=0.5 + (self.bottom - 0.5) * row_scale,
+        )
+
+
+@dataclass
+class MixConfig:
+    """Settings of one output of a batched mix."""
+    weights: Sequence[float]
+    components: Sequence[str]
+    mode: str = MAGNITUDE_PHASE
+    region: RegionSpec = field(default_factory=RegionSpec)
+    # Radial filter per input, empty when no input is filtered
+    filters: Sequence[FilterSpec] = ()
+
+    def __post_init__(self):
+        # Tuples, so configs compare by value and identical outputs are mixed once
+        self.weights = tuple(float(weight) for weight in self.weights)
+        self.components = tuple(self.components)
+        self.filters = tuple(self.filters)
+
+
+@dataclass
+class _StackCache:
+    """Contiguous (N, H, W) stack of the last list of input spectra."""
+    spectra: tuple
+    stack: Spectrum
+
+    def matches(self, spectra: Sequence[SpectrumLike]) -> bool:
+        # Spectra are compared by identity: viewers replace their array on every new transform. Spectrum
+        # inputs must still be views of this stack, not of one another engine stacked them into since
+        return (len(spectra) == len(self.spectra)
+                and all(a is b and (not isinstance(a, Spectrum) or a.stacked_in(self.stack) == index)
+                        for index, (a, b) in enumerate(zip(spectra, self.spectra))))
+
+
+@dataclass
+class _ContributionCache:
+    """Spatial images of the masked real/imaginary components of the inputs selecting one."""
+    stack: Spectrum
+    components: Tuple[str, ...]
+    region: RegionSpec
+    filters: Optional[Tuple[FilterSpec, ...]]
+    indices: List[int]
+    images: Optional[np.ndarray]
+
+    def matches(self, stack: Spectrum, components: Sequence[str], region: RegionSpec,
+                filters: Optional[Tuple[FilterSpec, ...]]) -> bool:
+        return (stack is self.stack and tuple(components) == self.components and region == self.region
+                and filters == self.filters)
+
+
+class MixWorkspace:
+    """Reusable image-sized buffers for one spectrum shape and precision.
+
+    Buffers follow the spectra's precision (complex64 or complex128) and,
+    for rfft2 half spectra, their (H, W // 2 + 1) shape; the image buffer
+    always has the full image width. Every stage of a steady-state mix writes into these with out= ufuncs,
+    so moving a slider allocates nothing of image size except the returned
+    uint8 image.
+    """
+
+    def __init__(self, shape: Tuple[int, int], dtype: np.dtype = np.complex128, width: Optional[int] = None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.width = width
+        real_dtype = real_dtype_of(self.dtype)
+        self.magnitude = np.empty(self.shape, dtype=real_dtype)
+        self.phase = np.empty(self.shape, dtype=real_dtype)
+        self.image = np.empty((self.shape[0], width or self.shape[1]), dtype=real_dtype)
+        self.spectrum = np.empty(self.shape, dtype=self.dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in (self.magnitude, self.phase, self.image, self.spectrum))
+
+
+class MixBatchWorkspace:
+    """Buffers for mixing several outputs of the same inputs at once.
+
+    The magnitude/phase scratch is shared by every output; only the mixed
+    spectra, which the batched inverse FFT needs side by side, and the
+    images it returns have a slot per output.
+    """
+
+    def __init__(self, count: int, shape: Tuple[int, int], dtype: np.dtype = np.complex128,
+                 width: Optional[int] = None):
+        self.count = count
+        self.scratch = MixWorkspace(shape, dtype, width)
+        self.spectra = np.empty((count,) + self.scratch.shape, dtype=self.scratch.dtype)
+        self.images = np.empty((count,) + self.scratch.image.shape, dtype=self.scratch.image.dtype)
+
+    def matches(self, count: int, shape: Tuple[int, int], dtype: np.dtype, width: Optional[int]) -> bool:
+        return (self.count == count and self.scratch.shape == tuple(shape)
+                and self.scratch.dtype == np.dtype(dtype) and self.scratch.width == width)
+
+    def output(self, index: int) -> MixWorkspace:
+        """The shared scratch buffers, with the mixed spectrum going to this output's slot."""
+        workspace = copy.copy(self.scratch)
+        workspace.spectrum = self.spectra[index]
+        return workspace
+
+    @property
+    def nbytes(self) -> int:
+        return self.scratch.nbytes + self.spectra.nbytes + self.images.nbytes
+
+
+class MixEngine:
+    """Qt-free Fourier mixer working on centred (fftshifted) spectra.
+
+    Inputs are combined as one contiguous (N, H, W) stack: every weighted
+    sum is a single reduction over the input axis, so any number of inputs
+    costs one pass instead of one pass per input.
+    """
+
+    def __init__(self):
+        self.masks = RegionMaskCache()
+        self.filters = FilterCache()
+        self._workspace: Optional[MixWorkspace] = None
+        self._batch_workspace: Optional[MixBatchWorkspace] = None
+        self._stack: Optional[_StackCache] = None
+        self._contributions: Optional[_ContributionCache] = None
+        # Previews run on their own engine so they never evict the full-resolution buffers and caches
+        self._preview_engine: Optional['MixEngine'] = None
+        self._preview_stack: Optional[Tuple[Spectrum, Tuple[int, int], Spectrum]] = None
+
+    def workspace(self, shape: Tuple[int, ...], dtype: np.dtype = np.complex128,
+                  width: Optional[int] = None) -> MixWorkspace:
+        """Return the engine's buffers, reallocating them only when the shape or precision changes."""
+        shape = tuple(shape[-2:])
+        workspace = self._workspace
+        if (workspace is None or workspace.shape != shape or workspace.dtype != np.dtype(dtype)
+                or workspace.width != width):
+            self._workspace = MixWorkspace(shape, dtype, width)
+        return self._workspace
+
+    def batch_workspace(self, count: int, shape: Tuple[int, ...], dtype: np.dtype = np.complex128,
+                        width: Optional[int] = None) -> MixBatchWorkspace:
+        """Return the buffers for a batch of count outputs, reallocating them only when the batch changes."""
+        shape = tuple(shape[-2:])
+        workspace = self._batch_workspace
+        if workspace is None or not workspace.matches(count, shape, dtype, width):
+            self._batch_workspace = MixBatchWorkspace(count, shape, dtype, width)
+        return self._batch_workspace
+
+    def stack(self, spectra: SpectraLike) -> Spectrum:
+        """Return the inputs as one (N, H, W) spectrum, re-stacking only when an input changed.
+
+        Spectrum inputs become views of the stack (see stack_spectra), so
+        they keep no copy of their own.
+        """
+        if isinstance(spectra, (Spectrum, np.ndarray)):
+            spectrum = as_spectrum(spectra)
+            if spectrum.data.ndim != 3:
+                raise ValueError("A stacked spectrum must have shape (N, H, W)")
+            return spectrum
+        if len(spectra) == 0:
+            raise ValueError("At least one spectrum is required")
+        cache = self._stack
+        if cache is None or not cache.matches(spectra):
+            cache = _StackCache(tuple(spectra), stack_spectra(spectra))
+            self._stack = cache
+        return cache.stack
+
+    def mix(self, spectra: SpectraLike, weights: Sequence[float], components: Sequence[str],
+            mode: str = MAGNITUDE_PHASE, region: Optional[RegionSpec] = None,
+            cancelled: Optional[Callable[[], bool]] = None,
+            filters: Optional[Sequence[FilterSpec]] = None) -> np.ndarray:
+        """Mix the given spectra and return the reconstructed uint8 image.
+
+        filters optionally gives a radial filter per input, applied to that
+        input's spectrum before the mix; the region applies to the mix.
+        """
+        if mode == REAL_IMAGINARY:
+            return self.mix_real_imaginary_incremental(spectra, weights, components, region, cancelled, filters)
+        stack = self.stack(spectra)
+        workspace = self.workspace(stack.shape, stack.dtype, stack.width)
+        result, log_scale = self.mix_spectrum(stack, weights, components, mode, region, cancelled, workspace,
+                                              filters)
+        self._check_cancelled(cancelled)
+        return self.reconstruct(result, log_scale, workspace, stack.width)
+
+    def mix_batch(self, spectra: SpectraLike, configs: Sequence[MixConfig],
+                  cancelled: Optional[Callable[[], bool]] = None) -> List[np.ndarray]:
+        """Mix several configurations of the same inputs and return one uint8 image per config.
+
+        Every output shares the stacked inputs, their memoized magnitude and
+        phase and the cached region masks. Each distinct config is combined
+        into its slot of a (K, H, W) buffer and all of them are reconstructed
+        by one batched inverse FFT over the output axis; repeated configs
+        are mixed once.
+        """
+        if len(configs) == 0:
+            return []
+        stack = self.stack(spectra)
+        distinct = []
+        for config in configs:
+            if config not in distinct:
+                distinct.append(config)
+        workspace = self.batch_workspace(len(distinct), stack.shape, stack.dtype, stack.width)
+        log_scales = []
+        for index, config in enumerate(distinct):
+            _, log_scale = self.mix_spectrum(stack, config.weights, config.components, config.mode,
+                                             config.region, cancelled, workspace.output(index), config.filters)
+            log_scales.append(log_scale)
+        self._check_cancelled(cancelled)
+        images = self.reconstruct_batch(workspace, log_scales, stack.width)
+        return [images[distinct.index(config)] for config in configs]
+
+    def reconstruct_batch(self, workspace: MixBatchWorkspace, log_scales: Sequence[bool],
+                          width: Optional[int] = None) -> List[np.ndarray]:
+        """Inverse transform every mixed spectrum of a batch at once and normalize each to a uint8 image."""
+        spatial = self._inverse(workspace.spectra, width, overwrite_x=True)
+        if width is not None:
+            images = np.abs(spatial, out=spatial)
+        else:
+            images = np.abs(spatial, out=workspace.images)
+        outputs = []
+        for image, log_scale in zip(images, log_scales):
+            if log_scale:
+                np.log1p(image, out=image)
+            outputs.append(self.normalize(image, inplace=True))
+        return outputs
+
+    def reconstruct_channels(self, workspace: MixBatchWorkspace, log_scale: bool = False,
+                             width: Optional[int] = None) -> np.ndarray:
+        """Inverse transform the channels of one image mixed into a batch workspace.
+
+        Returns (C, H, W) uint8 planes stretched to 0..255 together, so the
+        channels keep their balance.
+        """
+        spatial = self._inverse(workspace.spectra, width, overwrite_x=True)
+        if width is not None:
+            images = np.abs(spatial, out=spatial)
+        else:
+            images = np.abs(spatial, out=workspace.images)
+        if log_scale:
+            np.log1p(images, out=images)
+        return self.normalize(images, inplace=True)
+
+    def mix_sweep(self, spectra: SpectraLike, start_weights: Sequence[float], end_weights: Sequence[float],
+                  steps: int, components: Sequence[str], mode: str = MAGNITUDE_PHASE,
+                  region: Optional[RegionSpec] = None, cancelled: Optional[Callable[[], bool]] = None,
+                  max_bytes: int = SWEEP_MAX_BYTES, filters: Optional[Sequence[FilterSpec]] = None) -> np.ndarray:
+        """Mix steps evenly spaced weights from start_weights to end_weights into (steps, H, W) uint8 frames.
+
+        Every mixed component is linear in the weights: in frame n it is
+        A + t_n * B, where A is mixed with the start weights and B with the
+        weight change. Those are two weighted sums of the memoized stack,
+        after which a frame's magnitude is one multiply-add, and its phase
+        factor exp(1j * (A + t_n * B)) is the previous frame's times a
+        constant factor, a complex multiply instead of a cos and sin per
+        pixel. The mixed spectra are stacked and reconstructed by one
+        batched inverse FFT per pass of frames fitting in max_bytes.
+        Real/Imaginary frames combine the two cached spatial images the same
+        way and need no FFT.
+        """
+        stack = self.stack(spectra)
+        self._check_inputs(stack, start_weights, components)
+        self._check_inputs(stack, end_weights, components)
+        if steps < 1:
+            raise ValueError("A sweep needs at least one step")
+        region = region or RegionSpec()
+        filters = self._active_filters(filters, stack.shape[0])
+        start_weights = np.asarray(start_weights, dtype=float)
+        change = np.asarray(end_weights, dtype=float) - start_weights
+        t = np.linspace(0.0, 1.0, steps)
+        frames = np.zeros((steps,) + tuple(stack.full_shape[-2:]), dtype=np.uint8)
+        self._check_cancelled(cancelled)
+        if mode == MAGNITUDE_PHASE:
+            # Without a magnitude every frame stays black, as in mix()
+            if MAGNITUDE in components:
+                self._sweep_magnitude_phase(stack, start_weights, change, t, components, region, filters,
+                                            frames, max_bytes, cancelled)
+        elif mode == REAL_IMAGINARY:
+            self._sweep_real_imaginary(stack, start_weights, change, t, components, region, filters, frames,
+                                       cancelled)
+        else:
+            raise ValueError(f"Unknown mixing mode: {mode}")
+        return frames
+
+    def _sweep_terms(self, stack: Spectrum, data: np.ndarray, start_weights: np.ndarray, change: np.ndarray,
+                     components: Sequence[str], component: str, region: RegionSpec,
+                     filters: Optional[Tuple[FilterSpec, ...]]) -> List[np.ndarray]:
+        """The masked component mixed with the start weights and with the weight change."""
+        terms = []
+        for weights in (start_weights, change):
+            out = np.empty(data.shape[-2:], dtype=data.dtype)
+            self.filtered_sum(self.component_weights(weights, components, component), data, out, filters,
+                              stack.width, support=component == PHASE)
+            terms.append(self.apply_region(out, region, out=out, width=stack.width))
+        return terms
+
+    def _sweep_magnitude_phase(self, stack: Spectrum, start_weights: np.ndarray, change: np.ndarray,
+                               t: np.ndarray, components: Sequence[str], region: RegionSpec,
+                               filters: Optional[Tuple[FilterSpec, ...]], frames: np.ndarray, max_bytes: int,
+                               cancelled: Optional[Callable[[], bool]]):
+        has_phase = PHASE in components
+        magnitude, magnitude_change = self._sweep_terms(stack, stack.magnitude, start_weights, change,
+                                                        components, MAGNITUDE, region, filters)
+        if has_phase:
+            phase, phase_change = self._sweep_terms(stack, stack.phase, start_weights, change,
+                                                    components, PHASE, region, filters)
+            step = t[1] - t[0] if len(t) > 1 else 0.0
+            phase_step = np.exp(1j * step * phase_change).astype(stack.dtype)
+        per_pass = max(1, min(len(t), max_bytes // (2 * np.dtype(stack.dtype).itemsize * magnitude.size)))
+        spectra = np.empty((per_pass,) + magnitude.shape, dtype=stack.dtype)
+        frame_magnitude = np.empty_like(magnitude)
+        for start in range(0, len(t), per_pass):
+            self._check_cancelled(cancelled)
+            times = t[start:start + per_pass]
+            if has_phase:
+                # Exact at the start of every pass, so rounding never accumulates beyond one pass
+                factor = np.exp(1j * (phase + times[0] * phase_change)).astype(stack.dtype)
+            for fraction, spectrum in zip(times.tolist(), spectra):
+                np.multiply(magnitude_change, fraction, out=frame_magnitude)
+                np.add(frame_magnitude, magnitude, out=frame_magnitude)
+                if has_phase:
+                    np.multiply(factor, frame_magnitude, out=spectrum)
+                    np.multiply(factor, phase_step, out=factor)
+                else:
+                    spectrum.real = frame_magnitude
+                    spectrum.imag = 0
+            spatial = self._inverse(spectra[:len(times)], stack.width, overwrite_x=True)
+            images = np.abs(spatial, out=spatial) if stack.half else np.abs(spatial)
+            if not has_phase:
+                # A magnitude-only reconstruction is dominated by the DC term, as in mix()
+                np.log1p(images, out=images)
+            self.normalize_frames(images, out=frames[start:start + len(times)])
+
+    def _sweep_real_imaginary(self, stack: Spectrum, start_weights: np.ndarray, change: np.ndarray,
+                              t: np.ndarray, components: Sequence[str], region: RegionSpec,
+                              filters: Optional[Tuple[FilterSpec, ...]], frames: np.ndarray, cancelled: Optional[Callable[[], bool]]):
+        indices, images = self.spatial_contributions(stack, components, region, cancelled, filters)
+        if images is None:
+            return
+        mixed, mixed_change, frame = (np.empty(images.shape[-2:], dtype=images.dtype) for _ in range(3))
+        self.weighted_sum(start_weights[indices], images, out=mixed)
+        self.weighted_sum(change[indices], images, out=mixed_change)
+        magnitude = np.empty(frame.shape, dtype=real_dtype_of(frame.dtype))
+        for fraction, output in zip(t.tolist(), frames):
+            np.multiply(mixed_change, fraction, out=frame)
+            np.add(frame, mixed, out=frame)
+            self.normalize(np.abs(frame, out=magnitude), inplace=True, out=output)
+
+    @classmethod
+    def normalize_frames(cls, images: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Normalize every image of an (N, H, W) stack on its own into uint8 frames (overwriting images)."""
+        if out is None:
+            out = np.empty(images.shape, dtype=np.uint8)
+        for image, frame in zip(images, out):
+            cls.normalize(image, inplace=True, out=frame)
+        return out
+
+    @staticmethod
+    def preview_shape(shape: Tuple[int, ...], max_size: int = PREVIEW_SIZE) -> Optional[Tuple[int, int]]:
+        """Shape of the preview for images of this shape, None when they are already that small."""
+        rows, cols = shape[-2], shape[-1]
+        scale = max_size / max(rows, cols)
+        if scale >= 1:
+            return None
+        return max(2, int(round(rows * scale))), max(2, int(round(cols * scale)))
+
+    def preview(self, spectra: SpectraLike, weights: Sequence[float], components: Sequence[str],
+                mode: str = MAGNITUDE_PHASE, region: Optional[RegionSpec] = None,
+                cancelled: Optional[Callable[[], bool]] = None, max_size: int = PREVIEW_SIZE,
+                filters: Optional[Sequence[FilterSpec]] = None) -> np.ndarray:
+        """Quick low-resolution mix from the central window of the centred spectra.
+
+        The central h x w window of a centred spectrum holds exactly the
+        frequencies an h x w image can represent, so mixing the cropped
+        spectra gives a downsampled version of the full result at a fraction
+        of the cost. Inputs no larger than max_size are mixed in full.
+        """
+        stack = self.stack(spectra)
+        shape = self.preview_shape(stack.full_shape, max_size)
+        if shape is None:
+            return self.mix(stack, weights, components, mode, region, cancelled, filters)
+        region = (region or RegionSpec()).rescaled(stack.full_shape, shape)
+        if filters is not None:
+            filters = [spec.rescaled(stack.full_shape, shape) for spec in filters]
+        return self.preview_engine().mix(self.cropped_stack(stack, shape), weights, components, mode, region,
+                                         cancelled, filters)
+
+    def preview_batch(self, spectra: SpectraLike, configs: Sequence[MixConfig],
+                      cancelled: Optional[Callable[[], bool]] = None,
+                      max_size: int = PREVIEW_SIZE) -> List[np.ndarray]:
+        """Low-resolution mix_batch from the central window of the centred spectra, as preview() does."""
+        stack = self.stack(spectra)
+        shape = self.preview_shape(stack.full_shape, max_size)
+        if shape is None:
+            return self.mix_batch(stack, configs, cancelled)
+        configs = [replace(config, region=config.region.rescaled(stack.full_shape, shape),
+                           filters=[spec.rescaled(stack.full_shape, shape) for spec in config.filters])
+                   for config in configs]
+        return self.preview_engine().mix_batch(self.cropped_stack(stack, shape), configs, cancelled)
+
+    def preview_engine(self) -> 'MixEngine':
+        if self._preview_engine is None:
+            self._preview_engine = MixEngine()
+        return self._preview_engine
+
+    def cropped_stack(self, stack: Spectrum, shape: Tuple[int, int]) -> Spectrum:
+        """Return (and cache) the central window of a stacked spectrum as images of this shape."""
+        cache = self._preview_stack
+        if cache is None or cache[0] is not stack or cache[1] != shape:
+            rows, cols = shape
+            row_start = stack.shape[-2] // 2 - rows // 2
+            window = stack.data[:, row_start:row_start + rows]
+            if stack.half:
+                # Half spectra start at the zero column frequency
+                window = window[..., :cols // 2 + 1]
+            else:
+                col_start = stack.shape[-1] // 2 - cols // 2
+                window = window[..., col_start:col_start + cols]
+            cropped = Spectrum(np.ascontiguousarray(window), width=cols if stack.half else None)
+            cache = (stack, shape, cropped)
+            self._preview_stack = cache
+        return cache[2]
+
+    def mix_real_imaginary_incremental(self, spectra: SpectraLike, weights: Sequence[float],
+                                       components: Sequence[str], region: Optional[RegionSpec] = None,
+                                       cancelled: Optional[Callable[[], bool]] = None,
+                                       filters: Optional[Sequence[FilterSpec]] = None) -> np.ndarray:
+        """Real/imaginary mix as a weighted sum of cached per-input spatial images.
+
+        The real/imaginary combination and the inverse transform are both
+        linear, so ifft(sum(w_i * c_i)) == sum(w_i * ifft(c_i)). The per-input
+        images only depend on the spectra, the region, the filters and the
+        component selections; a weight change reuses them without any FFT.
+        """
+        stack = self.stack(spectra)
+        self._check_inputs(stack, weights, components)
+        workspace = self.workspace(stack.shape, stack.dtype, stack.width)
+        indices, images = self.spatial_contributions(stack, components, region or RegionSpec(), cancelled,
+                                                     filters)
+        # Half spectra give real images, full spectra complex ones
+        mixed_image = workspace.image if stack.half else workspace.spectrum
+        if images is None:
+            mixed_image.fill(0)
+        else:
+            self.weighted_sum(np.asarray(weights, dtype=float)[indices], images, out=mixed_image)
+        return self.normalize(np.abs(mixed_image, out=workspace.image), inplace=True)
+
+    def spatial_contributions(self, spectra: SpectraLike, components: Sequence[str], region: RegionSpec,
+                              cancelled: Optional[Callable[[], bool]] = None,
+                              filters: Optional[Sequence[FilterSpec]] = None
+                              ) -> Tuple[List[int], Optional[np.ndarray]]:
+        """Return (and cache) the inverse transforms of the inputs selecting real or imaginary.
+
+        Returns the selecting input indices and their (K, H, W) spatial
+        images, computed in one batched inverse FFT. The images skip the
+        ifftshift: it multiplies every one of them by the same unit-modulus
+        phase ramp, which the final magnitude removes. Half spectra give
+        real images through irfft2. A filtered input's component is
+        filtered before its transform; when only filters changed, just the
+        inputs whose filter did are transformed again.
+        """
+        stack = self.stack(spectra)
+        filters = self._active_filters(filters, stack.shape[0])
+        cache = self._contributions
+        if cache is None or not cache.matches(stack, components, region, filters):
+            self._check_cancelled(cancelled)
+            indices = [i for i, component in enumerate(components) if component in (REAL, IMAGINARY)]
+            images = None
+            if indices:
+                rows = list(range(len(indices)))
+                if (cache is not None and cache.images is not None
+                        and cache.matches(stack, components, region, cache.filters)):
+                    rows = [k for k, i in enumerate(indices)
+                            if self._filter_of(filters, i) != self._filter_of(cache.filters, i)]
+                updated = self._contribution_images(stack, components, region, filters, indices, rows, cancelled)
+                if len(rows) == len(indices):
+                    images = updated
+                else:
+                    # Only some filters changed: patch those inputs' images into the cached ones
+                    images = cache.images
+                    if rows:
+                        images[rows] = updated
+            # Only publish a fully built cache, a cancelled build must not leave a partial one
+            cache = _ContributionCache(stack, tuple(components), region, filters, indices, images)
+            self._contributions = cache
+        return cache.indices, cache.images
+
+    def _contribution_images(self, stack: Spectrum, components: Sequence[str], region: RegionSpec,
+                             filters: Optional[Tuple[FilterSpec, ...]], indices: List[int], rows: List[int],
+                             cancelled: Optional[Callable[[], bool]]) -> Optional[np.ndarray]:
+        """Inverse transforms of the selected components of inputs indices[k] for k in rows, None for no rows."""
+        if not rows:
+            return None
+        selected = np.zeros((len(rows),) + stack.shape[-2:], dtype=stack.dtype)
+        for slot, k in enumerate(rows):
+            i = indices[k]
+            if components[i] == REAL:
+                selected[slot].real = stack.real[i]
+            else:
+                selected[slot].imag = stack.imag[i]
+            if self._filter_of(filters, i).active:
+                selected[slot] *= self.filter_response(selected.shape, filters[i], stack.width,
+                                                       real_dtype_of(stack.dtype))
+        self.apply_region(selected, region, out=selected, width=stack.width)
+        self._check_cancelled(cancelled)
+        return self._inverse(selected, stack.width, overwrite_x=True)
+
+    def invalidate(self):
+        """Drop cached intermediate results."""
+        self._stack = None
+        self._contributions = None
+        self._preview_stack = None
+        if self._preview_engine is not None:
+            self._preview_engine.invalidate()
+
+    def mix_spectrum(self, spectra: SpectraLike, weights: Sequence[float], components: Sequence[str],
+                     mode: str = MAGNITUDE_PHASE, region: Optional[RegionSpec] = None,
+                     cancelled: Optional[Callable[[], bool]] = None, workspace: Optional[MixWorkspace] = None,
+                     filters: Optional[Sequence[FilterSpec]] = None) -> Tuple[np.ndarray, bool]:
+        """Mask and combine the spectra, returning the mixed centred spectrum and its log-scale flag.
+
+        With a workspace the returned spectrum is one of its buffers and is
+        only valid until the next mix using it.
+        """
+        stack = self.stack(spectra)
+        self._check_inputs(stack, weights, components)
+        region = region or RegionSpec()
+        self._check_cancelled(cancelled)
+
+        if mode == MAGNITUDE_PHASE:
+            return self.mix_magnitude_phase(stack, weights, components, region, workspace, filters)
+        if mode == REAL_IMAGINARY:
+            return self.mix_real_imaginary(stack, weights, components, region, workspace, filters)
+        raise ValueError(f"Unknown mixing mode: {mode}")
+
+    def region_mask(self, shape: Tuple[int, ...], region: RegionSpec, width: Optional[int] = None) -> np.ndarray:
+        """Return the cached boolean mask of a region for spectra of this shape.
+
+        With width, shape is that of an rfft2 half spectrum of an image that wide.
+        """
+        if width is None:
+            return self.masks.get(shape, region.bounds(shape), region.inner)
+        full_shape = (shape[-2], width)
+        return self.masks.get(full_shape, region.bounds(full_shape), region.inner, half=True)
+
+    def filter_response(self, shape: Tuple[int, ...], spec: FilterSpec, width: Optional[int] = None,
+                        dtype: np.dtype = np.float64, support: bool = False) -> np.ndarray:
+        """Return the cached gains of a radial filter (its boolean pass mask with support) for spectra of this shape.
+
+        With width, shape is that of an rfft2 half spectrum of an image that wide.
+        """
+        if width is None:
+            return self.filters.get(shape, spec, dtype=dtype, support=support)
+        return self.filters.get((shape[-2], width), spec, half=True, dtype=dtype, support=support)
+
+    def apply_region(self, array: np.ndarray, region: RegionSpec, out: Optional[np.ndarray] = None,
+                     width: Optional[int] = None) -> np.ndarray:
+        """Keep the frequencies inside (inner) or outside (outer) the region.
+
+        Works on a single (H, W) array or a stack (..., H, W) in one broadcast
+        multiply, optionally into a preallocated buffer (which may be the input).
+        Pass width for half spectra.
+        """
+        return np.multiply(array, self.region_mask(array.shape, region, width), out=out)
+
+    @staticmethod
+    def component_weights(weights: Sequence[float], components: Sequence[str], component: str) -> np.ndarray:
+        """Weight vector over the input axis, zero for inputs not selecting this component."""
+        return np.where(np.asarray(components) == component, np.asarray(weights, dtype=float), 0.0)
+
+    @staticmethod
+    def weighted_sum(weights: np.ndarray, stack: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Reduce an (N, H, W) stack over its input axis: out = sum(weights[i] * stack[i]).
+
+        Contiguous operands go through one BLAS matrix-vector product over the
+        flattened images; strided ones (real/imaginary views) through einsum.
+        """
+        weights = weights.astype(out.dtype, copy=False)
+        if stack.flags.c_contiguous and out.flags.c_contiguous:
+            return np.dot(weights, stack.reshape(len(weights), -1), out=out.reshape(-1)).reshape(out.shape)
+        return np.einsum('n,nhw->hw', weights, stack, out=out)
+
+    def filtered_sum(self, weights: np.ndarray, stack: np.ndarray, out: np.ndarray,
+                     filters: Optional[Tuple[FilterSpec, ...]] = None, width: Optional[int] = None,
+                     support: bool = False) -> np.ndarray:
+        """weighted_sum with every input's radial filter: out = sum(weights[i] * filter_i * stack[i]).
+
+        Inputs sharing a filter are summed together and filtered once, so
+        the cost is one weighted sum and one multiply per distinct filter,
+        and nothing extra for unfiltered inputs. With support, the filters
+        act as their boolean pass masks. Pass width for half spectra.
+        """
+        if filters is None:
+            return self.weighted_sum(weights, stack, out)
+        weights = np.asarray(weights, dtype=float)
+        groups = {}
+        for i, spec in enumerate(filters):
+            if weights[i] != 0:
+                groups.setdefault(spec if spec.active else None, []).append(i)
+        unfiltered = groups.pop(None, [])
+        if unfiltered:
+            self.weighted_sum(self._select(weights, unfiltered), stack, out)
+        else:
+            out.fill(0)
+        partial = np.empty(out.shape, dtype=out.dtype) if groups else None
+        for spec, indices in groups.items():
+            self.weighted_sum(self._select(weights, indices), stack, partial)
+            np.multiply(partial, self.filter_response(out.shape, spec, width, out.dtype, support), out=partial)
+            np.add(out, partial, out=out)
+        return out
+
+    @staticmethod
+    def _select(weights: np.ndarray, indices: List[int]) -> np.ndarray:
+        """The weights of these inputs, zero for the others."""
+        selected = np.zeros_like(weights)
+        selected[indices] = weights[indices]
+        return selected
+
+    @staticmethod
+    def _active_filters(filters: Optional[Sequence[FilterSpec]], count: int) -> Optional[Tuple[FilterSpec, ...]]:
+        """The inputs' filters as a tuple, None when no input is filtered."""
+        if not filters or not any(spec is not None and spec.active for spec in filters):
+            return None
+        if len(filters) != count:
+            raise ValueError("Spectra and filters must have the same length")
+        # Every inactive filter is the same, so cached results never depend on an unused cutoff
+        return tuple(spec if spec is not None and spec.active else FilterSpec() for spec in filters)
+
+    @staticmethod
+    def _filter_of(filters: Optional[Tuple[FilterSpec, ...]], index: int) -> FilterSpec:
+        return FilterSpec() if filters is None else filters[index]
+
+    def mix_magnitude_phase(self, spectra: SpectraLike, weights: Sequence[float],
+                            components: Sequence[str], region: Optional[RegionSpec] = None,
+                            workspace: Optional[MixWorkspace] = None,
+                            filters: Optional[Sequence[FilterSpec]] = None) -> Tuple[np.ndarray, bool]:
+        """Combine weighted magnitudes and phases of the inputs selecting them.
+
+        Every input shares the same region, so the weighted sums are masked
+        once instead of masking each input. Masking the memoized
+        magnitude/phase gives the same values as taking abs/angle of the
+        masked spectrum (both are zero outside the region). Likewise a
+        filtered input's magnitude is scaled by the filter's gains and its
+        phase kept only where the filter passes anything.
+        """
+        region = region or RegionSpec()
+        stack = self.stack(spectra)
+        filters = self._active_filters(filters, stack.shape[0])
+        workspace = workspace or MixWorkspace(stack.shape[-2:], stack.dtype, stack.width)
+        total_magnitude, total_phase = workspace.magnitude, workspace.phase
+        has_magnitude = MAGNITUDE in components
+        has_phase = PHASE in components
+        if has_magnitude:
+            self.filtered_sum(self.component_weights(weights, components, MAGNITUDE), stack.magnitude,
+                              total_magnitude, filters, stack.width)
+            self.apply_region(total_magnitude, region, out=total_magnitude, width=stack.width)
+        else:
+            total_magnitude.fill(0)
+        if has_phase:
+            self.filtered_sum(self.component_weights(weights, components, PHASE), stack.phase, total_phase,
+                              filters, stack.width, support=True)
+            self.apply_region(total_phase, region, out=total_phase, width=stack.width)
+        else:
+            total_phase.fill(0)
+
+        # magnitude * exp(1j * phase), written straight into the complex buffer
+        result = workspace.spectrum
+        np.cos(total_phase, out=result.real)
+        np.sin(total_phase, out=result.imag)
+        np.multiply(result.real, total_magnitude, out=result.real)
+        np.multiply(result.imag, total_magnitude, out=result.imag)
+        # A magnitude-only reconstruction is dominated by the DC term, so show it on a log scale
+        return result, not has_phase
+
+    def mix_real_imaginary(self, spectra: SpectraLike, weights: Sequence[float],
+                           components: Sequence[str], region: Optional[RegionSpec] = None,
+                           workspace: Optional[MixWorkspace] = None,
+                           filters: Optional[Sequence[FilterSpec]] = None) -> Tuple[np.ndarray, bool]:
+        """Combine weighted real and imaginary parts of the inputs selecting them."""
+        region = region or RegionSpec()
+        stack = self.stack(spectra)
+        filters = self._active_filters(filters, stack.shape[0])
+        workspace = workspace or MixWorkspace(stack.shape[-2:], stack.dtype, stack.width)
+        result = workspace.spectrum
+        self.filtered_sum(self.component_weights(weights, components, REAL), stack.real, result.real, filters,
+                          stack.width)
+        self.filtered_sum(self.component_weights(weights, components, IMAGINARY), stack.imag, result.imag,
+                          filters, stack.width)
+        self.apply_region(result, region, out=result, width=stack.width)
+        return result, False
+
+    def reconstruct(self, result: np.ndarray, log_scale: bool = False,
+                    workspace: Optional[MixWorkspace] = None, width: Optional[int] = None) -> np.ndarray:
+        """Inverse transform a centred spectrum and normalize it to a uint8 image.
+
+        The ifftshift is skipped: shifting the spectrum only multiplies the
+        image by a unit-modulus phase ramp, which the magnitude removes.
+        Pass width when result is an rfft2 half spectrum.
+        """
+        in_place = workspace is not None and result is workspace.spectrum
+        spatial = self._inverse(result, width, overwrite_x=in_place)
+        if width is not None:
+            # irfft2 returns a new real image, take its magnitude in place
+            mixed_image = np.abs(spatial, out=spatial)
+        else:
+            mixed_image = np.abs(spatial, out=workspace.image if in_place else None)
+        if log_scale:
+            np.log1p(mixed_image, out=mixed_image)
+        return self.normalize(mixed_image, inplace=True)
+
+    @staticmethod
+    def _inverse(spectrum: np.ndarray, width: Optional[int] = None, overwrite_x: bool = False) -> np.ndarray:
+        """Inverse FFT over the last two axes of a centred full or half spectrum, without the magnitude."""
+        if width is None:
+            return ifft2(spectrum, axes=(-2, -1), overwrite_x=overwrite_x)
+        rows = spectrum.shape[-2]
+        # irfft2 needs a spectrum of a real image. With an even row count the
+        # centred one is that of the image times (-1)^row, which the magnitude
+        # removes; an odd row count has to be shifted back.
+        if rows % 2:
+            spectrum, overwrite_x = np.fft.ifftshift(spectrum, axes=-2), True
+        return irfft2(spectrum, s=(rows, width), axes=(-2, -1), overwrite_x=overwrite_x)
+
+    @staticmethod
+    def normalize(image: np.ndarray, inplace: bool = False, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Stretch an image to the full 0..255 range (overwriting it when inplace), optionally into a uint8 out."""
+        output = np.zeros(image.shape, dtype=np.uint8) if out is None else out
+        low, high = image.min(), image.max()
+        if high == low:
+            output.fill(0)
+            return output
+        if inplace:
+            np.subtract(image, low, out=image)
+        else:
+            image = image - low
+        np.multiply(image, 255 / (high - low), out=image)
+        np.copyto(output, image, casting='unsafe')
+        return output
+
+    @staticmethod
+    def _check_inputs(stack: Spectrum, weights: Sequence[float], components: Sequence[str]):
+        if not stack.shape[0] == len(weights) == len(components):
+            raise ValueError("Spectra, weights and components must have the same length")
+
+    @staticmethod
+    def _check_cancelled(cancelled: Optional[Callable[[], bool]]):
+        if cancelled is not None and cancelled():
+            raise MixCancelled()
@@ -0,0 +1,140 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+import numpy as np
+from ColorMix import ColorMixer, RGB
+from MixEngine import MixConfig, MixEngine, MixCancelled, RegionSpec, SpectrumLike, MAGNITUDE_PHASE
+from RadialFilter import FilterSpec
+
+
+@dataclass
+class MixRequest:
+    """Snapshot of everything a mix needs, taken on the GUI thread."""
+    spectra: List[SpectrumLike]
+    weights: List[float]
+    components: List[str]
+    mode: str = MAGNITUDE_PHASE
+    region: RegionSpec = field(default_factory=RegionSpec)
+    # Radial filter per input, empty when none is filtered
+    filters: List[FilterSpec] = field(default_factory=list)
+    output_index: int = 0
+    # Low-resolution mix from the cropped spectra, for feedback while dragging
+    preview: bool = False
+    # When set, these (output index, config) pairs are mixed in one batched pass instead,
+    # and the job's result is the list of their images
+    outputs: List[Tuple[int, MixConfig]] = field(default_factory=list)
+    # When set, these (H, W, 3) RGB images are mixed channel by channel in color_mode instead of
+    # the spectra, and the job's result is an RGB image
+    colors: List[np.ndarray] = field(default_factory=list)
+    color_mode: str = RGB
+
+
+class _JobSignals(QObject):
+    # generation, request, mixed image or list of images (None when cancelled), error message
+    done = pyqtSignal(int, object, object, str)
+
+
+class MixJob(QRunnable):
+    """Runs one mix request on a pool thread."""
+
+    def __init__(self, generation: int, request: MixRequest, engine: MixEngine, scheduler: 'MixScheduler'):
+        super().__init__()
+        self.generation = generation
+        self.request = request
+        self.engine = engine
+        self.scheduler = scheduler
+        self.signals = _JobSignals()
+
+    def run(self):
+        image, error = None, ""
+        cancelled = lambda: self.scheduler.is_stale(self.generation)
+        try:
+            if self.request.colors:
+                image = self.scheduler.color_mixer.mix(
+                    self.request.colors, self.request.weights, self.request.components, mode=self.request.mode,
+                    region=self.request.region, color_mode=self.request.color_mode, cancelled=cancelled,
+                    filters=self.request.filters,
+                )
+            elif self.request.outputs:
+                mix_batch = self.engine.preview_batch if self.request.preview else self.engine.mix_batch
+                image = mix_batch(self.request.spectra, [config for _, config in self.request.outputs],
+                                  cancelled=cancelled)
+            else:
+                mix = self.engine.preview if self.request.preview else self.engine.mix
+                image = mix(
+                    self.request.spectra, self.request.weights, self.request.components,
+                    mode=self.request.mode, region=self.request.region, cancelled=cancelled,
+                    filters=self.request.filters,
+                )
+        except MixCancelled:
+            pass
+        except Exception as e:
+            error = str(e)
+        self.signals.done.emit(self.generation, self.request, image, error)
+
+
+class MixScheduler(QObject):
+    """Runs mixes off the GUI thread, newest request wins.
+
+    Every submitted request gets an increasing generation number. Only one
+    job runs at a time; while it runs, newer submissions replace each other
+    as the single pending request, and the running job is cancelled at its
+    next stage boundary once it has been superseded.
+    """
+    mixReady = pyqtSignal(int, object, object)  # generation, request, mixed image (a list for batched outputs)
+    mixFailed = pyqtSignal(int, str)
+
+    def __init__(self, engine: Optional[MixEngine] = None, parent=None):
+        super().__init__(parent)
+        self.engine = engine or MixEngine()
+        # Colour mode replaces the grayscale mixes, so both share the engine's buffers
+        self.color_mixer = ColorMixer(self.engine)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.generation = 0
+        self._running = None
+        self._pending = None
+
+    def submit(self, request: MixRequest) -> int:
+        """Queue a request, superseding any older one, and return its generation."""
+        self.generation += 1
+        self._pending = (self.generation, request)
+        if self._running is None:
+            self._start_pending()
+        return self.generation
+
+    def is_stale(self, generation: int) -> bool:
+        """Whether a newer request has been submitted since this generation."""
+        return generation != self.generation
+
+    def is_busy(self) -> bool:
+        return self._running is not None or self._pending is not None
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until the pool is idle."""
+        return self.pool.waitForDone(msecs)
+
+    def shutdown(self):
+        """Drop the pending request, cancel the running one and wait for it."""
+        self.generation += 1
+        self._pending = None
+        self.wait()
+
+    def _start_pending(self):
+        generation, request = self._pending
+        self._pending = None
+        job = MixJob(generation, request, self.engine, self)
+        job.signals.done.connect(self._on_job_done)
+        self._running = job
+        self.pool.start(job)
+
+    @pyqtSlot(int, object, object, str)
+    def _on_job_done(self, generation, request, image, error):
+        self._running = None
+        if not self.is_stale(generation):
+            if error:
+                self.mixFailed.emit(generation, error)
+            elif image is not None:
+                self.mixReady.emit(generation, request, image)
+        if self._pending is not None:
+            self._start_pending()
@@ -0,0 +1,260 @@
+"""Out-of-core Fourier mixing for images larger than RAM.
+
+Spectra, intermediates and the result live in np.memmap files; only one
+block of rows or columns is in memory at a time.
+"""
+import copy
+import os
+import shutil
+import tempfile
+from typing import Callable, List, Optional, Sequence, Tuple
+import numpy as np
+from FFTBackend import fft, ifft
+from MixEngine import (MixEngine, MixCancelled, RegionSpec, MixWorkspace, MAGNITUDE, PHASE, REAL, IMAGINARY,
+                       MAGNITUDE_PHASE, REAL_IMAGINARY)
+from RadialFilter import FilterSpec, radius_index
+from Spectrum import COMPLEX_DTYPES, get_precision, real_dtype_of
+
+DEFAULT_BLOCK_BYTES = 256 * 1024 * 1024  # memory for one block of one array
+
+
+class BlockWorkspace:
+    """Buffers for one block of N input spectra, reused by every block of a mix.
+
+    A shorter last block works on the leading part of each buffer, which
+    stays contiguous, so the weighted sums keep their BLAS path.
+    """
+
+    def __init__(self, count: int, rows: int, cols: int, dtype: np.dtype, polar: bool):
+        real_dtype = real_dtype_of(dtype)
+        self.rows = rows
+        self.inputs = np.empty((count, rows, cols), dtype=dtype)
+        # Magnitude and phase of every input, only needed for magnitude/phase mixing
+        self.magnitude = np.empty(self.inputs.shape, dtype=real_dtype) if polar else None
+        self.phase = np.empty(self.inputs.shape, dtype=real_dtype) if polar else None
+        self.mask = np.empty((rows, cols), dtype=bool)
+        self.mix = MixWorkspace((rows, cols), dtype)
+
+    def leading(self, rows: int) -> 'BlockWorkspace':
+        """The same buffers, viewed as a block of only rows rows."""
+        if rows == self.rows:
+            return self
+        view = copy.copy(self)
+        view.rows = rows
+        for name in ("inputs", "magnitude", "phase"):
+            buffer = getattr(self, name)
+            if buffer is not None:
+                shape = (buffer.shape[0], rows, buffer.shape[2])
+                setattr(view, name, buffer.reshape(-1)[:int(np.prod(shape))].reshape(shape))
+        view.mask = self.mask[:rows]
+        view.mix = copy.copy(self.mix)
+        for name in ("magnitude", "phase", "spectrum"):
+            setattr(view.mix, name, getattr(self.mix, name)[:rows])
+        return view
+
+
+class OutOfCoreMixer:
+    """Mixes memory-mapped images block by block, with the same semantics as MixEngine.
+
+    Spectra stay unshifted on disk. The centred region is applied through
+    ifftshifted row/column selectors instead, which selects the same
+    frequencies without ever moving data, and the final magnitude does not
+    depend on the shift either. Radial filters are evaluated the same way,
+    on the unshifted rows of each block.
+    """
+
+    def __init__(self, scratch_dir: Optional[str] = None, block_bytes: int = DEFAULT_BLOCK_BYTES,
+                 precision: Optional[str] = None):
+        self.block_bytes = block_bytes
+        self.dtype = COMPLEX_DTYPES[precision or get_precision()]
+        self._owns_scratch = scratch_dir is None
+        self.scratch_dir = scratch_dir or tempfile.mkdtemp(prefix="ft_mixer_")
+        os.makedirs(self.scratch_dir, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Delete the scratch files this mixer created."""
+        if self._owns_scratch:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+
+    def scratch(self, name: str, shape: Tuple[int, int], dtype) -> np.memmap:
+        return np.memmap(os.path.join(self.scratch_dir, name), dtype=dtype, mode="w+", shape=shape)
+
+    def rows_per_block(self, width: int, itemsize: int, arrays: int = 1) -> int:
+        return max(1, self.block_bytes // max(1, width * itemsize * arrays))
+
+    def transform(self, image: np.ndarray, name: str) -> np.memmap:
+        """Unshifted 2-D FFT of a (possibly memory-mapped) image into a scratch file."""
+        spectrum = self.scratch(name, image.shape, self.dtype)
+        real_dtype = real_dtype_of(self.dtype)
+        rows = self.rows_per_block(image.shape[1], self.dtype.itemsize)
+        for start in range(0, image.shape[0], rows):
+            block = np.asarray(image[start:start + rows], dtype=real_dtype)
+            spectrum[start:start + rows] = fft(block, axis=1)
+        self._column_pass(spectrum, fft)
+        return spectrum
+
+    def mix(self, images: Sequence[np.ndarray], weights: Sequence[float], components: Sequence[str],
+            mode: str = MAGNITUDE_PHASE, region: Optional[RegionSpec] = None, output_path: str = "mixed.npy",
+            cancelled: Optional[Callable[[], bool]] = None,
+            filters: Optional[Sequence[FilterSpec]] = None) -> np.memmap:
+        """Transform, mix and reconstruct the images, writing the uint8 result to output_path (.npy).
+
+        images may be in-memory arrays or memmaps (e.g. np.load(path, mmap_mode='r')).
+        """
+        if len(images) == 0:
+            raise ValueError("At least one image is required")
+        if not len(images) == len(weights) == len(components):
+            raise ValueError("Images, weights and components must have the same length")
+        if filters and len(filters) != len(images):
+            raise ValueError("Images and filters must have the same length")
+        shape = tuple(images[0].shape[:2])
+        if any(tuple(image.shape[:2]) != shape for image in images):
+            raise ValueError("All images must have the same shape")
+
+        spectra = []
+        for i, image in enumerate(images):
+            self._check_cancelled(cancelled)
+            spectra.append(self.transform(image, f"spectrum_{i}.dat"))
+        self._check_cancelled(cancelled)
+        mixed, log_scale = self.mix_spectra(spectra, weights, components, mode, region or RegionSpec(), filters)
+        # mix_spectra was their last reader: unmapped, the spectra's files go now rather than at close()
+        paths = [spectrum.filename for spectrum in spectra]
+        del spectra
+        for path in paths:
+            os.remove(path)
+        self._check_cancelled(cancelled)
+        self._column_pass(mixed, ifft)
+        self._row_pass(mixed, ifft)
+        self._check_cancelled(cancelled)
+        return self.normalize_to_file(mixed, log_scale, output_path)
+
+    def mix_spectra(self, spectra: List[np.memmap], weights: Sequence[float], components: Sequence[str],
+                    mode: str, region: RegionSpec,
+                    filters: Optional[Sequence[FilterSpec]] = None) -> Tuple[np.memmap, bool]:
+        """Stream the weighted combination of unshifted spectra into a scratch file, block by block."""
+        shape = spectra[0].shape
+        filters = [(i, spec) for i, spec in enumerate(filters or []) if spec is not None and spec.active]
+        row_mask, col_mask = self.region_selectors(shape, region)
+        mixed = self.scratch("mixed.dat", shape, self.dtype)
+        # Inputs, their derived magnitude/phase and the engine workspace are all block-sized
+        rows = self.rows_per_block(shape[1], self.dtype.itemsize, arrays=3 * len(spectra) + 3)
+        if mode not in (MAGNITUDE_PHASE, REAL_IMAGINARY):
+            raise ValueError(f"Unknown mixing mode: {mode}")
+        log_scale = mode == MAGNITUDE_PHASE and PHASE not in components
+        # Allocated once, every block (and a shorter last one) reuses these buffers
+        buffers = BlockWorkspace(len(spectra), min(rows, shape[0]), shape[1], self.dtype, mode == MAGNITUDE_PHASE)
+        for start in range(0, shape[0], rows):
+            workspace = buffers.leading(min(rows, shape[0] - start))
+            block = workspace.inputs
+            for i, spectrum in enumerate(spectra):
+                block[i] = spectrum[start:start + workspace.rows]
+            for i, spec in filters:
+                # The block is a copy, so the filtered input's spectrum can be scaled in place
+                block[i] *= self.filter_gains(shape, spec, start, workspace.rows, real_dtype_of(self.dtype))
+                # Filtered-out frequencies must have phase 0 as in MixEngine, but the angle of a -0.0 is pi
+                block[i] += 0
+            result = self.mix_block(workspace, weights, components, mode)
+            # Masking the combined block equals MixEngine masking the weighted sums: both are zero outside
+            mask = np.logical_and(row_mask[start:start + workspace.rows, None], col_mask, out=workspace.mask)
+            if not region.inner:
+                np.logical_not(mask, out=mask)
+            result *= mask
+            mixed[start:start + workspace.rows] = result
+        return mixed, log_scale
+
+    @staticmethod
+    def mix_block(workspace: BlockWorkspace, weights: Sequence[float], components: Sequence[str],
+                  mode: str) -> np.ndarray:
+        """Unmasked weighted combination of the workspace's input block, as MixEngine computes it."""
+        block = workspace.inputs
+        result = workspace.mix.spectrum
+        if mode == REAL_IMAGINARY:
+            MixEngine.weighted_sum(MixEngine.component_weights(weights, components, REAL), block.real,
+                                   out=result.real)
+            MixEngine.weighted_sum(MixEngine.component_weights(weights, components, IMAGINARY), block.imag,
+                                   out=result.imag)
+            return result
+        # np.angle is the arctangent of imag / real, written into the reused buffer
+        np.abs(block, out=workspace.magnitude)
+        np.arctan2(block.imag, block.real, out=workspace.phase)
+        magnitude = MixEngine.weighted_sum(MixEngine.component_weights(weights, components, MAGNITUDE),
+                                           workspace.magnitude, out=workspace.mix.magnitude)
+        phase = MixEngine.weighted_sum(MixEngine.component_weights(weights, components, PHASE),
+                                       workspace.phase, out=workspace.mix.phase)
+        np.cos(phase, out=result.real)
+        np.sin(phase, out=result.imag)
+        result *= magnitude
+        return result
+
+    @staticmethod
+    def region_selectors(shape: Tuple[int, int], region: RegionSpec) -> Tuple[np.ndarray, np.ndarray]:
+        """Row and column selectors of the region's rectangle, in unshifted frequency order.
+
+        The rectangle is separable, so its mask is their outer product; an
+        outer region is the complement of that.
+        """
+        row_start, row_end, col_start, col_end = region.bounds(shape)
+        rows = np.zeros(shape[0], dtype=bool)
+        cols = np.zeros(shape[1], dtype=bool)
+        rows[row_start:row_end] = True
+        cols[col_start:col_end] = True
+        return np.fft.ifftshift(rows), np.fft.ifftshift(cols)
+
+    @staticmethod
+    def filter_gains(shape: Tuple[int, int], spec: FilterSpec, start: int, rows: int,
+                     dtype: np.dtype = np.float64) -> np.ndarray:
+        """Gains of a radial filter over rows start..start + rows of an unshifted spectrum."""
+        # Unshifted frequency j sits at (j + n // 2) % n in the centred spectrum
+        row_offsets = (np.arange(start, start + rows) + shape[0] // 2) % shape[0] - shape[0] // 2
+        col_offsets = (np.arange(shape[1]) + shape[1] // 2) % shape[1] - shape[1] // 2
+        index, bins = radius_index(shape, row_offsets, col_offsets, spec.axis_scale)
+        return spec.response(index / bins).astype(dtype)
+
+    def normalize_to_file(self, spatial: np.memmap, log_scale: bool, output_path: str) -> np.memmap:
+        """Write the normalized uint8 magnitude of a complex image to a .npy file, in two streamed passes."""
+        shape = spatial.shape
+        rows = self.rows_per_block(shape[1], self.dtype.itemsize)
+        low, high = np.inf, -np.inf
+        for start in range(0, shape[0], rows):
+            block = self._magnitude(spatial[start:start + rows], log_scale)
+            low, high = min(low, block.min()), max(high, block.max())
+        output = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.uint8, shape=shape)
+        for start in range(0, shape[0], rows):
+            if high == low:
+                output[start:start + rows] = 0
+                continue
+            block = self._magnitude(spatial[start:start + rows], log_scale)
+            block -= low
+            block *= 255 / (high - low)
+            output[start:start + rows] = block.astype(np.uint8)
+        output.flush()
+        return output
+
+    @staticmethod
+    def _magnitude(block: np.ndarray, log_scale: bool) -> np.ndarray:
+        magnitude = np.abs(block)
+        if log_scale:
+            np.log1p(magnitude, out=magnitude)
+        return magnitude
+
+    def _row_pass(self, array: np.memmap, transform):
+        rows = self.rows_per_block(array.shape[1], array.dtype.itemsize)
+        for start in range(0, array.shape[0], rows):
+            array[start:start + rows] = transform(array[start:start + rows], axis=1)
+
+    def _column_pass(self, array: np.memmap, transform):
+        # Column tiles are strided on disk; wide tiles keep each read mostly sequential
+        cols = self.rows_per_block(array.shape[0], array.dtype.itemsize)
+        for start in range(0, array.shape[1], cols):
+            array[:, start:start + cols] = transform(array[:, start:start + cols], axis=0)
+
+    @staticmethod
+    def _check_cancelled(cancelled: Optional[Callable[[], bool]]):
+        if cancelled is not None and cancelled():
+            raise MixCancelled()
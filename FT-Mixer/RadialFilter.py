@@ -0,0 +1,205 @@
+"""Radial frequency filters: circular, annular and smooth low/high/band-pass responses.
+
+The radius of a frequency is measured on the centred spectrum and
+normalized per axis, so 1 is the middle of each edge (an ellipse on
+non-square spectra, like the fractions of RegionSpec). Every spectrum
+layout gets one quantized radius index, computed once; a filter's response
+is a small table over that index, so changing a cutoff is a table lookup
+and never recomputes a radius.
+
+    ideal        hard cutoff: a disk (low-pass), its complement (high-pass)
+                 or an annulus (band-pass)
+    gaussian     exp(-r^2 / 2c^2) and its complement
+    butterworth  1 / (1 + (r / c)^2n) and its complement
+
+A band-pass keeps the radii between cutoff and cutoff_high: the high-pass
+at cutoff times the low-pass at cutoff_high.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Tuple
+import numpy as np
+
+NONE = "none"
+IDEAL = "ideal"
+GAUSSIAN = "gaussian"
+BUTTERWORTH = "butterworth"
+FILTER_KINDS = (NONE, IDEAL, GAUSSIAN, BUTTERWORTH)
+
+LOW_PASS = "low"
+HIGH_PASS = "high"
+BAND_PASS = "band"
+FILTER_BANDS = (LOW_PASS, HIGH_PASS, BAND_PASS)
+
+# Filters as offered by the viewers' filter combo boxes: (kind, band)
+FILTER_PRESETS = {
+    "No Filter": (NONE, LOW_PASS),
+    "Circle Low-pass": (IDEAL, LOW_PASS),
+    "Circle High-pass": (IDEAL, HIGH_PASS),
+    "Annulus Band-pass": (IDEAL, BAND_PASS),
+    "Gaussian Low-pass": (GAUSSIAN, LOW_PASS),
+    "Gaussian High-pass": (GAUSSIAN, HIGH_PASS),
+    "Gaussian Band-pass": (GAUSSIAN, BAND_PASS),
+    "Butterworth Low-pass": (BUTTERWORTH, LOW_PASS),
+    "Butterworth High-pass": (BUTTERWORTH, HIGH_PASS),
+    "Butterworth Band-pass": (BUTTERWORTH, BAND_PASS),
+}
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """Radial filter of one input, with cutoffs as normalized radii."""
+    kind: str = NONE
+    band: str = LOW_PASS
+    # Low/high-pass cutoff, the inner edge of a band-pass
+    cutoff: float = 0.5
+    # Outer edge of a band-pass
+    cutoff_high: float = 1.0
+    # Butterworth order
+    order: int = 2
+    # Half extents along (rows, cols) per unit radius, relative to the spectrum's own; rescaled() sets them
+    # for a cropped window, so the cutoffs keep covering the frequencies they do on the full spectrum
+    axis_scale: Tuple[float, float] = (1.0, 1.0)
+
+    def __post_init__(self):
+        object.__setattr__(self, "axis_scale", tuple(float(scale) for scale in self.axis_scale))
+        if self.kind not in FILTER_KINDS:
+            raise ValueError(f"Unknown filter kind {self.kind!r}, expected one of {', '.join(FILTER_KINDS)}")
+        if self.band not in FILTER_BANDS:
+            raise ValueError(f"Unknown filter band {self.band!r}, expected one of {', '.join(FILTER_BANDS)}")
+        if self.cutoff <= 0 or (self.band == BAND_PASS and self.cutoff_high <= self.cutoff):
+            raise ValueError(f"Invalid filter cutoffs: {self.cutoff}, {self.cutoff_high}")
+        if self.order < 1:
+            raise ValueError(f"Invalid Butterworth order: {self.order}")
+        if len(self.axis_scale) != 2 or min(self.axis_scale) <= 0:
+            raise ValueError(f"Invalid filter axis scale: {self.axis_scale}")
+
+    @classmethod
+    def from_preset(cls, name: str, cutoff: float) -> 'FilterSpec':
+        """Build a filter from a FILTER_PRESETS name and one cutoff; band-passes keep the octave below it."""
+        kind, band = FILTER_PRESETS[name]
+        if kind == NONE:
+            return cls()
+        if band == BAND_PASS:
+            return cls(kind, band, cutoff / 2, cutoff)
+        return cls(kind, band, cutoff)
+
+    @property
+    def active(self) -> bool:
+        return self.kind != NONE
+
+    def response(self, radius: np.ndarray) -> np.ndarray:
+        """Gain of the filter at normalized radii."""
+        if self.band == LOW_PASS:
+            return self._low_pass(radius, self.cutoff)
+        if self.band == HIGH_PASS:
+            return 1 - self._low_pass(radius, self.cutoff)
+        return (1 - self._low_pass(radius, self.cutoff)) * self._low_pass(radius, self.cutoff_high)
+
+    def _low_pass(self, radius: np.ndarray, cutoff: float) -> np.ndarray:
+        if self.kind == NONE:
+            return np.ones_like(radius)
+        if self.kind == IDEAL:
+            return (radius <= cutoff).astype(radius.dtype)
+        if self.kind == GAUSSIAN:
+            return np.exp(-radius ** 2 / (2 * cutoff ** 2))
+        return 1 / (1 + (radius / cutoff) ** (2 * self.order))
+
+    def rescaled(self, full_shape: Tuple[int, int], shape: Tuple[int, int]) -> 'FilterSpec':
+        """The same frequencies expressed on the central shape-sized window of a full_shape spectrum.
+
+        Each axis keeps the full spectrum's normalization, so a window of
+        another aspect ratio still filters the same frequencies.
+        """
+        if not self.active:
+            return self
+        row_scale, col_scale = (half_extent(full) / half_extent(cropped)
+                                for full, cropped in zip(full_shape[-2:], shape[-2:]))
+        return replace(self, axis_scale=(self.axis_scale[0] * row_scale, self.axis_scale[1] * col_scale))
+
+
+class FilterCache:
+    """Radius index per spectrum layout and an LRU cache of filter responses over it.
+
+    The index holds every frequency's normalized radius rounded to bins of
+    one pixel along the longer axis, so a response is a gather from a
+    table of a few thousand gains. Half indices cover an rfft2 half
+    spectrum with centred rows, whose column k is frequency k.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._indices: "OrderedDict[tuple, Tuple[np.ndarray, int]]" = OrderedDict()
+        self._responses: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+
+    def radius_index(self, shape: Tuple[int, int], half: bool = False,
+                     axis_scale: Tuple[float, float] = (1.0, 1.0)) -> Tuple[np.ndarray, int]:
+        """Return the (H, W) (or half) radius index of a full centred spectrum shape, and its bins per unit radius."""
+        shape = tuple(shape[-2:])
+        key = (shape, half, tuple(axis_scale))
+        entry = self._indices.get(key)
+        if entry is None:
+            entry = self._build_index(shape, half, axis_scale)
+            self._indices[key] = entry
+            if len(self._indices) > self.max_entries:
+                self._indices.popitem(last=False)
+        else:
+            self._indices.move_to_end(key)
+        return entry
+
+    def get(self, shape: Tuple[int, int], spec: FilterSpec, half: bool = False, dtype: np.dtype = np.float64,
+            support: bool = False) -> np.ndarray:
+        """Return the filter's gains for a full centred spectrum shape (half: its rfft2 half).
+
+        With support, the boolean mask of the frequencies the filter lets
+        through at all, which is what the phase of a filtered spectrum keeps.
+        """
+        shape = tuple(shape[-2:])
+        dtype = np.dtype(bool if support else dtype)
+        key = (shape, spec, half, dtype)
+        response = self._responses.get(key)
+        if response is not None:
+            self._responses.move_to_end(key)
+            return response
+        index, bins = self.radius_index(shape, half, spec.axis_scale)
+        table = spec.response(np.arange(int(index.max()) + 1) / bins)
+        table = table > 0 if support else table.astype(dtype)
+        response = np.take(table, index)
+        # Responses are shared between callers, keep them from being modified in place
+        response.flags.writeable = False
+        self._responses[key] = response
+        if len(self._responses) > self.max_entries:
+            self._responses.popitem(last=False)
+        return response
+
+    def clear(self):
+        self._indices.clear()
+        self._responses.clear()
+
+    @staticmethod
+    def _build_index(shape: Tuple[int, int], half: bool, axis_scale: Tuple[float, float]) -> Tuple[np.ndarray, int]:
+        rows, cols = shape
+        col_offsets = np.arange(cols // 2 + 1) if half else np.arange(cols) - cols // 2
+        return radius_index(shape, np.arange(rows) - rows // 2, col_offsets, axis_scale)
+
+
+def half_extent(length: int) -> int:
+    """Offset from the centre that is radius 1 along an axis of this length."""
+    return max(1, length // 2)
+
+
+def radius_index(shape: Tuple[int, int], row_offsets: np.ndarray, col_offsets: np.ndarray,
+                 axis_scale: Tuple[float, float] = (1.0, 1.0)) -> Tuple[np.ndarray, int]:
+    """Quantized normalized radius of the frequencies at these offsets from the centre of a spectrum of this shape.
+
+    axis_scale stretches radius 1 along each axis (see FilterSpec.axis_scale).
+    Returns the index and its bins per unit radius; index / bins is the radius.
+    """
+    rows, cols = shape[-2:]
+    half_rows, half_cols = half_extent(rows), half_extent(cols)
+    # One bin per pixel of the spectrum the scale refers to, so a rescaled filter quantizes as it does there
+    bins = int(round(max(half_rows * axis_scale[0], half_cols * axis_scale[1])))
+    radius = np.hypot(np.asarray(row_offsets)[:, None] / (half_rows * axis_scale[0]),
+                      np.asarray(col_offsets)[None, :] / (half_cols * axis_scale[1]))
+    dtype = np.uint16 if radius.max() * bins < 2 ** 16 else np.uint32
+    return np.rint(radius * bins).astype(dtype), bins
@@ -0,0 +1,84 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+import numpy as np
+
+# (row_start, row_end, col_start, col_end)
+Bounds = Tuple[int, int, int, int]
+
+
+class RegionMaskCache:
+    """LRU cache of boolean inner/outer rectangle masks for centred spectra.
+
+    Masks are keyed by (shape, slice bounds, inner), so rectangle positions
+    that land on the same pixels share one mask. Once the cache is full, the
+    evicted mask's buffer is recycled for the new key: during a drag only the
+    strips covered by the old and new rectangles are rewritten instead of
+    allocating and filling a whole new array. A returned mask therefore
+    stays valid until max_entries further misses.
+
+    Half masks select the same frequencies on an rfft2 half spectrum whose
+    rows are centred: half column k holds centred column (W // 2 + k) % W.
+    """
+
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max_entries
+        self._masks: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+
+    def get(self, shape: Tuple[int, int], bounds: Bounds, inner: bool, half: bool = False) -> np.ndarray:
+        """Return the mask keeping the rectangle (inner) or everything but it (outer).
+
+        shape and bounds are always those of the full centred spectrum; with
+        half the mask has shape (H, W // 2 + 1).
+        """
+        shape = tuple(shape[-2:])
+        key = (shape, tuple(bounds), inner, half)
+        mask = self._masks.get(key)
+        if mask is not None:
+            self._masks.move_to_end(key)
+            return mask
+
+        recycled = None
+        if len(self._masks) >= self.max_entries:
+            old_key, recycled = self._masks.popitem(last=False)
+            same_layout = old_key[0] == shape and old_key[3] == half
+            if same_layout and old_key[2] == inner and not half:
+                mask = self._patch(recycled, old_key[1], bounds, inner)
+            else:
+                recycled = recycled if same_layout else None
+        if mask is None:
+            mask = self._build(shape, bounds, inner, half, out=recycled)
+        # Masks are shared between callers, keep them from being modified in place
+        mask.flags.writeable = False
+        self._masks[key] = mask
+        return mask
+
+    def clear(self):
+        self._masks.clear()
+
+    @staticmethod
+    def _build(shape: Tuple[int, int], bounds: Bounds, inner: bool, half: bool = False,
+               out: Optional[np.ndarray] = None) -> np.ndarray:
+        # A rectangle is separable: the 2-D mask is the outer product of a row and a column selector
+        row_start, row_end, col_start, col_end = bounds
+        rows = np.zeros(shape[0], dtype=bool)
+        cols = np.zeros(shape[1], dtype=bool)
+        rows[row_start:row_end] = True
+        cols[col_start:col_end] = True
+        if half:
+            width = shape[1]
+            cols = cols[(width // 2 + np.arange(width // 2 + 1)) % width]
+        if out is not None:
+            out.flags.writeable = True
+        mask = np.logical_and.outer(rows, cols, out=out)
+        if not inner:
+            np.logical_not(mask, out=mask)
+        return mask
+
+    @staticmethod
+    def _patch(mask: np.ndarray, old_bounds: Bounds, new_bounds: Bounds, inner: bool) -> np.ndarray:
+        mask.flags.writeable = True
+        row_start, row_end, col_start, col_end = old_bounds
+        mask[row_start:row_end, col_start:col_end] = not inner
+        row_start, row_end, col_start, col_end = new_bounds
+        mask[row_start:row_end, col_start:col_end] = inner
+        return mask
@@ -0,0 +1,333 @@
+from collections import OrderedDict
+import os
+from typing import Dict, Optional, Sequence, Tuple
+import threading
+import weakref
+import numpy as np
+from FFTBackend import fft2, rfft2
+
+MAGNITUDE = "magnitude"
+PHASE = "phase"
+REAL = "real"
+IMAGINARY = "imaginary"
+
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024  # bytes of derived arrays kept across all spectra
+
+# Spectrum precision: single keeps complex64/float32 end to end, halving memory and bandwidth
+SINGLE = "single"
+DOUBLE = "double"
+PRECISION_ENV = "FT_MIXER_PRECISION"
+COMPLEX_DTYPES = {SINGLE: np.dtype(np.complex64), DOUBLE: np.dtype(np.complex128)}
+
+# Store only the rfft2 half spectrum of the (real) input images
+HALF_SPECTRUM_ENV = "FT_MIXER_HALF_SPECTRUM"
+
+# Components whose value flips sign between a frequency and its mirror
+_ODD_COMPONENTS = (PHASE, IMAGINARY)
+
+
+class ComponentCache:
+    """LRU bookkeeping of derived component arrays under a shared memory budget."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_BUDGET):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, spectrum: 'Spectrum', name: str) -> Optional[np.ndarray]:
+        with self._lock:
+            key = (id(spectrum), name)
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return spectrum._derived.get(name)
+
+    def put(self, spectrum: 'Spectrum', name: str, array: np.ndarray):
+        """Memoize an array, evicting least recently used ones to stay within budget."""
+        with self._lock:
+            if array.nbytes > self.max_bytes:
+                return
+            key = (id(spectrum), name)
+            self._discard(key)
+            while self._entries and self.used_bytes + array.nbytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+            spectrum._derived[name] = array
+            self._entries[key] = (weakref.ref(spectrum), array.nbytes)
+            self.used_bytes += array.nbytes
+
+    def release(self, spectrum_id: int):
+        """Forget every entry of a spectrum (called when it is garbage collected)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == spectrum_id]:
+                self._discard(key)
+
+    def set_budget(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = max_bytes
+            while self._entries and self.used_bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        ref, nbytes = entry
+        self.used_bytes -= nbytes
+        spectrum = ref()
+        if spectrum is not None:
+            spectrum._derived.pop(key[1], None)
+
+
+_default_cache = ComponentCache()
+
+
+def set_memory_budget(max_bytes: int):
+    """Change the budget shared by all spectra using the default cache."""
+    _default_cache.set_budget(max_bytes)
+
+
+class Spectrum:
+    """Centred (fftshifted) 2-D spectrum with lazily derived components.
+
+    Real and imaginary parts are zero-copy views of the complex data.
+    Magnitude and phase are computed on first access and memoized in a
+    ComponentCache, which evicts the least recently used arrays once the
+    memory budget is exceeded.
+
+    When width is given, data is an rfft2 half spectrum of an image that
+    wide: rows are centred and the columns hold the non-negative
+    frequencies 0..width // 2. The other half is the complex conjugate
+    mirror and is only rebuilt for display (full_component).
+
+    Once stacked (stack_spectra), a spectrum is a view of its slice of the
+    (N, H, W) stack and takes its magnitude and phase from the stack's, so
+    display and mixing derive them once.
+    """
+
+    def __init__(self, data: np.ndarray, cache: Optional[ComponentCache] = None, width: Optional[int] = None):
+        self.data = data
+        self.width = width
+        self.cache = cache or _default_cache
+        self._derived: Dict[str, np.ndarray] = {}
+        # (stack, index) once this spectrum is a slice of a stack
+        self._stack: Optional[Tuple['Spectrum', int]] = None
+        weakref.finalize(self, self.cache.release, id(self))
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    @property
+    def half(self) -> bool:
+        return self.width is not None
+
+    @property
+    def full_shape(self):
+        """Shape of the full centred spectrum (and of the image)."""
+        if self.half:
+            return self.data.shape[:-1] + (self.width,)
+        return self.data.shape
+
+    @property
+    def real(self) -> np.ndarray:
+        return self.data.real
+
+    @property
+    def imag(self) -> np.ndarray:
+        return self.data.imag
+
+    @property
+    def magnitude(self) -> np.ndarray:
+        return self._memoized(MAGNITUDE, np.abs)
+
+    @property
+    def phase(self) -> np.ndarray:
+        return self._memoized(PHASE, np.angle)
+
+    def component(self, name: str) -> np.ndarray:
+        """Return a component by name: magnitude, phase, real or imaginary."""
+        if name == MAGNITUDE:
+            return self.magnitude
+        if name == PHASE:
+            return self.phase
+        if name == REAL:
+            return self.real
+        if name == IMAGINARY:
+            return self.imag
+        raise ValueError(f"Unknown spectrum component: {name}")
+
+    def full_component(self, name: str) -> np.ndarray:
+        """Like component(), but always over the full centred spectrum, mirroring a half one."""
+        array = self.component(name)
+        if self.half:
+            return mirror_half(array, self.width, odd=name in _ODD_COMPONENTS)
+        return array
+
+    def share(self, stack: 'Spectrum', index: int):
+        """Become a view of input index of an (N, H, W) stack holding the same values, dropping our own arrays."""
+        self.data = stack.data[index]
+        self._stack = (stack, index)
+        self.cache.release(id(self))
+
+    def stacked_in(self, stack: 'Spectrum') -> Optional[int]:
+        """Index of this spectrum in stack if it is a view of one of its slices."""
+        if self._stack is None or self._stack[0] is not stack:
+            return None
+        return self._stack[1]
+
+    def _memoized(self, name: str, compute) -> np.ndarray:
+        if self._stack is not None:
+            stack, index = self._stack
+            # Unless the budget could never hold the stack's array, which is then only derived per slice
+            if stack.data.real.nbytes <= stack.cache.max_bytes:
+                return stack._memoized(name, compute)[index]
+        array = self.cache.get(self, name)
+        if array is None:
+            array = compute(self.data)
+            self.cache.put(self, name, array)
+        return array
+
+
+def as_spectrum(spectrum) -> Spectrum:
+    """Wrap a raw complex array, passing Spectrum instances through.
+
+    Ad-hoc wrappers get a private cache so they never evict the viewers' arrays.
+    """
+    if isinstance(spectrum, Spectrum):
+        return spectrum
+    return Spectrum(np.asarray(spectrum), ComponentCache())
+
+
+_precision: Optional[str] = None
+
+
+def set_precision(precision: str):
+    """Select the precision of the spectra computed from now on."""
+    global _precision
+    if precision not in COMPLEX_DTYPES:
+        raise ValueError(f"Unknown precision: {precision} (choose from {', '.join(COMPLEX_DTYPES)})")
+    _precision = precision
+
+
+def get_precision() -> str:
+    """Return the current precision, read from FT_MIXER_PRECISION on first use (default double)."""
+    if _precision is None:
+        set_precision(os.environ.get(PRECISION_ENV, DOUBLE))
+    return _precision
+
+
+def real_dtype_of(dtype) -> np.dtype:
+    """float32 for complex64, float64 for complex128."""
+    return np.finfo(dtype).dtype
+
+
+_half_spectrum: Optional[bool] = None
+
+
+def set_half_spectrum(enabled: bool):
+    """Choose between rfft2 half spectra and full spectra for transforms from now on."""
+    global _half_spectrum
+    _half_spectrum = bool(enabled)
+
+
+def use_half_spectrum() -> bool:
+    """Whether transforms store half spectra, read from FT_MIXER_HALF_SPECTRUM on first use (default off)."""
+    if _half_spectrum is None:
+        set_half_spectrum(os.environ.get(HALF_SPECTRUM_ENV, "0").lower() in ("1", "true", "yes"))
+    return _half_spectrum
+
+
+def transform(images: np.ndarray, cache: Optional[ComponentCache] = None,
+              precision: Optional[str] = None, half: Optional[bool] = None) -> Spectrum:
+    """Centred spectrum of an (H, W) image, or of an (N, H, W) stack in one batched FFT.
+
+    With half, only the rfft2 half spectrum is computed and stored.
+    """
+    dtype = COMPLEX_DTYPES[precision or get_precision()]
+    images = np.asarray(images, dtype=real_dtype_of(dtype))
+    if use_half_spectrum() if half is None else half:
+        spectrum = rfft2(images).astype(dtype, copy=False)
+        return Spectrum(np.fft.fftshift(spectrum, axes=-2), cache, width=images.shape[-1])
+    axes = (-2, -1)
+    spectrum = fft2(images, axes).astype(dtype, copy=False)
+    return Spectrum(np.fft.fftshift(spectrum, axes=axes), cache)
+
+
+def mirror_half(half: np.ndarray, width: int, odd: bool = False) -> np.ndarray:
+    """Rebuild a full centred component from its half spectrum values.
+
+    A real image's spectrum satisfies X(-u, -v) = conj(X(u, v)), so the
+    negative column frequencies are the positive ones with rows reflected
+    about the centre; odd components (imaginary, phase) also change sign.
+    """
+    rows = half.shape[-2]
+    center_col = width // 2
+    full = np.empty(half.shape[:-1] + (width,), dtype=half.dtype)
+    full[..., center_col:] = half[..., :width - center_col]
+    # Centred row i holds frequency i - rows // 2, its mirror sits at row 2 * (rows // 2) - i
+    mirrored_rows = (2 * (rows // 2) - np.arange(rows)) % rows
+    left = half[..., mirrored_rows, center_col:0:-1]
+    if odd:
+        np.negative(left, out=full[..., :center_col])
+    else:
+        full[..., :center_col] = left
+    return full
+
+
+def stack_spectra(spectra: Sequence) -> Spectrum:
+    """Equally shaped (H, W) spectra as one contiguous (N, H, W) spectrum.
+
+    The inputs are copied once and then share their slices of the stack,
+    so stacking the same inputs again returns that stack without a copy.
+    """
+    spectra = [as_spectrum(spectrum) for spectrum in spectra]
+    shared = spectra[0]._stack[0] if spectra[0]._stack is not None else None
+    if (shared is not None and len(shared.data) == len(spectra)
+            and all(spectrum.stacked_in(shared) == index for index, spectrum in enumerate(spectra))):
+        return shared
+    if len({(spectrum.shape, spectrum.width) for spectrum in spectra}) > 1:
+        raise ValueError("All spectra must have the same shape")
+    stack = Spectrum(np.stack([spectrum.data for spectrum in spectra]), width=spectra[0].width)
+    for index, spectrum in enumerate(spectra):
+        spectrum.share(stack, index)
+    return stack
+
+
+def _centred_window(length: int, target: int):
+    """(source start, source end, target start, target end) of the frequencies two centred axes share."""
+    low = max(-(target // 2), -(length // 2))
+    high = min(target - target // 2, length - length // 2)
+    return low + length // 2, high + length // 2, low + target // 2, high + target // 2
+
+
+def resample_spectrum(spectrum, shape: Sequence[int]) -> Spectrum:
+    """Spectrum of the image resampled to shape, without a new FFT.
+
+    Shrinking crops the centred spectrum to the frequencies the smaller
+    image can hold, enlarging zero-pads it (Fourier interpolation). Values
+    are scaled by the ratio of pixel counts so the image keeps its
+    intensity level.
+    """
+    spectrum = as_spectrum(spectrum)
+    rows, cols = shape
+    source_rows, source_cols = spectrum.full_shape[-2:]
+    if (source_rows, source_cols) == (rows, cols):
+        return spectrum
+    row_start, row_end, out_row_start, out_row_end = _centred_window(source_rows, rows)
+    if spectrum.half:
+        # Columns hold frequencies 0..width // 2 and are not shifted
+        out_cols = cols // 2 + 1
+        col_end = min(out_cols, spectrum.shape[-1])
+        col_start, out_col_start, out_col_end = 0, 0, col_end
+    else:
+        out_cols = cols
+        col_start, col_end, out_col_start, out_col_end = _centred_window(source_cols, cols)
+    data = np.zeros(spectrum.shape[:-2] + (rows, out_cols), dtype=spectrum.dtype)
+    np.multiply(spectrum.data[..., row_start:row_end, col_start:col_end], rows * cols / (source_rows * source_cols),
+                out=data[..., out_row_start:out_row_end, out_col_start:out_col_end])
+    return Spectrum(data, width=cols if spectrum.half else None)
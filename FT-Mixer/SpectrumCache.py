@@ -0,0 +1,226 @@
+"""Persistent on-disk cache of the spectra of loaded image files.
+
+Entries are keyed by the SHA-256 of the file contents, the target size, the
+precision and the spectrum layout, so a renamed or copied file still hits and
+an edited one misses. Each entry holds the resized uint8 image and its
+centred spectrum as .npy files. Hits are read into memory rather than
+memory-mapped, so pruning or clearing the cache, from this process or
+another one, never hits a file still in use.
+
+Usage: python SpectrumCache.py info [--dir DIR]
+       python SpectrumCache.py clear [--dir DIR]
+       python SpectrumCache.py prune --max-mb 512 [--dir DIR]
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from Spectrum import Spectrum, get_precision, transform, use_half_spectrum
+
+# Cache directory, or "0"/"off" to disable it, e.g. FT_MIXER_SPECTRUM_CACHE=/tmp/spectra python MainClasses.py
+CACHE_DIR_ENV = "FT_MIXER_SPECTRUM_CACHE"
+CACHE_MB_ENV = "FT_MIXER_SPECTRUM_CACHE_MB"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".ft_mixer", "spectra")
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+_SPECTRUM_SUFFIX = ".spectrum.npy"
+_IMAGE_SUFFIX = ".image.npy"
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    nbytes: int
+    last_used: float
+
+
+class SpectrumCache:
+    """Size-capped LRU of image/spectrum pairs in a directory.
+
+    Recency is the modification time of the spectrum file, refreshed on
+    every hit, so several processes can share one cache directory.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(digest: str, shape: Tuple[int, int], precision: str, half: bool) -> str:
+        return f"{digest}_{shape[0]}x{shape[1]}_{precision}_{'half' if half else 'full'}"
+
+    def load(self, key: str) -> Optional[Tuple[np.ndarray, Spectrum]]:
+        """Return (image, spectrum) for a key, or None on a miss or an unreadable entry."""
+        spectrum_path, image_path = self._paths(key)
+        try:
+            image = np.load(image_path)
+            data = np.load(spectrum_path)
+            os.utime(spectrum_path)
+        except (OSError, ValueError):
+            return None
+        half = key.endswith("_half")
+        return image, Spectrum(data, width=image.shape[1] if half else None)
+
+    def store(self, key: str, image: np.ndarray, spectrum: Spectrum):
+        """Write an entry atomically, then evict least recently used entries over the size cap."""
+        spectrum_path, image_path = self._paths(key)
+        try:
+            # Image first: an entry only counts once its spectrum file exists
+            self._save_atomic(image_path, image)
+            self._save_atomic(spectrum_path, spectrum.data)
+        except OSError as e:
+            print(f"Could not cache spectrum: {e}")
+            return
+        self.prune(self.max_bytes)
+
+    def entries(self) -> List[CacheEntry]:
+        """Complete entries, least recently used first."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SPECTRUM_SUFFIX):
+                continue
+            key = name[:-len(_SPECTRUM_SUFFIX)]
+            spectrum_path, image_path = self._paths(key)
+            try:
+                stat = os.stat(spectrum_path)
+                nbytes = stat.st_size + os.path.getsize(image_path)
+            except OSError:
+                continue
+            entries.append(CacheEntry(key, nbytes, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry.last_used)
+
+    def total_bytes(self) -> int:
+        return sum(entry.nbytes for entry in self.entries())
+
+    def prune(self, max_bytes: int) -> int:
+        """Evict least recently used entries until the cache fits in max_bytes; return how many went."""
+        with self._lock:
+            entries = self.entries()
+            total = sum(entry.nbytes for entry in entries)
+            removed = 0
+            for entry in entries:
+                if total <= max_bytes:
+                    break
+                self.remove(entry.key)
+                total -= entry.nbytes
+                removed += 1
+            return removed
+
+    def remove(self, key: str):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self) -> int:
+        return self.prune(0)
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, key)
+        return base + _SPECTRUM_SUFFIX, base + _IMAGE_SUFFIX
+
+    def _save_atomic(self, path: str, array: np.ndarray):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+
+_cache: Optional[SpectrumCache] = None
+_configured = False
+
+
+def set_spectrum_cache(cache: Optional[SpectrumCache]):
+    """Use the given cache for loaded images, or None to disable caching."""
+    global _cache, _configured
+    _cache, _configured = cache, True
+
+
+def get_spectrum_cache() -> Optional[SpectrumCache]:
+    """Return the cache, configured from FT_MIXER_SPECTRUM_CACHE(_MB) on first use (on by default)."""
+    if not _configured:
+        directory = os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+        if directory.lower() in ("0", "off", "false", "no"):
+            set_spectrum_cache(None)
+        else:
+            max_bytes = int(float(os.environ[CACHE_MB_ENV]) * 2 ** 20) if os.environ.get(CACHE_MB_ENV) \
+                else DEFAULT_MAX_BYTES
+            try:
+                set_spectrum_cache(SpectrumCache(directory, max_bytes))
+            except OSError as e:
+                print(f"Spectrum cache unavailable ({e})")
+                set_spectrum_cache(None)
+    return _cache
+
+
+def cached_transform(digest: Optional[str], shape: Tuple[int, int],
+                     make_image: Callable[[], np.ndarray]) -> Tuple[np.ndarray, Spectrum]:
+    """Return (image, spectrum) of a file at the given size, from the cache when possible.
+
+    make_image decodes and resizes the file; it only runs on a miss. Without a
+    digest (no source file) or a cache, the image is always transformed.
+    """
+    cache = get_spectrum_cache()
+    if digest is None or cache is None:
+        image = make_image()
+        return image, transform(image)
+    half = use_half_spectrum()
+    key = cache.key(digest, shape, get_precision(), half)
+    cached = cache.load(key)
+    if cached is not None:
+        return cached
+    image = make_image()
+    spectrum = transform(image, half=half)
+    cache.store(key, image, spectrum)
+    return image, spectrum
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the on-disk spectrum cache")
+    parser.add_argument("command", choices=["info", "clear", "prune"])
+    parser.add_argument("--dir", default=os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR),
+                        help="Cache directory")
+    parser.add_argument("--max-mb", type=float, help="Size to prune the cache down to")
+    parser.add_argument("--verbose", "-v", action="store_true", help="List every entry")
+    args = parser.parse_args()
+
+    cache = SpectrumCache(args.dir)
+    if args.command == "clear":
+        print(f"Removed {cache.clear()} entries from {args.dir}")
+    elif args.command == "prune":
+        if args.max_mb is None:
+            parser.error("prune needs --max-mb")
+        print(f"Removed {cache.prune(int(args.max_mb * 2 ** 20))} entries from {args.dir}")
+    else:
+        entries = cache.entries()
+        total = sum(entry.nbytes for entry in entries)
+        print(f"{args.dir}: {len(entries)} entries, {total / 2 ** 20:.1f} MiB")
+        if args.verbose:
+            for entry in reversed(entries):
+                used = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.last_used))
+                print(f"  {entry.key}  {entry.nbytes / 2 ** 20:8.1f} MiB  last used {used}")
+
+
+if __name__ == "__main__":
+    main()
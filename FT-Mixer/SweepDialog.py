@@ -0,0 +1,171 @@
+from typing import Dict, List, Optional
+import numpy as np
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import (QDialog, QDoubleSpinBox, QFileDialog, QFormLayout, QHBoxLayout, QLabel, QMessageBox,
+                             QPushButton, QSlider, QSpinBox, QVBoxLayout)
+from ImageBridge import array_to_pixmap
+from ImageSizing import downsample_for_display
+from MixEngine import MixCancelled, MixEngine, RegionSpec, SpectrumLike
+from RadialFilter import FilterSpec
+from WeightSweep import DEFAULT_FPS, DEFAULT_STEPS, export_frames
+
+FRAME_SIZE = 400  # side of the square frame view, in pixels
+EXPORT_FILTERS = "Animated GIF (*.gif);;MP4 video (*.mp4)"
+
+
+class _JobSignals(QObject):
+    # generation, (N, H, W) frames (None when cancelled), error message
+    done = pyqtSignal(int, object, str)
+
+
+class SweepJob(QRunnable):
+    """Mixes all frames of one sweep on a pool thread."""
+
+    def __init__(self, generation: int, dialog: 'SweepDialog', end_weights: List[float], steps: int):
+        super().__init__()
+        self.generation = generation
+        self.dialog = dialog
+        self.end_weights = end_weights
+        self.steps = steps
+        self.signals = _JobSignals()
+
+    def run(self):
+        frames, error = None, ""
+        dialog = self.dialog
+        try:
+            frames = dialog.engine.mix_sweep(dialog.spectra, dialog.weights, self.end_weights, self.steps,
+                                             dialog.components, dialog.mode, dialog.region,
+                                             cancelled=lambda: dialog.is_stale(self.generation),
+                                             filters=dialog.filters)
+        except MixCancelled:
+            pass
+        except Exception as e:
+            error = str(e)
+        self.signals.done.emit(self.generation, frames, error)
+
+
+class SweepDialog(QDialog):
+    """Sweeps the input weights from their slider values to chosen end values.
+
+    The inputs are a snapshot taken when the dialog opens. All frames are
+    mixed in one MixEngine.mix_sweep call on a worker thread; the slider
+    scrubs through them and Export writes them as a GIF or video.
+    """
+
+    def __init__(self, spectra: List[SpectrumLike], weights: List[float], components: List[str], mode: str,
+                 region: Optional[RegionSpec] = None, parent=None, filters: Optional[List[FilterSpec]] = None):
+        super().__init__(parent)
+        self.spectra = spectra
+        self.weights = weights
+        self.components = components
+        self.mode = mode
+        self.region = region or RegionSpec()
+        self.filters = filters
+        # Its own engine, so the sweep's buffers never evict the live mix's
+        self.engine = MixEngine()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.generation = 0
+        # Jobs by generation: they must outlive their run() until their signal is delivered
+        self._jobs: Dict[int, SweepJob] = {}
+        self.frames: Optional[np.ndarray] = None
+        self.frame_weights: Optional[np.ndarray] = None
+        self.setWindowTitle("Weight Sweep")
+        self._build_ui()
+
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+        self.end_spins = []
+        for i, (weight, component) in enumerate(zip(self.weights, self.components)):
+            spin = QDoubleSpinBox()
+            spin.setRange(0.0, 1.0)
+            spin.setSingleStep(0.05)
+            # Default to the opposite end of the slider, the most telling sweep
+            spin.setValue(1.0 - weight)
+            self.end_spins.append(spin)
+            form.addRow(f"Input {i + 1} ({component}): {weight:.2f} to", spin)
+        self.steps_spin = QSpinBox()
+        self.steps_spin.setRange(2, 500)
+        self.steps_spin.setValue(DEFAULT_STEPS)
+        form.addRow("Steps", self.steps_spin)
+        layout.addLayout(form)
+
+        self.frame_label = QLabel("Press Sweep to mix the frames")
+        self.frame_label.setAlignment(Qt.AlignCenter)
+        self.frame_label.setFixedSize(FRAME_SIZE, FRAME_SIZE)
+        layout.addWidget(self.frame_label, alignment=Qt.AlignCenter)
+        self.frame_slider = QSlider(Qt.Horizontal)
+        self.frame_slider.setEnabled(False)
+        self.frame_slider.valueChanged.connect(self.show_frame)
+        layout.addWidget(self.frame_slider)
+        self.frame_info = QLabel("")
+        layout.addWidget(self.frame_info)
+
+        buttons = QHBoxLayout()
+        self.sweep_button = QPushButton("Sweep")
+        self.sweep_button.clicked.connect(self.start_sweep)
+        self.export_button = QPushButton("Export...")
+        self.export_button.setEnabled(False)
+        self.export_button.clicked.connect(self.export)
+        buttons.addWidget(self.sweep_button)
+        buttons.addWidget(self.export_button)
+        layout.addLayout(buttons)
+
+    def is_stale(self, generation: int) -> bool:
+        return generation != self.generation
+
+    def start_sweep(self):
+        self.generation += 1
+        end_weights = [spin.value() for spin in self.end_spins]
+        steps = self.steps_spin.value()
+        self.frame_weights = np.linspace(self.weights, end_weights, steps)
+        self.sweep_button.setEnabled(False)
+        self.frame_info.setText(f"Mixing {steps} frames...")
+        job = SweepJob(self.generation, self, end_weights, steps)
+        job.signals.done.connect(self._on_sweep_done)
+        self._jobs[self.generation] = job
+        self.pool.start(job)
+
+    @pyqtSlot(int, object, str)
+    def _on_sweep_done(self, generation, frames, error):
+        self._jobs.pop(generation, None)
+        if self.is_stale(generation):
+            return
+        self.sweep_button.setEnabled(True)
+        if error:
+            self.frame_info.setText(f"Sweep failed: {error}")
+            return
+        if frames is None:
+            return
+        self.frames = frames
+        self.export_button.setEnabled(True)
+        self.frame_slider.setEnabled(True)
+        self.frame_slider.setRange(0, len(frames) - 1)
+        if self.frame_slider.value() == 0:
+            self.show_frame(0)
+        else:
+            self.frame_slider.setValue(0)
+
+    def show_frame(self, index: int):
+        if self.frames is None:
+            return
+        pixmap = array_to_pixmap(downsample_for_display(self.frames[index]))
+        self.frame_label.setPixmap(pixmap.scaled(FRAME_SIZE, FRAME_SIZE, Qt.KeepAspectRatio))
+        weights = ", ".join(f"{weight:.2f}" for weight in self.frame_weights[index])
+        self.frame_info.setText(f"Frame {index + 1}/{len(self.frames)}  weights: {weights}")
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Sweep", "sweep.gif", EXPORT_FILTERS)
+        if not path:
+            return
+        try:
+            export_frames(self.frames, path, DEFAULT_FPS)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Export failed", str(e))
+
+    def done(self, result):
+        # Closing abandons a running sweep at its next pass
+        self.generation += 1
+        self.pool.waitForDone()
+        super().done(result)
@@ -0,0 +1,266 @@
+"""Mix several video files frame by frame with a still-image recipe.
+
+The pipeline is a chain of generators, each running in its own thread and
+handing frames to the next through a bounded queue, so memory stays flat
+however long the clips are:
+
+    decode (one thread per input) -> batched FFT -> mix -> encode
+
+Every frame set has the same shape, so the mix engine's workspace and
+region masks, and the FFT backend's plans, are built once and reused.
+Mixing stops at the end of the shortest input.
+
+The recipe is the JSON format of BatchMix.py, one weight and component per
+video. Frame sizes are unified like still images unless it sets a size.
+
+Usage: python VideoMix.py recipe.json a.mp4 b.mp4 c.mp4 d.mp4 --output mixed.mp4 [--fps 25] [--fourcc mp4v]
+"""
+import argparse
+import threading
+import time
+from dataclasses import dataclass
+from queue import Empty, Full, Queue
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from BatchMix import Recipe
+from ImageSizing import resize_to, unified_shape
+from MixEngine import MixEngine
+from Spectrum import transform
+
+DEFAULT_QUEUE_SIZE = 8  # frames (or frame sets) buffered between two stages
+DEFAULT_FOURCC = "mp4v"
+
+_END = object()
+
+
+class _Failure:
+    """An exception raised in a stage's thread, re-raised in the consuming one."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+@dataclass
+class StageStats:
+    """Frames a stage produced and the time it spent working on them (not waiting on its queues)."""
+    name: str
+    frames: int = 0
+    busy: float = 0.0
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.busy if self.busy else 0.0
+
+    def add(self, seconds: float):
+        self.frames += 1
+        self.busy += seconds
+
+
+def threaded(items: Iterable, maxsize: int = DEFAULT_QUEUE_SIZE, name: str = "stage",
+             stop: Optional[threading.Event] = None) -> Iterator:
+    """Run an iterable in its own thread and yield its items through a bounded queue.
+
+    The producer blocks once maxsize items wait, so a slow consumer holds
+    every upstream stage back instead of letting frames pile up. Closing
+    the returned generator ends its thread and waits for it, setting stop
+    ends those of all stages sharing it. A stage that reaches its end passes _END on, and an
+    error is passed on to be raised by the last consumer, so the stages
+    downstream always drain the frames still queued first.
+    """
+    queue = Queue(maxsize)
+    stop = stop or threading.Event()
+    # Set once this stage's consumer is gone, which only ends this stage's thread
+    closed = threading.Event()
+
+    def put(item) -> bool:
+        while not (stop.is_set() or closed.is_set()):
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(_Failure(e))
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            try:
+                item = queue.get(timeout=0.1)
+            except Empty:
+                if stop.is_set():
+                    return
+                continue
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        # Closed by its consumer (e.g. zip dropping the longer inputs), failed or done: only this stage ends
+        closed.set()
+        # At most one item away; a reader still decoding when the interpreter exits aborts it
+        thread.join()
+
+
+def stage(items: Iterable, function: Callable, stats: StageStats) -> Iterator:
+    """Apply function to every item, timing only the work."""
+    for item in items:
+        start = time.perf_counter()
+        result = function(item)
+        stats.add(time.perf_counter() - start)
+        yield result
+
+
+def open_video(path: str) -> cv2.VideoCapture:
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open video: {path}")
+    return capture
+
+
+def video_info(path: str) -> Tuple[Tuple[int, int], float, int]:
+    """((rows, cols), frames per second, frame count) as reported by the container."""
+    capture = open_video(path)
+    try:
+        shape = (int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)))
+        return shape, capture.get(cv2.CAP_PROP_FPS), int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        capture.release()
+
+
+def read_frames(path: str, shape: Tuple[int, int], stats: StageStats) -> Iterator[np.ndarray]:
+    """Decode a video to grayscale frames of the given shape."""
+    capture = open_video(path)
+    try:
+        while True:
+            start = time.perf_counter()
+            ok, frame = capture.read()
+            if not ok:
+                return
+            if frame.ndim == 3:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            frame = resize_to(frame, shape)
+            stats.add(time.perf_counter() - start)
+            yield frame
+    finally:
+        capture.release()
+
+
+class VideoMixer:
+    """Streams frame sets of several videos through the FFT, the mix engine and a video writer."""
+
+    def __init__(self, recipe: Recipe, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.recipe = recipe
+        self.queue_size = queue_size
+        # One engine for the whole clip: its workspace and mask cache are reused by every frame
+        self.engine = MixEngine()
+        self.stats: Dict[str, StageStats] = {}
+
+    def frames(self, paths: Sequence[str], shape: Tuple[int, int]) -> Iterator[np.ndarray]:
+        """Mixed uint8 frames of the videos, one per frame set; stats gets an entry per stage right away."""
+        if len(paths) != len(self.recipe.weights):
+            raise ValueError(f"{len(paths)} videos for a recipe of {len(self.recipe.weights)} inputs")
+        stop = threading.Event()
+        readers = []
+        for i, path in enumerate(paths):
+            stats = self.stats[f"decode {i + 1}"] = StageStats(f"decode {i + 1}")
+            readers.append(threaded(read_frames(path, shape, stats), self.queue_size, f"decode {i + 1}", stop))
+        # zip ends with the shortest video
+        frame_sets = zip(*readers)
+        fft_stats = self.stats["fft"] = StageStats("fft")
+        # The inputs of a frame set go through one batched FFT
+        spectra = threaded(stage(frame_sets, lambda frames: transform(np.stack(frames)), fft_stats),
+                           self.queue_size, "fft", stop)
+        mix_stats = self.stats["mix"] = StageStats("mix")
+        mixed = threaded(stage(spectra, self.mix, mix_stats), self.queue_size, "mix", stop)
+        return self._drain(mixed, stop)
+
+    @staticmethod
+    def _drain(mixed: Iterator, stop: threading.Event) -> Iterator[np.ndarray]:
+        try:
+            yield from mixed
+        finally:
+            # Stops every stage thread: the longer inputs' readers at the end, all of them after an
+            # error or when the consumer gives up early
+            stop.set()
+            mixed.close()
+
+    def mix(self, spectra) -> np.ndarray:
+        recipe = self.recipe
+        return self.engine.mix(spectra, recipe.weights, recipe.components, recipe.mode, recipe.region,
+                               filters=recipe.filters)
+
+    def run(self, paths: Sequence[str], output_path: str, fps: Optional[float] = None,
+            fourcc: str = DEFAULT_FOURCC, progress_every: int = 0,
+            progress: Optional[Callable[[int, Dict[str, StageStats]], None]] = None) -> Dict[str, StageStats]:
+        """Mix the videos into output_path and return the per-stage statistics."""
+        infos = [video_info(path) for path in paths]
+        shape = self.recipe.size or unified_shape(info[0] for info in infos)
+        fps = fps or infos[0][1] or 25.0
+        writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*fourcc), fps, (shape[1], shape[0]),
+                                 isColor=False)
+        if not writer.isOpened():
+            raise ValueError(f"Cannot write {output_path} with codec {fourcc}")
+        self.stats = {}
+        frames = self.frames(paths, shape)
+        encode_stats = self.stats["encode"] = StageStats("encode")
+        try:
+            for frame in frames:
+                start = time.perf_counter()
+                writer.write(frame)
+                encode_stats.add(time.perf_counter() - start)
+                if progress is not None and progress_every and encode_stats.frames % progress_every == 0:
+                    progress(encode_stats.frames, self.stats)
+        finally:
+            frames.close()
+            writer.release()
+        return self.stats
+
+
+def format_stats(stats: Dict[str, StageStats]) -> str:
+    return "  ".join(f"{s.name} {s.fps:.1f} fps" for s in stats.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mix videos frame by frame with a BatchMix recipe")
+    parser.add_argument("recipe", help="JSON mix recipe, one weight and component per video")
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--fps", type=float, default=None, help="Output frame rate (default: the first video's)")
+    parser.add_argument("--fourcc", default=DEFAULT_FOURCC, help="Output codec")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Frames buffered per stage")
+    parser.add_argument("--progress-every", type=int, default=100, help="Report stage rates every N frames")
+    args = parser.parse_args()
+
+    try:
+        recipe = Recipe.load(args.recipe)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    mixer = VideoMixer(recipe, args.queue_size)
+    start = time.perf_counter()
+    stats = mixer.run(args.videos, args.output, args.fps, args.fourcc, args.progress_every,
+                      lambda frames, stats: print(f"{frames} frames: {format_stats(stats)}"))
+    frames = stats["encode"].frames
+    elapsed = time.perf_counter() - start
+    print(f"Mixed {frames} frames in {elapsed:.1f} s ({frames / elapsed if elapsed else 0:.1f} fps overall)")
+    for s in stats.values():
+        print(f"  {s.name:10s} {s.frames:6d} frames  {s.busy:7.2f} s busy  {s.fps:8.1f} fps")
+
+
+if __name__ == "__main__":
+    main()
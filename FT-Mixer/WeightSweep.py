@@ -0,0 +1,80 @@
+"""Sweep mix weights from one setting to another and export the frames.
+
+Every frame of a sweep comes from MixEngine.mix_sweep, which builds the
+mixed spectra of all steps from two weighted sums of the inputs and
+reconstructs them with batched inverse FFTs. The frames can be written as
+an animated GIF or, for any other extension, a grayscale video.
+
+The recipe is the JSON format of BatchMix.py; its weights are the start of
+the sweep and --to gives the end weights.
+
+Usage: python WeightSweep.py recipe.json a.png b.png c.png d.png --to 0 1 1 1 --steps 30 --output sweep.gif
+       python WeightSweep.py recipe.json a.png b.png c.png d.png --to 0 1 1 1 --output sweep.mp4 --fps 25
+"""
+import argparse
+import time
+from typing import Sequence
+import cv2
+import numpy as np
+from PIL import Image
+from BatchMix import Recipe
+from ImageSizing import read_grayscale, resize_to, unified_shape
+from MixEngine import MixEngine
+from Spectrum import transform
+
+DEFAULT_STEPS = 30
+DEFAULT_FPS = 10
+DEFAULT_FOURCC = "mp4v"
+
+
+def export_frames(frames: Sequence[np.ndarray], path: str, fps: float = DEFAULT_FPS,
+                  fourcc: str = DEFAULT_FOURCC):
+    """Write uint8 frames as an animated GIF (.gif) or a grayscale video (anything else)."""
+    if len(frames) == 0:
+        raise ValueError("No frames to export")
+    if path.lower().endswith(".gif"):
+        images = [Image.fromarray(frame) for frame in frames]
+        images[0].save(path, save_all=True, append_images=images[1:], duration=round(1000 / fps), loop=0)
+        return
+    rows, cols = frames[0].shape
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, (cols, rows), isColor=False)
+    if not writer.isOpened():
+        raise ValueError(f"Cannot write {path} with codec {fourcc}")
+    try:
+        for frame in frames:
+            writer.write(frame)
+    finally:
+        writer.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep mix weights and export the frames as a GIF or video")
+    parser.add_argument("recipe", help="JSON mix recipe, its weights start the sweep")
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--to", type=float, nargs="+", required=True, help="Weights at the end of the sweep")
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS)
+    parser.add_argument("--output", required=True, help=".gif for an animated GIF, else a video file")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS)
+    parser.add_argument("--fourcc", default=DEFAULT_FOURCC, help="Video codec")
+    args = parser.parse_args()
+
+    try:
+        recipe = Recipe.load(args.recipe)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if not len(args.images) == len(args.to) == len(recipe.weights):
+        parser.error(f"Expected {len(recipe.weights)} images and --to weights for this recipe")
+    images = [read_grayscale(path) for path in args.images]
+    shape = recipe.size or unified_shape(image.shape for image in images)
+    spectra = transform(np.stack([resize_to(image, shape) for image in images]))
+
+    start = time.perf_counter()
+    frames = MixEngine().mix_sweep(spectra, recipe.weights, args.to, args.steps, recipe.components,
+                                   recipe.mode, recipe.region, filters=recipe.filters)
+    elapsed = time.perf_counter() - start
+    export_frames(frames, args.output, args.fps, args.fourcc)
+    print(f"Mixed {len(frames)} frames of {shape[1]}x{shape[0]} in {elapsed:.2f} s, wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
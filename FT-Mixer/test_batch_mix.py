@@ -0,0 +1,39 @@
+import csv
+import os
+import cv2
+import numpy as np
+import BatchMix
+from BatchMix import InputSet, Recipe
+
+
+class KillsWorker:
+    """A path that kills the worker process unpickling it, like an out-of-memory kill."""
+
+    def __reduce__(self):
+        return os._exit, (1,)
+
+
+def timing_rows(output_dir: str) -> dict:
+    with open(os.path.join(output_dir, BatchMix.TIMINGS_FILE), newline="") as f:
+        return {row["name"]: row["status"] for row in csv.DictReader(f)}
+
+
+def test_a_dead_worker_fails_its_sets_and_a_rerun_resumes(tmp_path):
+    paths = []
+    for i in range(2):
+        paths.append(os.path.join(tmp_path, f"input{i}.png"))
+        cv2.imwrite(paths[-1], np.random.default_rng(i).integers(0, 256, (40, 50), dtype=np.uint8))
+    recipe = Recipe.from_dict({"weights": [1, 1], "components": ["magnitude", "phase"]})
+    output_dir = os.path.join(tmp_path, "mixed")
+    names = ["a", "b", "c", "d", "e"]
+    sets = [InputSet(name, [paths[0], KillsWorker()] if name == "b" else paths) for name in names]
+
+    counts = BatchMix.run(recipe, sets, output_dir, 1, 2 ** 30)
+    rows = timing_rows(output_dir)
+    assert rows["b"] == "failed"
+    assert counts["failed"] >= 1 and counts["ok"] + counts["failed"] == len(rows)
+
+    counts = BatchMix.run(recipe, [InputSet(name, paths) for name in names], output_dir, 1, 2 ** 30)
+    assert counts["skipped"] == list(rows.values()).count("ok")
+    assert counts["ok"] == len(names) - counts["skipped"] and counts["failed"] == 0
+    assert all(os.path.exists(BatchMix.output_path(output_dir, name, ".png")) for name in names)
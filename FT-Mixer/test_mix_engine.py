@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from MixEngine import MixEngine, RegionSpec
+from Spectrum import DOUBLE, SINGLE, transform
+
+
+@pytest.mark.parametrize("shape", [(5, 7), (6, 8), (601, 599), (600, 600)])
+def test_default_region_selects_every_frequency(shape):
+    assert RegionSpec().bounds(shape) == (0, shape[0], 0, shape[1])
+    assert MixEngine().region_mask(shape, RegionSpec()).all()
+    assert not MixEngine().region_mask(shape, RegionSpec(inner=False)).any()
+
+
+@pytest.mark.parametrize("shape", [(64, 64), (65, 63), (64, 81), (97, 130)])
+@pytest.mark.parametrize("region", [
+    RegionSpec(),
+    RegionSpec(True, 0.25, 0.25, 0.75, 0.75),
+    RegionSpec(False, 0.25, 0.25, 0.75, 0.75),
+    RegionSpec(False, 0.4, 0.3, 0.6, 0.7),
+    RegionSpec(True, 0.1, 0.35, 0.9, 0.65),
+])
+@pytest.mark.parametrize("mode, components", [
+    ("Magnitude/Phase", ["FT Magnitude", "FT Phase"]),
+    ("Real/Imaginary", ["FT Real", "FT Imaginary"]),
+])
+def test_half_spectrum_matches_full_spectrum_for_centred_regions(shape, region, mode, components):
+    images = np.random.default_rng(0).random((2,) + shape) * 255
+    full = MixEngine().mix(transform(images, half=False), [0.8, 0.6], components, mode, region)
+    half = MixEngine().mix(transform(images, half=True), [0.8, 0.6], components, mode, region)
+    assert np.abs(full.astype(int) - half.astype(int)).max() <= 1
+
+
+def test_stacked_spectra_share_the_stack_and_its_components():
+    images = np.random.default_rng(0).random((3, 32, 48)) * 255
+    spectra = [transform(image) for image in images]
+    expected = [np.abs(spectrum.data) for spectrum in spectra]
+    engine = MixEngine()
+    before = engine.mix(spectra, [1, 1, 1], ["FT Magnitude", "FT Phase", "FT Magnitude"])
+    stack = engine.stack(spectra)
+    assert engine.stack(spectra) is stack
+    for index, spectrum in enumerate(spectra):
+        assert np.shares_memory(spectrum.data, stack.data)
+        # The viewers' components are slices of the stack's, derived once for display and mixing
+        assert np.shares_memory(spectrum.magnitude, stack.magnitude)
+        np.testing.assert_array_equal(spectrum.magnitude, expected[index])
+    np.testing.assert_array_equal(MixEngine().mix(spectra, [1, 1, 1], ["FT Magnitude", "FT Phase", "FT Magnitude"]),
+                                  before)
+
+
+@pytest.mark.parametrize("half", [False, True])
+@pytest.mark.parametrize("region", [
+    RegionSpec(),
+    RegionSpec(True, 0.4, 0.4, 0.6, 0.6),
+    RegionSpec(False, 0.3, 0.2, 0.7, 0.9),
+])
+@pytest.mark.parametrize("mode, components", [
+    ("Magnitude/Phase", ["FT Magnitude", "FT Phase", "FT Magnitude", "FT Phase"]),
+    ("Magnitude/Phase", ["FT Magnitude"] * 4),
+    ("Real/Imaginary", ["FT Real", "FT Imaginary", "FT Real", "FT Imaginary"]),
+    ("Real/Imaginary", ["FT Real"] * 4),
+])
+def test_single_precision_stays_within_one_grey_level_of_double(half, region, mode, components):
+    images = np.random.default_rng(0).integers(0, 256, (4, 96, 81), dtype=np.uint8)
+    weights = [0.2, 0.5, 0.8, 1.0]
+    single = MixEngine().mix(transform(images, precision=SINGLE, half=half), weights, components, mode, region)
+    double = MixEngine().mix(transform(images, precision=DOUBLE, half=half), weights, components, mode, region)
+    assert np.abs(single.astype(int) - double.astype(int)).max() <= 1
@@ -0,0 +1,76 @@
+import os
+import numpy as np
+import pytest
+import FFTBackend
+import OutOfCore
+from MixEngine import MixEngine, MixWorkspace, RegionSpec
+from OutOfCore import OutOfCoreMixer
+from RadialFilter import FilterSpec, GAUSSIAN, HIGH_PASS, IDEAL, LOW_PASS
+from Spectrum import transform
+
+MODES = [
+    ("Magnitude/Phase", ["FT Magnitude", "FT Phase", "FT Magnitude"]),
+    ("Real/Imaginary", ["FT Real", "FT Imaginary", "FT Real"]),
+]
+WEIGHTS = [0.5, 0.8, 0.3]
+REGION = RegionSpec(True, 0.3, 0.2, 0.7, 0.8)
+
+
+def random_images(shape=(70, 53), count=3) -> np.ndarray:
+    return np.random.default_rng(0).integers(0, 256, (count,) + shape, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("backend", FFTBackend.available_backends())
+@pytest.mark.parametrize("mode, components", MODES)
+def test_matches_the_in_memory_mix_with_every_backend(tmp_path, monkeypatch, backend, mode, components):
+    monkeypatch.setattr(FFTBackend, "_backend", None)
+    options = {"wisdom_path": None, "planner_effort": "FFTW_ESTIMATE"} if backend == FFTBackend.PYFFTW else {}
+    FFTBackend.set_backend(backend, 2, **options)
+    images = random_images()
+    expected = MixEngine().mix(transform(images), WEIGHTS, components, mode, REGION)
+    # Blocks of a few rows, so every pass runs over several blocks
+    with OutOfCoreMixer(str(tmp_path), block_bytes=4096) as mixer:
+        mixed = np.array(mixer.mix(list(images), WEIGHTS, components, mode, REGION,
+                                   output_path=os.path.join(tmp_path, "mixed.npy")))
+    assert np.abs(mixed.astype(int) - expected.astype(int)).max() <= 1
+
+
+def test_spectrum_files_are_removed_once_mixed(tmp_path, monkeypatch):
+    mixer = OutOfCoreMixer(str(tmp_path), block_bytes=4096)
+    row_pass = mixer._row_pass
+    scratch = []
+
+    def inverse_row_pass(array, transform):
+        scratch.append(sorted(os.listdir(tmp_path)))
+        row_pass(array, transform)
+
+    # Only the inverse transform runs a row pass over a scratch file
+    monkeypatch.setattr(mixer, "_row_pass", inverse_row_pass)
+    mode, components = MODES[0]
+    mixer.mix(list(random_images()), WEIGHTS, components, mode, REGION,
+              output_path=os.path.join(tmp_path, "mixed.npy"))
+    assert scratch == [["mixed.dat"]]
+
+
+FILTERS = [FilterSpec(GAUSSIAN, LOW_PASS, 0.3), None, FilterSpec(IDEAL, HIGH_PASS, 0.2)]
+
+
+@pytest.mark.parametrize("mode, components", MODES)
+@pytest.mark.parametrize("filters", [None, FILTERS])
+def test_blocks_reuse_one_workspace(tmp_path, monkeypatch, mode, components, filters):
+    workspaces = []
+
+    def counted_workspace(*args):
+        workspaces.append(args)
+        return MixWorkspace(*args)
+
+    monkeypatch.setattr(OutOfCore, "MixWorkspace", counted_workspace)
+    images = random_images()
+    expected = MixEngine().mix(transform(images), WEIGHTS, components, mode, REGION, filters=filters)
+    # Three rows per block: 70 rows leave a shorter last block
+    block_bytes = 3 * images.shape[2] * 16 * (3 * len(images) + 3)
+    with OutOfCoreMixer(str(tmp_path), block_bytes=block_bytes, precision="double") as mixer:
+        mixed = np.array(mixer.mix(list(images), WEIGHTS, components, mode, REGION,
+                                   output_path=os.path.join(tmp_path, "mixed.npy"), filters=filters))
+    assert workspaces == [((3, images.shape[2]), np.dtype(np.complex128))]
+    assert np.abs(mixed.astype(int) - expected.astype(int)).max() <= 1
@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+from RadialFilter import FilterCache, FilterSpec, BUTTERWORTH, GAUSSIAN, BAND_PASS, LOW_PASS
+
+
+@pytest.mark.parametrize("full_shape, shape", [((100, 60), (50, 50)), ((600, 800), (300, 401)), ((81, 64), (40, 33))])
+@pytest.mark.parametrize("spec", [FilterSpec(GAUSSIAN, LOW_PASS, 0.3), FilterSpec(BUTTERWORTH, BAND_PASS, 0.2, 0.6)])
+def test_rescaled_filter_keeps_the_full_spectrum_gains_on_a_central_window(full_shape, shape, spec):
+    cache = FilterCache()
+    full = cache.get(full_shape, spec)
+    row_start = full_shape[0] // 2 - shape[0] // 2
+    col_start = full_shape[1] // 2 - shape[1] // 2
+    window = full[row_start:row_start + shape[0], col_start:col_start + shape[1]]
+    cropped = cache.get(shape, spec.rescaled(full_shape, shape))
+    np.testing.assert_allclose(cropped, window, rtol=1e-12)
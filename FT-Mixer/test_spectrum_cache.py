@@ -0,0 +1,18 @@
+import os
+import numpy as np
+from Spectrum import transform
+from SpectrumCache import SpectrumCache
+
+
+def test_clear_removes_entries_whose_spectra_are_still_in_use(tmp_path):
+    cache = SpectrumCache(str(tmp_path))
+    image = np.random.default_rng(0).integers(0, 256, (32, 48), dtype=np.uint8)
+    key = cache.key("digest", image.shape, "double", False)
+    cache.store(key, image, transform(image))
+    cached_image, spectrum = cache.load(key)
+    # Read into memory: the files are not held open by the spectrum
+    assert not isinstance(spectrum.data, np.memmap)
+    assert cache.clear() == 1
+    assert os.listdir(tmp_path) == []
+    np.testing.assert_array_equal(cached_image, image)
+    np.testing.assert_allclose(spectrum.data, transform(image).data)
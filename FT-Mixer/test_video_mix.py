@@ -0,0 +1,38 @@
+import os
+import cv2
+import numpy as np
+import pytest
+from BatchMix import Recipe
+from VideoMix import VideoMixer
+
+SHAPE = (48, 64)
+
+
+def write_video(path: str, frames: int):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (SHAPE[1], SHAPE[0]), isColor=False)
+    for i in range(frames):
+        writer.write(np.full(SHAPE, i * 5 % 256, dtype=np.uint8))
+    writer.release()
+
+
+@pytest.mark.parametrize("lengths", [(50, 60, 55, 70), (20, 40, 30, 25), (7, 7, 7, 7)])
+@pytest.mark.parametrize("queue_size", [1, 2, 8])
+def test_mixes_one_frame_per_frame_of_the_shortest_input(tmp_path, lengths, queue_size):
+    paths = []
+    for i, frames in enumerate(lengths):
+        path = os.path.join(tmp_path, f"input{i}.avi")
+        write_video(path, frames)
+        paths.append(path)
+    recipe = Recipe.from_dict({"weights": [1, 1, 1, 1], "components": ["magnitude", "phase"] * 2})
+    mixer = VideoMixer(recipe, queue_size)
+    mixed = list(mixer.frames(paths, SHAPE))
+    assert len(mixed) == min(lengths)
+    assert mixer.stats["mix"].frames == min(lengths)
+
+
+def test_reader_error_reaches_the_consumer(tmp_path):
+    path = os.path.join(tmp_path, "input.avi")
+    write_video(path, 10)
+    recipe = Recipe.from_dict({"weights": [1, 1], "components": ["magnitude", "phase"]})
+    with pytest.raises(ValueError, match="Cannot open video"):
+        list(VideoMixer(recipe).frames([path, os.path.join(tmp_path, "missing.avi")], SHAPE))